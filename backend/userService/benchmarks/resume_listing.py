@@ -0,0 +1,124 @@
+"""
+Benchmark: full ORM resume listing vs. the column-projected listing query.
+
+Seeds one throwaway user with N generated resumes inside a transaction that
+is rolled back at the end, then compares peak Python memory and latency of
+loading one page of GeneratedResume objects against ResumeService's
+projected query.
+
+    python -m benchmarks.resume_listing --resumes 500 --page-size 100
+
+Needs a PostgreSQL database with the application schema (the models use
+partitioning, ARRAY, TSVECTOR and ON CONFLICT); --database-url defaults to
+the configured one.
+"""
+import argparse
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from src.models.users import User
+from src.models.profiles import Profile
+from src.models.education import Education
+from src.models.experience import Experience
+from src.models.projects import Project
+from src.models.skills import Skill
+from src.models.generated_resumes import GeneratedResume
+from src.models.job_descriptions import JobDescription
+from src.models.compression_dictionaries import CompressionDictionary
+from src.services.resume_service import ResumeService, RESUME_TEMPLATE_PATH
+from src.services.resume_storage import ResumeStorage
+from src.utils.blob_store import LocalBlobStore
+
+JOB_DESCRIPTION = (
+    "Senior Data Engineer - build and operate batch and streaming pipelines "
+    "on Spark, Kafka and Postgres. "
+) * 40
+
+
+def _measure(fn, repeat: int):
+    timings = []
+    peak = 0
+    for _ in range(repeat):
+        tracemalloc.start()
+        start = time.perf_counter()
+        rows = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        del rows
+    return statistics.median(timings), peak
+
+
+def run(database_url: str, resumes: int, page_size: int, repeat: int) -> None:
+    engine = create_engine(database_url)
+
+    with open(RESUME_TEMPLATE_PATH, "r", encoding="utf-8") as f:
+        latex_body = f.read()
+
+    service = ResumeService()
+    blob_dir = tempfile.TemporaryDirectory()
+    service.storage = ResumeStorage(latex_body, LocalBlobStore(blob_dir.name))
+    connection = engine.connect()
+    transaction = connection.begin()
+    db = Session(bind=connection)
+    try:
+        user = User(
+            username="bench_resume_listing",
+            email="bench_resume_listing@example.com",
+            hashedPassword="!",
+            firstName="Bench",
+            lastName="User",
+        )
+        db.add(user)
+        db.flush()
+        profile = Profile(user_id=user.id, name="bench")
+        db.add(profile)
+        db.flush()
+        stored = service.storage.resume_columns(db, JOB_DESCRIPTION, latex_body)
+        db.add_all(
+            GeneratedResume(user_id=user.id, profile_id=profile.id, **stored)
+            for _ in range(resumes)
+        )
+        db.flush()
+
+        def full_orm():
+            rows = db.query(GeneratedResume).filter(
+                GeneratedResume.user_id == user.id
+            ).order_by(GeneratedResume.created_at.desc(), GeneratedResume.id.desc()).limit(page_size).all()
+            db.expunge_all()
+            return rows
+
+        def projected():
+            return service._resume_list_query(user.id, db).order_by(
+                GeneratedResume.created_at.desc(), GeneratedResume.id.desc()
+            ).limit(page_size).all()
+
+        full_ms, full_peak = _measure(full_orm, repeat)
+        proj_ms, proj_peak = _measure(projected, repeat)
+
+        print(f"resumes={resumes} page_size={page_size} repeat={repeat}")
+        print(f"{'query':<12}{'median ms':>12}{'peak KiB':>12}")
+        print(f"{'full ORM':<12}{full_ms:>12.2f}{full_peak / 1024:>12.1f}")
+        print(f"{'projected':<12}{proj_ms:>12.2f}{proj_peak / 1024:>12.1f}")
+    finally:
+        db.close()
+        transaction.rollback()
+        connection.close()
+        blob_dir.cleanup()
+
+
+if __name__ == "__main__":
+    from src.core.config import settings
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--resumes", type=int, default=500)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.database_url or settings.database_url, args.resumes, args.page_size, args.repeat)
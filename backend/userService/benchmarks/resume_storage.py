@@ -0,0 +1,100 @@
+"""
+Benchmark: stored bytes per resume and read latency for the resume storage layout.
+
+Compares a LaTeX body stored as plain text, zstd without a dictionary and zstd
+against the resume-template dictionary, and reports how much deduplicating a
+job description pasted repeatedly in a batch saves. Runs in-process, no
+database needed.
+
+    python -m benchmarks.resume_storage --batch 20 --reads 2000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from src.services.resume_service import RESUME_TEMPLATE_PATH
+from src.utils.compression import build_dictionary, compress_text, decompress_text, register_dictionary
+
+WORDS = (
+    "designed built scaled migrated reduced latency pipelines kafka spark postgres "
+    "python services api customers revenue team led mentored improved reliability "
+    "throughput observability terraform kubernetes airflow dbt warehouse"
+).split()
+
+
+def _sentence(rng: random.Random, words: int = 18) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def sample_resume(template: str, rng: random.Random) -> str:
+    """Fill the template placeholders with synthetic section content"""
+    def entries(n: int) -> str:
+        return "\n".join(
+            "    \\resumeSubheading\n"
+            f"      {{{_sentence(rng, 3)}}}{{}}\n"
+            f"      {{{_sentence(rng, 2)}}}{{2019 -- 2024}}\n"
+            "      \\resumeItemListStart\n"
+            + "\n".join(f"          \\resumeItem{{{_sentence(rng)}}}" for _ in range(3))
+            + "\n      \\resumeItemListEnd"
+            for _ in range(n)
+        )
+
+    filled = template
+    for placeholder in ("[LINKEDIN_CONTACT]", "[GITHUB_CONTACT]", "[LOCATION_CONTACT]", "[PHONE_CONTACT]"):
+        filled = filled.replace(placeholder, "")
+    filled = filled.replace("[LLM_GENERATED_PROFILE_SUMMARY]", " ".join(_sentence(rng) for _ in range(3)))
+    filled = filled.replace("[EDUCATION_SECTION_CONTENT]", entries(2))
+    filled = filled.replace("[EXPERIENCE_SECTION_CONTENT]", entries(4))
+    filled = filled.replace("[PROJECTS_SECTION_CONTENT]", entries(3))
+    filled = filled.replace("[SKILLS_SECTION_CONTENT]", ", ".join(rng.sample(WORDS, 12)))
+    return filled
+
+
+def _read_latency_us(blob: bytes, dictionary_id, reads: int) -> float:
+    timings = []
+    for _ in range(reads):
+        start = time.perf_counter()
+        decompress_text(blob, dictionary_id)
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    return statistics.median(timings)
+
+
+def run(samples: int, batch: int, reads: int) -> None:
+    with open(RESUME_TEMPLATE_PATH, "r", encoding="utf-8") as f:
+        template = f.read()
+    rng = random.Random(42)
+    bodies = [sample_resume(template, rng) for _ in range(samples)]
+
+    dictionary_id = -1  # process-local id, nothing is written to the database
+    dictionary = register_dictionary(dictionary_id, template.encode("utf-8"))
+    plain = [len(body.encode("utf-8")) for body in bodies]
+    no_dict = [compress_text(body) for body in bodies]
+    with_dict = [compress_text(body, dictionary) for body in bodies]
+
+    print(f"LaTeX bodies: {samples} samples, median over samples")
+    print(f"{'layout':<18}{'bytes/resume':>14}{'ratio':>8}{'read us':>10}")
+    base = statistics.median(plain)
+    rows = [
+        ("plain text", base, None),
+        ("zstd", statistics.median(len(b) for b in no_dict), (no_dict[0], None)),
+        ("zstd + template", statistics.median(len(b) for b in with_dict), (with_dict[0], dictionary_id)),
+    ]
+    for name, size, read in rows:
+        latency = _read_latency_us(*read, reads) if read else 0.0
+        print(f"{name:<18}{size:>14.0f}{base / size:>8.1f}{latency:>10.1f}")
+
+    job_description = " ".join(_sentence(rng) for _ in range(40))
+    jd_bytes = len(job_description.encode("utf-8"))
+    print(f"\nJob description pasted {batch}x in a batch ({jd_bytes} bytes each)")
+    print(f"{'inline':<18}{jd_bytes * batch:>14} bytes")
+    print(f"{'deduplicated':<18}{jd_bytes + 4 * batch:>14} bytes (one row + 4-byte reference per resume)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument("--batch", type=int, default=20)
+    parser.add_argument("--reads", type=int, default=2000)
+    args = parser.parse_args()
+    run(args.samples, args.batch, args.reads)
@@ -1,6 +1,7 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field, field_validator
 import os
+import re
 from typing import Optional
 
 
@@ -26,11 +27,105 @@ class Settings(BaseSettings):
     temperature: float = Field(default=0.7, env="TEMPERATURE")
 
     cors_origins: str = Field(default="http://localhost:3000,http://127.0.0.1:3000", env="CORS_ORIGINS")
+    admin_usernames: str = Field(default="", env="ADMIN_USERNAMES")
 
     sqlalchemy_echo: bool = Field(default=False, env="SQLALCHEMY_ECHO")
     sqlalchemy_pool_size: int = Field(default=20, env="SQLALCHEMY_POOL_SIZE")
     sqlalchemy_max_overflow: int = Field(default=10, env="SQLALCHEMY_MAX_OVERFLOW")
 
+    default_page_size: int = Field(default=50, env="DEFAULT_PAGE_SIZE")
+    max_page_size: int = Field(default=100, env="MAX_PAGE_SIZE")
+
+    blob_store_backend: str = Field(default="local", env="BLOB_STORE_BACKEND")
+    blob_store_path: str = Field(default="data/blobs", env="BLOB_STORE_PATH")
+    blob_gc_grace_seconds: int = Field(default=3600, env="BLOB_GC_GRACE_SECONDS")
+
+    ingest_chunk_rows: int = Field(default=5000, env="INGEST_CHUNK_ROWS")
+    ingest_max_line_bytes: int = Field(default=1024 * 1024, env="INGEST_MAX_LINE_BYTES")
+    ingest_max_reported_errors: int = Field(default=1000, env="INGEST_MAX_REPORTED_ERRORS")
+
+    account_delete_batch_size: int = Field(default=1000, env="ACCOUNT_DELETE_BATCH_SIZE")
+    guest_sweep_batch_size: int = Field(default=500, env="GUEST_SWEEP_BATCH_SIZE")
+    guest_sweep_pause_ms: int = Field(default=100, env="GUEST_SWEEP_PAUSE_MS")
+    guest_sweep_interval_seconds: int = Field(default=3600, env="GUEST_SWEEP_INTERVAL_SECONDS")  # 0 disables
+    job_description_gc_grace_seconds: int = Field(default=3600, env="JOB_DESCRIPTION_GC_GRACE_SECONDS")
+
+    partition_premake: int = Field(default=3, env="PARTITION_PREMAKE")
+    partition_rotation_seconds: int = Field(default=3600, env="PARTITION_ROTATION_SECONDS")  # 0 disables
+    partition_retention_action: str = Field(default="drop", env="PARTITION_RETENTION_ACTION")
+    llm_requests_partition_interval: str = Field(default="month", env="LLM_REQUESTS_PARTITION_INTERVAL")
+    llm_requests_retention_days: int = Field(default=400, env="LLM_REQUESTS_RETENTION_DAYS")
+    resume_rate_limits_partition_interval: str = Field(default="day", env="RESUME_RATE_LIMITS_PARTITION_INTERVAL")
+    resume_rate_limits_retention_days: int = Field(default=2, env="RESUME_RATE_LIMITS_RETENTION_DAYS")
+
+    usage_rollup_lag_seconds: int = Field(default=300, env="USAGE_ROLLUP_LAG_SECONDS")
+    usage_rollup_window_hours: int = Field(default=24, env="USAGE_ROLLUP_WINDOW_HOURS")
+
+    telemetry_queue_size: int = Field(default=10000, env="TELEMETRY_QUEUE_SIZE")
+    telemetry_batch_size: int = Field(default=200, env="TELEMETRY_BATCH_SIZE")
+    telemetry_flush_interval_ms: int = Field(default=1000, env="TELEMETRY_FLUSH_INTERVAL_MS")
+    telemetry_drop_policy: str = Field(default="drop_oldest", env="TELEMETRY_DROP_POLICY")
+
+    password_hash_workers: int = Field(default=2, env="PASSWORD_HASH_WORKERS")
+    password_hash_max_pending: int = Field(default=64, env="PASSWORD_HASH_MAX_PENDING")
+    password_hash_retry_after_seconds: int = Field(default=1, env="PASSWORD_HASH_RETRY_AFTER_SECONDS")
+
+    guest_pool_size: int = Field(default=200, env="GUEST_POOL_SIZE")
+    guest_pool_low_water: int = Field(default=50, env="GUEST_POOL_LOW_WATER")
+    guest_pool_refill_rate: int = Field(default=50, env="GUEST_POOL_REFILL_RATE")  # accounts per second
+    guest_pool_check_seconds: int = Field(default=10, env="GUEST_POOL_CHECK_SECONDS")
+
+    # Prompt tokens (system + user message) per resume request; larger profiles are trimmed to fit
+    llm_prompt_budget_tokens: int = Field(default=2500, env="LLM_PROMPT_BUDGET_TOKENS")
+    llm_prompt_item_max_tokens: int = Field(default=120, env="LLM_PROMPT_ITEM_MAX_TOKENS")
+    llm_job_description_max_tokens: int = Field(default=1500, env="LLM_JOB_DESCRIPTION_MAX_TOKENS")
+
+    # Completion budget (max_tokens) predicted from prompt size; MAX_TOKENS until enough calls are on record
+    llm_completion_min_tokens: int = Field(default=256, env="LLM_COMPLETION_MIN_TOKENS")
+    llm_completion_max_tokens: int = Field(default=1500, env="LLM_COMPLETION_MAX_TOKENS")
+    llm_completion_quantile: float = Field(default=0.98, env="LLM_COMPLETION_QUANTILE")
+    llm_completion_fit_rows: int = Field(default=5000, env="LLM_COMPLETION_FIT_ROWS")
+    llm_completion_min_samples: int = Field(default=200, env="LLM_COMPLETION_MIN_SAMPLES")
+    llm_completion_refit_seconds: int = Field(default=3600, env="LLM_COMPLETION_REFIT_SECONDS")
+
+    llm_max_concurrency: int = Field(default=8, env="LLM_MAX_CONCURRENCY")
+    llm_max_queued: int = Field(default=64, env="LLM_MAX_QUEUED")
+    llm_user_max_in_flight: int = Field(default=2, env="LLM_USER_MAX_IN_FLIGHT")
+    llm_queue_timeout_seconds: float = Field(default=30.0, env="LLM_QUEUE_TIMEOUT_SECONDS")
+    llm_registered_weight: int = Field(default=4, env="LLM_REGISTERED_WEIGHT")
+    llm_guest_weight: int = Field(default=1, env="LLM_GUEST_WEIGHT")
+
+    # LLM tokens per UTC day / calendar month; 0 = unlimited. users.token_budget_* override these.
+    token_budget_guest_daily: int = Field(default=20000, env="TOKEN_BUDGET_GUEST_DAILY")
+    token_budget_guest_monthly: int = Field(default=40000, env="TOKEN_BUDGET_GUEST_MONTHLY")
+    token_budget_registered_daily: int = Field(default=200000, env="TOKEN_BUDGET_REGISTERED_DAILY")
+    token_budget_registered_monthly: int = Field(default=2000000, env="TOKEN_BUDGET_REGISTERED_MONTHLY")
+    token_budget_flush_seconds: float = Field(default=5.0, env="TOKEN_BUDGET_FLUSH_SECONDS")
+    token_budget_sync_seconds: float = Field(default=10.0, env="TOKEN_BUDGET_SYNC_SECONDS")
+    token_budget_reconcile_lag_seconds: float = Field(default=60.0, env="TOKEN_BUDGET_RECONCILE_LAG_SECONDS")
+    token_budget_max_users: int = Field(default=100000, env="TOKEN_BUDGET_MAX_USERS")
+    token_usage_retention_days: int = Field(default=62, env="TOKEN_USAGE_RETENTION_DAYS")
+
+    quota_backend: str = Field(default="local", env="QUOTA_BACKEND")
+    quota_local_max_keys: int = Field(default=100000, env="QUOTA_LOCAL_MAX_KEYS")
+
+    rate_limit_enabled: bool = Field(default=True, env="RATE_LIMIT_ENABLED")
+    # group=per-IP:per-user requests per minute; 0 disables that limit
+    rate_limit_groups: str = Field(default="auth=20:0,generate=30:10,write=240:120,read=1200:600", env="RATE_LIMIT_GROUPS")
+    rate_limit_trust_forwarded: bool = Field(default=False, env="RATE_LIMIT_TRUST_FORWARDED")
+    rate_limit_max_keys: int = Field(default=100000, env="RATE_LIMIT_MAX_KEYS")
+    load_shed_db_max_waiting: int = Field(default=20, env="LOAD_SHED_DB_MAX_WAITING")
+    load_shed_retry_after_seconds: int = Field(default=2, env="LOAD_SHED_RETRY_AFTER_SECONDS")
+
+    auth_user_cache_size: int = Field(default=10000, env="AUTH_USER_CACHE_SIZE")
+    auth_user_cache_ttl_seconds: int = Field(default=60, env="AUTH_USER_CACHE_TTL_SECONDS")
+    auth_revocation_capacity: int = Field(default=100000, env="AUTH_REVOCATION_CAPACITY")
+    auth_revocation_fp_rate: float = Field(default=0.001, env="AUTH_REVOCATION_FP_RATE")
+    auth_revocation_sync_seconds: int = Field(default=5, env="AUTH_REVOCATION_SYNC_SECONDS")
+
+    # Text search configuration for resume search; changing it needs a rebuild of search_vector
+    search_text_config: str = Field(default="english", env="SEARCH_TEXT_CONFIG")
+
     @property
     def database_url(self) -> str:
         return f"postgresql://{self.db_user}:{self.db_password}@{self.db_host}:{self.db_port}/{self.db_name}"
@@ -40,6 +135,22 @@ class Settings(BaseSettings):
         """Parse cors_origins string into list"""
         return [origin.strip() for origin in self.cors_origins.split(",")]
 
+    @property
+    def get_admin_usernames(self) -> set:
+        """Parse admin_usernames string into a set"""
+        return {name.strip() for name in self.admin_usernames.split(",") if name.strip()}
+
+    @property
+    def get_rate_limit_groups(self) -> dict:
+        """Parse rate_limit_groups into {group: (per_ip, per_user)}"""
+        groups = {}
+        for entry in self.rate_limit_groups.split(","):
+            if entry.strip():
+                name, _, limits = entry.partition("=")
+                per_ip, _, per_user = limits.partition(":")
+                groups[name.strip()] = (int(per_ip), int(per_user or 0))
+        return groups
+
     @field_validator("debug", mode="before")
     @classmethod
     def parse_debug(cls, v):
@@ -47,7 +158,7 @@ class Settings(BaseSettings):
             return v.lower() in ("true", "1", "yes")
         return bool(v)
 
-    @field_validator("sqlalchemy_echo", mode="before")
+    @field_validator("sqlalchemy_echo", "rate_limit_enabled", "rate_limit_trust_forwarded", mode="before")
     @classmethod
     def parse_echo(cls, v):
         if isinstance(v, str):
@@ -63,6 +174,117 @@ class Settings(BaseSettings):
             raise ValueError("access_token_expire_minutes cannot exceed 1 year")
         return v
 
+    @field_validator("default_page_size", "max_page_size")
+    @classmethod
+    def validate_page_size(cls, v):
+        if v < 1:
+            raise ValueError("page sizes must be at least 1")
+        return v
+
+    @field_validator("llm_requests_partition_interval", "resume_rate_limits_partition_interval")
+    @classmethod
+    def validate_partition_interval(cls, v):
+        if v not in ("day", "month"):
+            raise ValueError("partition interval must be 'day' or 'month'")
+        return v
+
+    @field_validator("partition_retention_action")
+    @classmethod
+    def validate_retention_action(cls, v):
+        if v not in ("drop", "detach"):
+            raise ValueError("partition_retention_action must be 'drop' or 'detach'")
+        return v
+
+    @field_validator("telemetry_drop_policy")
+    @classmethod
+    def validate_drop_policy(cls, v):
+        if v not in ("drop_oldest", "drop_newest"):
+            raise ValueError("telemetry_drop_policy must be 'drop_oldest' or 'drop_newest'")
+        return v
+
+    @field_validator("password_hash_workers", "password_hash_max_pending")
+    @classmethod
+    def validate_password_pool(cls, v):
+        if v < 1:
+            raise ValueError("password pool sizes must be at least 1")
+        return v
+
+    @field_validator("guest_pool_refill_rate", "guest_pool_check_seconds")
+    @classmethod
+    def validate_guest_pool(cls, v):
+        if v < 1:
+            raise ValueError("guest pool refill rate and check interval must be at least 1")
+        return v
+
+    @field_validator("llm_prompt_budget_tokens", "llm_prompt_item_max_tokens", "llm_job_description_max_tokens")
+    @classmethod
+    def validate_prompt_budget(cls, v):
+        if v < 1:
+            raise ValueError("prompt token budgets must be at least 1")
+        return v
+
+    @field_validator("llm_completion_min_tokens", "llm_completion_fit_rows", "llm_completion_min_samples")
+    @classmethod
+    def validate_completion_counts(cls, v):
+        if v < 1:
+            raise ValueError("completion budget sizes must be at least 1")
+        return v
+
+    @field_validator("llm_completion_quantile")
+    @classmethod
+    def validate_completion_quantile(cls, v):
+        if not 0 < v <= 1:
+            raise ValueError("LLM_COMPLETION_QUANTILE must be in (0, 1]")
+        return v
+
+    @field_validator("llm_max_concurrency", "llm_user_max_in_flight", "llm_registered_weight", "llm_guest_weight")
+    @classmethod
+    def validate_llm_scheduler(cls, v):
+        if v < 1:
+            raise ValueError("LLM concurrency, per-user cap and weights must be at least 1")
+        return v
+
+    @field_validator(
+        "token_budget_guest_daily", "token_budget_guest_monthly",
+        "token_budget_registered_daily", "token_budget_registered_monthly"
+    )
+    @classmethod
+    def validate_token_budget(cls, v):
+        if v < 0:
+            raise ValueError("token budgets cannot be negative")
+        return v
+
+    @field_validator("token_usage_retention_days")
+    @classmethod
+    def validate_token_usage_retention(cls, v):
+        if v < 31:
+            raise ValueError("token_usage_retention_days must cover a month (at least 31)")
+        return v
+
+    @field_validator("quota_backend")
+    @classmethod
+    def validate_quota_backend(cls, v):
+        if v not in ("local", "postgres"):
+            raise ValueError("quota_backend must be 'local' or 'postgres'")
+        return v
+
+    @field_validator("rate_limit_groups")
+    @classmethod
+    def validate_rate_limit_groups(cls, v):
+        for entry in v.split(","):
+            if not entry.strip():
+                continue
+            if not re.fullmatch(r"\s*(auth|generate|write|read)\s*=\s*\d+(:\d+)?\s*", entry):
+                raise ValueError(f"invalid rate limit group '{entry}', expected group=per_ip:per_user")
+        return v
+
+    @field_validator("auth_revocation_fp_rate")
+    @classmethod
+    def validate_fp_rate(cls, v):
+        if not 0 < v < 1:
+            raise ValueError("auth_revocation_fp_rate must be between 0 and 1")
+        return v
+
     @field_validator("temperature")
     @classmethod
     def validate_temperature(cls, v):
@@ -0,0 +1,97 @@
+"""
+Garbage collector for the resume blob store.
+
+Deletes blobs that no generated_resumes row references. Blobs younger than
+BLOB_GC_GRACE_SECONDS are kept, since a blob is written before the row that
+references it is committed. A put() of an existing blob counts as a new
+write, so deduplicated blobs get the same grace period. An unreferenced
+blob's age is checked again right before it is deleted, so a put() that
+lands after the reference check keeps it.
+
+    python -m src.jobs.blob_gc [--dry-run]
+"""
+import argparse
+import time
+from typing import Dict, List
+
+from sqlalchemy import select, union
+from sqlalchemy.orm import Session
+
+from src.core.config import settings
+from src.core.logger import get_logger
+from src.models.generated_resumes import GeneratedResume
+from src.utils.blob_store import BlobStore, LocalBlobStore, get_blob_store
+
+logger = get_logger(__name__)
+
+BATCH_SIZE = 500
+
+
+def _referenced(db: Session, digests: List[str]) -> set:
+    query = union(
+        select(GeneratedResume.latex_digest).where(GeneratedResume.latex_digest.in_(digests)),
+        select(GeneratedResume.pdf_digest).where(GeneratedResume.pdf_digest.in_(digests)),
+    )
+    return set(db.execute(query).scalars())
+
+
+def _sweep(db: Session, store: BlobStore, digests: List[str], cutoff: float, dry_run: bool) -> int:
+    referenced = _referenced(db, digests)
+    removed = 0
+    for digest in digests:
+        if digest in referenced:
+            continue
+        # A put() since the scan may be about to commit a row referencing it
+        stored_at = store.stored_at(digest)
+        if stored_at is None or stored_at > cutoff:
+            continue
+        if not dry_run:
+            store.delete(digest)
+        removed += 1
+    return removed
+
+
+def collect_garbage(
+    db: Session,
+    store: BlobStore,
+    grace_seconds: int = settings.blob_gc_grace_seconds,
+    dry_run: bool = False
+) -> Dict[str, int]:
+    """Remove unreferenced blobs older than the grace period; returns counters"""
+    cutoff = time.time() - grace_seconds
+    scanned, removed = 0, 0
+    batch: List[str] = []
+
+    for digest, stored_at in store.iter_blobs():
+        scanned += 1
+        if stored_at > cutoff:
+            continue
+        batch.append(digest)
+        if len(batch) >= BATCH_SIZE:
+            removed += _sweep(db, store, batch, cutoff, dry_run)
+            batch = []
+    if batch:
+        removed += _sweep(db, store, batch, cutoff, dry_run)
+
+    tmp_removed = 0
+    if isinstance(store, LocalBlobStore) and not dry_run:
+        tmp_removed = store.purge_stale_tmp(grace_seconds)
+
+    logger.info(
+        f"Blob GC {'(dry run) ' if dry_run else ''}scanned {scanned} blobs, "
+        f"removed {removed} unreferenced, {tmp_removed} stale temp files"
+    )
+    return {"scanned": scanned, "removed": removed, "tmp_removed": tmp_removed}
+
+
+if __name__ == "__main__":
+    from src.utils.db import SessionLocal
+    from src.models.job_descriptions import JobDescription
+    from src.models.compression_dictionaries import CompressionDictionary
+
+    parser = argparse.ArgumentParser(description="Delete unreferenced resume blobs")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        collect_garbage(db, get_blob_store(), dry_run=args.dry_run)
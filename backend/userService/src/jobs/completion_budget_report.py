@@ -0,0 +1,89 @@
+"""
+Report truncations and reserved-token waste of resume generations.
+
+Over the successful calls of the last --days days in llm_requests:
+- truncated: calls cut off at max_tokens (finish_reason "length")
+- reserved / used: completion tokens sent as max_tokens vs. generated, and
+  the share wasted, for calls that recorded their max_tokens
+- predicted: the same calls replayed against a completion budget freshly
+  fitted on llm_requests, to show what it would reserve and how many calls
+  it would cut off. The fit includes these calls, so this is in-sample.
+
+    python -m src.jobs.completion_budget_report [--days N]
+"""
+import argparse
+from datetime import datetime, timedelta, timezone
+from typing import Dict
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.core.config import settings
+from src.core.logger import get_logger
+from src.models.llm_requests import LLMRequest
+from src.services.completion_budget import TRUNCATED, CompletionBudget
+
+logger = get_logger(__name__)
+
+DAYS = 7
+
+
+def _pct(part: float, whole: float):
+    return round(100 * part / whole, 1) if whole else None
+
+
+def report_completion_budget(db: Session, days: int = DAYS) -> Dict[str, object]:
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    rows = db.execute(
+        select(LLMRequest.prompt_tokens, LLMRequest.completion_tokens, LLMRequest.max_tokens, LLMRequest.finish_reason)
+        .where(
+            LLMRequest.request_time >= since,
+            LLMRequest.model_used == settings.llm_model,
+            LLMRequest.status == "success",
+            LLMRequest.completion_tokens.is_not(None),
+        )
+    ).all()
+
+    truncated = sum(1 for row in rows if row.finish_reason == TRUNCATED)
+    budgeted = [row for row in rows if row.max_tokens is not None]
+    reserved = sum(row.max_tokens for row in budgeted)
+    used = sum(row.completion_tokens for row in budgeted)
+    result = {
+        "calls": len(rows),
+        "truncated": truncated,
+        "truncation_pct": _pct(truncated, len(rows)),
+        "reserved_tokens": reserved,
+        "used_tokens": used,
+        "waste_pct": _pct(reserved - used, reserved),
+    }
+
+    budget = CompletionBudget()
+    if budget.fit(db) is not None:
+        replayed = [row for row in rows if row.prompt_tokens is not None]
+        predicted = [budget.predict(row.prompt_tokens) for row in replayed]
+        # A truncated call needed more than it got; count it as cut off unless the prediction is larger
+        cut_off = sum(
+            1 for row, max_tokens in zip(replayed, predicted)
+            if row.completion_tokens > max_tokens
+            or (row.finish_reason == TRUNCATED and max_tokens <= (row.max_tokens or row.completion_tokens))
+        )
+        result["predicted"] = {
+            "reserved_tokens": sum(predicted),
+            "waste_pct": _pct(sum(max(0, m - row.completion_tokens) for row, m in zip(replayed, predicted)), sum(predicted)),
+            "truncation_pct": _pct(cut_off, len(replayed)),
+        }
+
+    logger.info(f"Completion budget report over {days} days: {result}")
+    return result
+
+
+if __name__ == "__main__":
+    from src.utils.db import SessionLocal
+    from src.models.compression_dictionaries import CompressionDictionary
+
+    parser = argparse.ArgumentParser(description="Report LLM truncations and reserved-token waste")
+    parser.add_argument("--days", type=int, default=DAYS)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        report_completion_budget(db, days=args.days)
@@ -0,0 +1,144 @@
+"""
+Sweeper for expired guest accounts.
+
+Guest logins create a users row that expires after
+GuestLimiter.GUEST_EXPIRY_DAYS. Each run deletes:
+- expired guests, together with their generated resumes, rate-limit rows,
+  LLM request logs, profiles and profile children,
+- job descriptions that no resume references any more (older than
+  JOB_DESCRIPTION_GC_GRACE_SECONDS),
+- token revocations whose tokens have expired,
+- token usage counters older than TOKEN_USAGE_RETENTION_DAYS.
+
+Work is done in small batches (GUEST_SWEEP_BATCH_SIZE rows), each committed
+on its own with GUEST_SWEEP_PAUSE_MS of sleep in between, so the sweep never
+holds locks for long or produces WAL spikes. Every delete is driven by an
+index: the partial index on expired guests, then the user_id / profile_id
+indexes of the dependent tables.
+
+The API sweeps every GUEST_SWEEP_INTERVAL_SECONDS (guest_sweeper, started in
+src/main.py); it can also be run by hand:
+
+    python -m src.jobs.guest_sweeper [--batch-size N] [--pause-ms MS]
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+from sqlalchemy import delete, exists, select
+from sqlalchemy.orm import Session
+
+from src.core.config import settings
+from src.core.logger import get_logger
+from src.jobs.periodic import PeriodicJob
+from src.models.users import User
+from src.models.profiles import Profile
+from src.models.skills import Skill
+from src.models.experience import Experience
+from src.models.education import Education
+from src.models.projects import Project
+from src.models.generated_resumes import GeneratedResume
+from src.models.job_descriptions import JobDescription
+from src.models.llm_requests import LLMRequest
+from src.models.resume_rate_limit import ResumeRateLimit
+from src.models.token_revocations import TokenRevocation
+from src.models.token_usage import TokenUsageDaily
+from src.services.account_service import delete_in_batches
+
+logger = get_logger(__name__)
+
+USER_OWNED = (GeneratedResume, ResumeRateLimit, LLMRequest)
+PROFILE_OWNED = (Skill, Experience, Education, Project)
+
+_SWEEP_LOCK_KEY = 0x73776565  # "swee"
+
+
+def _expired_guest_ids(db: Session, now: datetime, limit: int) -> List[int]:
+    return list(db.scalars(
+        select(User.id)
+        .where(User.is_guest.is_(True), User.guest_expires_at < now)
+        .order_by(User.guest_expires_at)
+        .limit(limit)
+    ))
+
+
+def _delete_guests(db: Session, user_ids: List[int], batch_size: int, pause: float, counts: Dict[str, int]) -> None:
+    def run(model, criterion):
+        counts[model.__tablename__] += delete_in_batches(db, model, criterion, batch_size, pause)
+
+    for model in USER_OWNED:
+        run(model, model.user_id.in_(user_ids))
+    guest_profiles = select(Profile.id).where(Profile.user_id.in_(user_ids))
+    for model in PROFILE_OWNED:
+        run(model, model.profile_id.in_(guest_profiles))
+    run(Profile, Profile.user_id.in_(user_ids))
+
+    counts[User.__tablename__] += db.execute(
+        delete(User).where(User.id.in_(user_ids), User.is_guest.is_(True)),
+        execution_options={"synchronize_session": False}
+    ).rowcount
+    db.commit()
+
+
+def sweep_expired_guests(
+    db: Session,
+    batch_size: int = settings.guest_sweep_batch_size,
+    pause_ms: int = settings.guest_sweep_pause_ms,
+) -> Dict[str, int]:
+    """Delete expired guests and everything they own; returns rows reclaimed per table"""
+    pause = pause_ms / 1000
+    now = datetime.now(timezone.utc)
+    counts = {model.__tablename__: 0 for model in (*USER_OWNED, *PROFILE_OWNED, Profile, User, JobDescription, TokenRevocation, TokenUsageDaily)}
+
+    while user_ids := _expired_guest_ids(db, now, batch_size):
+        _delete_guests(db, user_ids, batch_size, pause, counts)
+        time.sleep(pause)
+
+    # Job descriptions are shared by content hash; drop those no resume uses.
+    # The grace period protects one a generation in flight has just created.
+    jd_cutoff = now - timedelta(seconds=settings.job_description_gc_grace_seconds)
+    counts[JobDescription.__tablename__] = delete_in_batches(
+        db,
+        JobDescription,
+        (JobDescription.created_at < jd_cutoff)
+        & ~exists().where(GeneratedResume.job_description_id == JobDescription.id),
+        batch_size,
+        pause
+    )
+
+    counts[TokenRevocation.__tablename__] = delete_in_batches(
+        db, TokenRevocation, TokenRevocation.expires_at <= now, batch_size, pause
+    )
+
+    usage_cutoff = (now - timedelta(days=settings.token_usage_retention_days)).date()
+    counts[TokenUsageDaily.__tablename__] = delete_in_batches(
+        db, TokenUsageDaily, TokenUsageDaily.day < usage_cutoff, batch_size, pause
+    )
+
+    total = sum(counts.values())
+    logger.info(f"Guest sweep reclaimed {total} rows: {counts}")
+    return dict(counts, total=total)
+
+
+def _sweep() -> None:
+    from src.utils.db import SessionLocal
+
+    with SessionLocal() as db:
+        sweep_expired_guests(db)
+
+
+guest_sweeper = PeriodicJob("guest-sweeper", _sweep, settings.guest_sweep_interval_seconds, _SWEEP_LOCK_KEY)
+
+
+if __name__ == "__main__":
+    from src.utils.db import SessionLocal
+    from src.models.compression_dictionaries import CompressionDictionary
+
+    parser = argparse.ArgumentParser(description="Delete expired guest accounts and their data")
+    parser.add_argument("--batch-size", type=int, default=settings.guest_sweep_batch_size)
+    parser.add_argument("--pause-ms", type=int, default=settings.guest_sweep_pause_ms)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        sweep_expired_guests(db, batch_size=args.batch_size, pause_ms=args.pause_ms)
@@ -0,0 +1,50 @@
+"""
+Partition rotation for the time-partitioned event tables.
+
+Creates the next PARTITION_PREMAKE partitions of llm_requests and
+resume_rate_limits and drops (or detaches, with PARTITION_RETENTION_ACTION=
+detach) partitions older than LLM_REQUESTS_RETENTION_DAYS /
+RESUME_RATE_LIMITS_RETENTION_DAYS. The API runs it every
+PARTITION_ROTATION_SECONDS (partition_rotator, started in src/main.py); it
+can also be run by hand:
+
+    python -m src.jobs.partition_rotation
+"""
+from typing import Dict, List
+
+from sqlalchemy.engine import Engine
+
+from src.core.config import settings
+from src.core.logger import get_logger
+from src.jobs.periodic import PeriodicJob
+from src.utils.partitioning import PARTITIONED_TABLES, rotate_partitions
+
+logger = get_logger(__name__)
+
+_ROTATION_LOCK_KEY = 0x70617274  # "part"
+
+
+def rotate_all(engine: Engine) -> Dict[str, Dict[str, List[str]]]:
+    results = {}
+    for table_name in PARTITIONED_TABLES:
+        with engine.begin() as conn:
+            results[table_name] = rotate_partitions(conn, table_name)
+        logger.info(
+            f"Rotated {table_name}: created {results[table_name]['created']}, "
+            f"expired {results[table_name]['expired']}"
+        )
+    return results
+
+
+def _rotate() -> None:
+    from src.utils.db import engine
+    rotate_all(engine)
+
+
+partition_rotator = PeriodicJob("partition-rotation", _rotate, settings.partition_rotation_seconds, _ROTATION_LOCK_KEY)
+
+
+if __name__ == "__main__":
+    from src.utils.db import engine
+
+    rotate_all(engine)
@@ -0,0 +1,92 @@
+"""
+Run a maintenance job periodically from the API process.
+
+A PeriodicJob runs its job on a background thread every `interval_seconds`
+(0 disables it). When several workers run the same job, a Postgres advisory
+lock lets one of them through per run and the others skip it. The lock is
+held by a connection that is not in a transaction, so waiting on the job
+holds no snapshot.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import text
+
+from src.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class PeriodicJob:
+    def __init__(self, name: str, job: Callable[[], Any], interval_seconds: float, lock_key: int, engine=None):
+        self.name = name
+        self.job = job
+        self.interval_seconds = interval_seconds
+        self.lock_key = lock_key
+        self._engine = engine
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.runs = 0
+        self.skipped = 0
+        self.failed = 0
+        self.last_run_at: Optional[float] = None
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            from src.utils.db import engine
+            self._engine = engine
+        return self._engine
+
+    def start(self) -> None:
+        if self.interval_seconds <= 0:
+            return
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.interval_seconds):
+            try:
+                self.run_once()
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"{self.name} failed: {e}")
+
+    def run_once(self) -> bool:
+        """Run the job unless another worker is running it; returns whether it ran"""
+        if self.engine.dialect.name != "postgresql":
+            self._call()
+            return True
+        with self.engine.connect() as conn:
+            locked = conn.scalar(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.lock_key})
+            conn.commit()
+            if not locked:
+                self.skipped += 1
+                return False
+            try:
+                self._call()
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.lock_key})
+                conn.commit()
+        return True
+
+    def _call(self) -> None:
+        self.job()
+        self.runs += 1
+        self.last_run_at = time.time()
+
+    def close(self, timeout: float = 10.0) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "last_run_seconds_ago": round(time.time() - self.last_run_at) if self.last_run_at else None,
+        }
@@ -0,0 +1,102 @@
+"""
+Measure the prompt budget against stored resumes.
+
+Rebuilds the prompt of the most recent generated resumes from their profile
+and job description, fits each one to LLM_PROMPT_BUDGET_TOKENS and reports
+prompt tokens before and after (mean, p50, p95), how many prompts were cut
+and how many would be rejected. Nothing is sent to the model and nothing is
+written. Profiles are read as they are now, not as they were when the resume
+was generated.
+
+    python -m src.jobs.prompt_budget_report [--limit N]
+"""
+import argparse
+import math
+from typing import Dict, List
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.core.logger import get_logger
+from src.models.generated_resumes import GeneratedResume
+from src.models.job_descriptions import JobDescription
+from src.services.prompt_budget import PromptBudgeter, PromptTooLarge
+
+logger = get_logger(__name__)
+
+LIMIT = 1000
+
+
+def _percentile(values: List[int], pct: float) -> int:
+    if not values:
+        return 0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, math.ceil(len(ordered) * pct) - 1)]
+
+
+def _summary(values: List[int]) -> Dict[str, float]:
+    return {
+        "mean": round(sum(values) / len(values), 1) if values else 0,
+        "p50": _percentile(values, 0.5),
+        "p95": _percentile(values, 0.95),
+    }
+
+
+def report_prompt_budget(db: Session, limit: int = LIMIT) -> Dict[str, object]:
+    from src.services.resume_service import ResumeService
+
+    service = ResumeService()
+    llm_client = service.llm_client
+    budgeter = PromptBudgeter()
+    rows = db.execute(
+        select(GeneratedResume.user_id, GeneratedResume.profile_id, JobDescription.content)
+        .join(JobDescription, JobDescription.id == GeneratedResume.job_description_id)
+        .order_by(GeneratedResume.id.desc())
+        .limit(limit)
+    ).all()
+
+    before, after = [], []
+    rejected, missing = 0, 0
+    for user_id, profile_id, job_description in rows:
+        try:
+            profile_data = service._get_profile_data(user_id, profile_id, db)
+        except ValueError:
+            missing += 1
+            continue
+        try:
+            _, _, report = budgeter.fit(
+                profile_data,
+                job_description,
+                lambda data: llm_client._messages(data, job_description),
+                llm_client.model
+            )
+        except PromptTooLarge:
+            rejected += 1
+            continue
+        before.append(report.tokens_before)
+        after.append(report.tokens_after)
+
+    stats = budgeter.stats()
+    result = {
+        "prompts": len(before),
+        "cut": stats["cut_prompts"],
+        "rejected": rejected,
+        "missing_profiles": missing,
+        "tokens_before": _summary(before),
+        "tokens_after": _summary(after),
+        "reduction_pct": stats["reduction_pct"],
+    }
+    logger.info(f"Prompt budget report over {len(rows)} resumes (budget {budgeter.budget}): {result}")
+    return result
+
+
+if __name__ == "__main__":
+    from src.utils.db import SessionLocal
+    from src.models.compression_dictionaries import CompressionDictionary
+
+    parser = argparse.ArgumentParser(description="Measure prompt tokens before and after the prompt budget")
+    parser.add_argument("--limit", type=int, default=LIMIT)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        report_prompt_budget(db, limit=args.limit)
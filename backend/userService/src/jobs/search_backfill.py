@@ -0,0 +1,84 @@
+"""
+Backfill the full-text search columns of generated resumes.
+
+Resumes generated before search existed have no content_text/search_vector
+and never show up in /resumes/search. This walks them in id order, extracts
+the plain text from each LaTeX body in the blob store and writes both
+columns, one transaction per batch. Safe to rerun; it only touches rows
+that are still NULL.
+
+    python -m src.jobs.search_backfill [--batch-size N]
+"""
+import argparse
+from typing import Dict
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+
+from src.core.logger import get_logger
+from src.models.generated_resumes import GeneratedResume
+from src.models.job_descriptions import JobDescription
+from src.utils.search import latex_to_text, search_vector
+
+logger = get_logger(__name__)
+
+BATCH_SIZE = 200
+
+
+def backfill_search(db: Session, batch_size: int = BATCH_SIZE) -> Dict[str, int]:
+    """Fill search columns for rows that have none; returns counters"""
+    table = GeneratedResume.__table__
+    job_description = (
+        select(JobDescription.content)
+        .where(JobDescription.id == table.c.job_description_id)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(table)
+        .where(table.c.id == bindparam("resume_id"))
+        .values(
+            content_text=bindparam("text"),
+            search_vector=search_vector(job_description, bindparam("text"))
+        )
+    )
+
+    updated, missing, last_id = 0, 0, 0
+    while True:
+        resumes = db.scalars(
+            select(GeneratedResume)
+            .where(GeneratedResume.search_vector.is_(None), GeneratedResume.id > last_id)
+            .order_by(GeneratedResume.id)
+            .limit(batch_size)
+        ).all()
+        if not resumes:
+            break
+        last_id = resumes[-1].id
+
+        params = []
+        for resume in resumes:
+            try:
+                text = latex_to_text(resume.latex_content)
+            except FileNotFoundError:
+                # Still indexed by its job description
+                logger.warning(f"LaTeX blob {resume.latex_digest} missing for resume {resume.id}")
+                missing += 1
+                text = ""
+            params.append({"resume_id": resume.id, "text": text})
+        db.execute(stmt, params)
+        db.commit()
+        updated += len(params)
+
+    logger.info(f"Search backfill indexed {updated} resumes ({missing} without a LaTeX blob)")
+    return {"updated": updated, "missing_blobs": missing}
+
+
+if __name__ == "__main__":
+    from src.utils.db import SessionLocal
+    from src.models.compression_dictionaries import CompressionDictionary
+
+    parser = argparse.ArgumentParser(description="Index older resumes for full-text search")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        backfill_search(db, batch_size=args.batch_size)
@@ -0,0 +1,129 @@
+"""
+Incremental aggregator for the LLM usage rollups.
+
+Folds llm_requests rows newer than the stored watermark into
+llm_usage_hourly and llm_usage_daily with one INSERT ... SELECT ... ON
+CONFLICT DO UPDATE per rollup, then advances the watermark in the same
+transaction, so every row is counted exactly once. Rows are only picked up
+once they are USAGE_ROLLUP_LAG_SECONDS old, which leaves time for in-flight
+transactions to commit; work is split into USAGE_ROLLUP_WINDOW_HOURS windows,
+each its own transaction.
+
+    python -m src.jobs.usage_rollup
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import Integer, cast, func, literal_column, select
+from sqlalchemy.dialects.postgresql import ARRAY, array, insert
+from sqlalchemy.orm import Session
+
+from src.core.config import settings
+from src.core.logger import get_logger
+from src.models.llm_requests import LLMRequest
+from src.models.llm_usage import LATENCY_BUCKETS_MS, LLMUsageDaily, LLMUsageHourly, UsageRollupWatermark
+
+logger = get_logger(__name__)
+
+WATERMARK_NAME = "llm_requests"
+ROLLUPS = ((LLMUsageHourly, "hour"), (LLMUsageDaily, "day"))
+ADDITIVE = ("calls", "errors", "prompt_tokens", "completion_tokens", "total_tokens", "cached_tokens", "latency_sum_ms")
+
+
+def _latency_histogram():
+    bucket = func.width_bucket(LLMRequest.response_time_ms, array(LATENCY_BUCKETS_MS))
+    return cast(
+        array([func.count().filter(bucket == index) for index in range(len(LATENCY_BUCKETS_MS) + 1)]),
+        ARRAY(Integer)
+    )
+
+
+def _fold(db: Session, model, grain: str, after: datetime, upto: datetime) -> int:
+    """Add llm_requests rows in (after, upto] to `model`; returns buckets touched"""
+    bucket = func.date_trunc(grain, LLMRequest.request_time, "UTC")
+    source = (
+        select(
+            bucket,
+            LLMRequest.user_id,
+            LLMRequest.model_used,
+            func.count(),
+            func.count().filter(LLMRequest.status != "success"),
+            func.coalesce(func.sum(LLMRequest.prompt_tokens), 0),
+            func.coalesce(func.sum(LLMRequest.completion_tokens), 0),
+            func.coalesce(func.sum(LLMRequest.total_tokens), 0),
+            func.coalesce(func.sum(LLMRequest.cached_tokens), 0),
+            func.coalesce(func.sum(LLMRequest.response_time_ms), 0),
+            _latency_histogram(),
+        )
+        .where(LLMRequest.request_time > after, LLMRequest.request_time <= upto)
+        .group_by(bucket, LLMRequest.user_id, LLMRequest.model_used)
+    )
+    stmt = insert(model).from_select(
+        ["bucket", "user_id", "model_used", *ADDITIVE, "latency_histogram"], source
+    )
+    table = model.__tablename__
+    set_ = {column: getattr(model, column) + stmt.excluded[column] for column in ADDITIVE}
+    set_["latency_histogram"] = literal_column(
+        f"ARRAY(SELECT a + b FROM unnest({table}.latency_histogram, excluded.latency_histogram) "
+        f"WITH ORDINALITY AS h(a, b, i) ORDER BY i)"
+    )
+    stmt = stmt.on_conflict_do_update(index_elements=["bucket", "user_id", "model_used"], set_=set_)
+    return db.execute(stmt).rowcount
+
+
+def _lock_watermark(db: Session) -> Optional[datetime]:
+    """Lock the watermark row (one aggregator at a time) and return its value"""
+    db.execute(
+        insert(UsageRollupWatermark)
+        .values(name=WATERMARK_NAME, watermark=None)
+        .on_conflict_do_nothing()
+    )
+    watermark = db.scalar(
+        select(UsageRollupWatermark.watermark)
+        .where(UsageRollupWatermark.name == WATERMARK_NAME)
+        .with_for_update()
+    )
+    if watermark is None:
+        # First run: start just before the oldest row still retained
+        oldest = db.scalar(select(func.min(LLMRequest.request_time)))
+        return oldest - timedelta(microseconds=1) if oldest else None
+    return watermark
+
+
+def _advance_watermark(db: Session, watermark: datetime) -> None:
+    db.query(UsageRollupWatermark).filter(
+        UsageRollupWatermark.name == WATERMARK_NAME
+    ).update({"watermark": watermark}, synchronize_session=False)
+
+
+def aggregate_usage(db: Session, now: Optional[datetime] = None) -> Dict[str, int]:
+    """Fold everything between the watermark and now - lag into the rollups"""
+    upto = (now or datetime.now(timezone.utc)) - timedelta(seconds=settings.usage_rollup_lag_seconds)
+    window = timedelta(hours=settings.usage_rollup_window_hours)
+    counts = {model.__tablename__: 0 for model, _ in ROLLUPS}
+    windows = 0
+
+    while True:
+        after = _lock_watermark(db)
+        if after is None or after >= upto:
+            if after is None:
+                _advance_watermark(db, upto)
+            db.commit()
+            break
+        until = min(after + window, upto)
+        for model, grain in ROLLUPS:
+            counts[model.__tablename__] += _fold(db, model, grain, after, until)
+        _advance_watermark(db, until)
+        db.commit()
+        windows += 1
+
+    logger.info(f"Usage rollup processed {windows} windows up to {upto.isoformat()}: {counts}")
+    return dict(counts, windows=windows)
+
+
+if __name__ == "__main__":
+    from src.utils.db import SessionLocal
+    from src.models.users import User
+
+    with SessionLocal() as db:
+        aggregate_usage(db)
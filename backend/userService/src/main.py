@@ -1,9 +1,21 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from src.core.config import settings
-from src.routes import user, auth, profiles, skills, projects, experience, education, resumes
+from src.routes import user, auth, profiles, skills, projects, experience, education, resumes, usage
 from src.utils.db import Base, engine
+from src.utils.schema import upgrade_schema
+from src.services.telemetry import telemetry_writer
+from src.utils.password_pool import password_pool
+from src.services.guest_pool import guest_pool_filler
+from src.middleware.rate_limit import RateLimitMiddleware, request_limiter
+from src.services.llm_scheduler import llm_scheduler
+from src.services.token_budget import token_budgets
+from src.services.prompt_budget import prompt_budgeter
+from src.services.completion_budget import completion_budget
+from src.jobs.partition_rotation import partition_rotator
+from src.jobs.guest_sweeper import guest_sweeper
 from src.models.users import User
 from src.models.profiles import Profile
 from src.models.skills import Skill
@@ -11,30 +23,65 @@ from src.models.projects import Project
 from src.models.experience import Experience
 from src.models.education import Education
 from src.models.generated_resumes import GeneratedResume
+from src.models.job_descriptions import JobDescription
+from src.models.compression_dictionaries import CompressionDictionary
 from src.models.llm_requests import LLMRequest
+from src.models.resume_rate_limit import ResumeRateLimit
+from src.models.llm_usage import LLMUsageHourly, LLMUsageDaily, UsageRollupWatermark
+from src.models.token_revocations import TokenRevocation
+from src.models.quota_windows import QuotaWindow
+from src.models.token_usage import TokenUsageDaily
+from src.utils.user_cache import user_cache
+from src.utils.revocation import token_revocations
 
 
 Base.metadata.create_all(bind=engine)
+upgrade_schema(engine)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    telemetry_writer.start()
+    guest_pool_filler.start()
+    token_budgets.start()
+    completion_budget.start()
+    partition_rotator.start()
+    guest_sweeper.start()
+    yield
+    guest_sweeper.close()
+    partition_rotator.close()
+    completion_budget.close()
+    token_budgets.close()
+    guest_pool_filler.close()
+    telemetry_writer.close()
+    password_pool.close()
+
 
 app = FastAPI(
     title=settings.app_name,
     description="API for managing users, profiles, and resume components for AI-powered resume generation.",
     version=settings.app_version,
-    debug=settings.debug
+    debug=settings.debug,
+    lifespan=lifespan
 )
 
+# Added before CORS so CORS wraps it and 429/503 responses carry CORS headers
+app.add_middleware(RateLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.get_cors_origins_list,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Link", "X-Next-Cursor", "Retry-After", "X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset"],
 )
 
 app.include_router(auth.router)
 app.include_router(user.router)
 app.include_router(profiles.router)
 app.include_router(resumes.router)
+app.include_router(usage.router)
 app.include_router(skills.router, prefix="/profiles/{profile_id}/skills", tags=["Profile Skills"])
 app.include_router(experience.router, prefix="/profiles/{profile_id}/experience", tags=["Profile Experience"])
 app.include_router(education.router, prefix="/profiles/{profile_id}/education", tags=["Profile Education"])
@@ -54,6 +101,20 @@ def health_check():
             "status": "healthy",
             "environment": settings.environment,
             "app": settings.app_name,
-            "version": settings.app_version
+            "version": settings.app_version,
+            "telemetry": telemetry_writer.stats(),
+            "guest_pool": guest_pool_filler.stats(),
+            "rate_limit": request_limiter.stats(),
+            "llm_scheduler": llm_scheduler.stats(),
+            "token_budgets": token_budgets.stats(),
+            "prompt_budget": prompt_budgeter.stats(),
+            "completion_budget": completion_budget.stats(),
+            "partition_rotation": partition_rotator.stats(),
+            "guest_sweeper": guest_sweeper.stats(),
+            "auth": {
+                "user_cache": user_cache.stats(),
+                "revocations": token_revocations.stats(),
+                "password_pool": password_pool.stats()
+            }
         }
     )
@@ -0,0 +1,220 @@
+"""
+Per-client request rate limiting and load shedding.
+
+A pure ASGI middleware, so a rejected request costs no routing, no body
+parsing and no database connection. Every request falls into a route group
+(auth, generate, write, read). Each group has token buckets per client IP
+and per user, refilled at RATE_LIMIT_GROUPS requests per minute with a burst
+of one minute's worth. A request takes a token from both buckets or from
+neither, and gets a 429 with Retry-After when either one is empty. The user
+comes from the bearer token's claims. A token that fails to verify counts as
+anonymous, so forged tokens cannot mint fresh buckets.
+
+Before any of that, requests are shed with a 503 and Retry-After when the
+process is saturated:
+- Enough requests are in flight to use every database connection, and
+  LOAD_SHED_DB_MAX_WAITING more would already be waiting for one.
+- For resume generation, the LLM scheduler's queue is full (see
+  src/services/llm_scheduler.py).
+
+Buckets and counters are per process. All state is touched only from the
+event loop with no await in between, so no lock is needed.
+"""
+import json
+import logging
+import math
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from src.core.config import settings
+from src.services.llm_scheduler import llm_scheduler
+from src.utils.security import decode_token
+
+logger = logging.getLogger(__name__)
+
+EXEMPT_PATHS = {"/", "/health", "/docs", "/redoc", "/openapi.json", "/docs/oauth2-redirect"}
+
+
+@dataclass(frozen=True)
+class RouteGroup:
+    name: str
+    pattern: "re.Pattern"
+    methods: Optional[frozenset] = None  # None matches any method
+    uses_llm: bool = False
+
+
+# First match wins
+ROUTE_GROUPS: List[RouteGroup] = [
+    RouteGroup("auth", re.compile(r"^/auth/(token|register|guest-login)$"), frozenset({"POST"})),
+    RouteGroup("generate", re.compile(r"^/resumes/generate$"), frozenset({"POST"}), uses_llm=True),
+    RouteGroup("write", re.compile(r"^/"), frozenset({"POST", "PUT", "PATCH", "DELETE"})),
+    RouteGroup("read", re.compile(r"^/")),
+]
+
+
+def route_group(method: str, path: str) -> Optional[RouteGroup]:
+    if path in EXEMPT_PATHS or method == "OPTIONS":
+        return None
+    for group in ROUTE_GROUPS:
+        if (group.methods is None or method in group.methods) and group.pattern.match(path):
+            return group
+    return None
+
+
+class TokenBuckets:
+    """Token buckets keyed by string in a bounded LRU map"""
+
+    def __init__(self, max_keys: int = settings.rate_limit_max_keys):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()  # key -> [tokens, updated_at]
+
+    def _refill(self, key: str, per_minute: int, now: float) -> List[float]:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [float(per_minute), now]
+            self._buckets[key] = bucket
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(float(per_minute), bucket[0] + (now - bucket[1]) * per_minute / 60)
+            bucket[1] = now
+        return bucket
+
+    def take(self, limits: List[Tuple[str, int]], now: float) -> float:
+        """
+        Take one token from every (key, per_minute) bucket, or from none.
+        Returns 0 if taken, else the seconds until all of them have a token.
+        """
+        buckets = [(self._refill(key, per_minute, now), per_minute) for key, per_minute in limits]
+        wait = max((((1 - bucket[0]) * 60 / per_minute) for bucket, per_minute in buckets if bucket[0] < 1), default=0.0)
+        if wait:
+            return wait
+        for bucket, _ in buckets:
+            bucket[0] -= 1
+        return 0.0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class RequestLimiter:
+    """Admission decisions and counters shared by the middleware"""
+
+    def __init__(self):
+        self.buckets = TokenBuckets()
+        self.groups = settings.get_rate_limit_groups
+        self.in_flight = 0
+        self.limited: Dict[str, int] = {}
+        self.shed_db = 0
+        self.shed_llm = 0
+
+    def _client_ip(self, scope) -> str:
+        if settings.rate_limit_trust_forwarded:
+            for name, value in scope.get("headers", []):
+                if name == b"x-forwarded-for":
+                    return value.decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    def _user_key(self, scope) -> Optional[str]:
+        for name, value in scope.get("headers", []):
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() != "bearer" or not token:
+                    return None
+                payload = decode_token(token.strip())
+                if not payload:
+                    return None
+                subject = payload.get("uid") or payload.get("sub")
+                return str(subject) if subject is not None else None
+        return None
+
+    def _db_saturated(self) -> bool:
+        # Routes hold their session's connection until they finish, so every
+        # request in flight beyond the pool's capacity is one queued on it.
+        # Counting at admission also catches bursts that arrive before any of
+        # them has checked a connection out.
+        capacity = settings.sqlalchemy_pool_size + settings.sqlalchemy_max_overflow
+        return self.in_flight - capacity >= settings.load_shed_db_max_waiting
+
+    def admit(self, scope, group: RouteGroup) -> Optional[Tuple[int, str, int]]:
+        """None to let the request through, else (status, detail, retry_after)"""
+        if group.uses_llm and llm_scheduler.saturated():
+            self.shed_llm += 1
+            return 503, "Resume generation is busy, please retry shortly", settings.load_shed_retry_after_seconds
+        if self._db_saturated():
+            self.shed_db += 1
+            return 503, "Service is busy, please retry shortly", settings.load_shed_retry_after_seconds
+
+        ip_per_minute, user_per_minute = self.groups.get(group.name, (0, 0))
+        limits = []
+        if ip_per_minute:
+            limits.append((f"{group.name}:ip:{self._client_ip(scope)}", ip_per_minute))
+        if user_per_minute:
+            user_key = self._user_key(scope)
+            if user_key is not None:
+                limits.append((f"{group.name}:user:{user_key}", user_per_minute))
+        wait = self.buckets.take(limits, time.monotonic()) if limits else 0.0
+        if wait:
+            self.limited[group.name] = self.limited.get(group.name, 0) + 1
+            return 429, "Too many requests, please slow down", max(1, math.ceil(wait))
+        return None
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "in_flight": self.in_flight,
+            "buckets": len(self.buckets),
+            "limited": dict(self.limited),
+            "shed_db": self.shed_db,
+            "shed_llm": self.shed_llm,
+        }
+
+
+request_limiter = RequestLimiter()
+
+
+class RateLimitMiddleware:
+    def __init__(self, app, limiter: RequestLimiter = request_limiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.rate_limit_enabled:
+            await self.app(scope, receive, send)
+            return
+        group = route_group(scope["method"], scope["path"])
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+
+        rejection = self.limiter.admit(scope, group)
+        if rejection is not None:
+            status, detail, retry_after = rejection
+            if status == 503:
+                logger.debug(f"Shedding {scope['method']} {scope['path']}: {detail}")
+            await self._reject(send, status, detail, retry_after)
+            return
+
+        self.limiter.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.in_flight -= 1
+
+    @staticmethod
+    async def _reject(send, status: int, detail: str, retry_after: int) -> None:
+        body = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,22 @@
+from datetime import datetime
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, LargeBinary, DateTime, Integer, func
+from src.utils.db import Base
+
+
+class CompressionDictionary(Base):
+    """
+    zstd dictionary used to compress stored LaTeX bodies. Rows are immutable:
+    editing the template creates a new dictionary and older resumes keep
+    decompressing with the one they were written with.
+    """
+    __tablename__ = "compression_dictionaries"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    content_hash: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)  # sha256 hex
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
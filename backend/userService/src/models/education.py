@@ -1,14 +1,17 @@
 from typing import List, Optional
 from datetime import datetime, date
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, func, DateTime, ForeignKey, Integer, Date, Text
+from sqlalchemy import String, func, DateTime, ForeignKey, Integer, Index, Date, Text
 from src.utils.db import Base
 
 class Education(Base):
     __tablename__ = "education"
+    __table_args__ = (
+        Index("ix_education_profile_id_id", "profile_id", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    profile_id: Mapped[int] = mapped_column(ForeignKey("profiles.id"), nullable=False)
+    profile_id: Mapped[int] = mapped_column(ForeignKey("profiles.id", ondelete="CASCADE"), nullable=False)
     institution: Mapped[str] = mapped_column(String(255), nullable=False)
     degree: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
     field_of_study: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
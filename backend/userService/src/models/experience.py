@@ -1,15 +1,18 @@
 from typing import List, Optional
 from datetime import datetime, date
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, func, DateTime, ForeignKey, Integer, Date, Text
+from sqlalchemy import String, func, DateTime, ForeignKey, Integer, Index, Date, Text
 from src.utils.db import Base
 
 
 class Experience(Base):
     __tablename__ = "experience"
+    __table_args__ = (
+        Index("ix_experience_profile_id_id", "profile_id", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    profile_id: Mapped[int] = mapped_column(ForeignKey("profiles.id"), nullable=False)
+    profile_id: Mapped[int] = mapped_column(ForeignKey("profiles.id", ondelete="CASCADE"), nullable=False)
     company: Mapped[str] = mapped_column(String(255), nullable=False)
     position: Mapped[str] = mapped_column(String(100), nullable=False)
     start_date: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
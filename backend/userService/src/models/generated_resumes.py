@@ -1,17 +1,31 @@
+from typing import Iterator, Optional
 from datetime import datetime
-from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import Text, DateTime, Integer, func, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import String, Text, DateTime, Integer, func, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from src.utils.db import Base
+from src.utils.blob_store import get_blob_store
+from src.utils.compression import decompress_text, iter_decompressed, resolve_dictionary
 
 
 class GeneratedResume(Base):
     __tablename__ = "generated_resumes"
+    __table_args__ = (
+        Index("ix_generated_resumes_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_generated_resumes_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
-    profile_id: Mapped[int] = mapped_column(ForeignKey("profiles.id"), nullable=False)
-    job_description: Mapped[str] = mapped_column(Text, nullable=False)
-    latex_content: Mapped[str] = mapped_column(Text, nullable=False)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    profile_id: Mapped[int] = mapped_column(ForeignKey("profiles.id", ondelete="CASCADE"), nullable=False, index=True)
+    job_description_id: Mapped[int] = mapped_column(ForeignKey("job_descriptions.id"), nullable=False, index=True)
+    latex_digest: Mapped[str] = mapped_column(String(64), nullable=False, index=True)  # zstd frame in the blob store
+    latex_dictionary_id: Mapped[Optional[int]] = mapped_column(ForeignKey("compression_dictionaries.id"), nullable=True)
+    latex_content_size: Mapped[int] = mapped_column(Integer, nullable=False)  # uncompressed characters
+    pdf_digest: Mapped[Optional[str]] = mapped_column(String(64), nullable=True, index=True)
+    # Full-text search (src/utils/search.py); NULL until src.jobs.search_backfill reaches older rows
+    content_text: Mapped[Optional[str]] = mapped_column(Text, nullable=True, deferred=True)
+    search_vector: Mapped[Optional[str]] = mapped_column(TSVECTOR, nullable=True, deferred=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), 
         server_default=func.now(), 
@@ -22,4 +36,28 @@ class GeneratedResume(Base):
         server_default=func.now(),
         onupdate=func.now(), 
         nullable=False
-    )
\ No newline at end of file
+    )
+
+    job_description_ref: Mapped["JobDescription"] = relationship(lazy="joined")
+    latex_dictionary: Mapped[Optional["CompressionDictionary"]] = relationship()
+
+    @property
+    def job_description(self) -> str:
+        return self.job_description_ref.content
+
+    @property
+    def latex_content(self) -> str:
+        """LaTeX body, read from the blob store and decompressed on access"""
+        return decompress_text(
+            get_blob_store().read(self.latex_digest),
+            self.latex_dictionary_id,
+            lambda: self.latex_dictionary.data
+        )
+
+    def iter_latex_chunks(self) -> Iterator[bytes]:
+        """
+        Stream the decompressed LaTeX body in bounded chunks. The dictionary is
+        resolved here so the stream does not need the DB session later on.
+        """
+        dictionary = resolve_dictionary(self.latex_dictionary_id, lambda: self.latex_dictionary.data)
+        return iter_decompressed(get_blob_store().open(self.latex_digest), dictionary)
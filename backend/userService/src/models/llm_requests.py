@@ -1,14 +1,20 @@
 from typing import Optional
 from datetime import datetime
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, Integer, DateTime, func, ForeignKey
+from sqlalchemy import String, Integer, DateTime, func, ForeignKey, Index
 from src.utils.db import Base
+from src.utils.partitioning import partition_by
 
 class LLMRequest(Base):
     __tablename__ = "llm_requests"
+    __table_args__ = (
+        Index("ix_llm_requests_user_id_request_time", "user_id", "request_time"),
+        {"postgresql_partition_by": partition_by("llm_requests")},
+    )
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    # The partition key has to be part of the primary key
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     prompt_tokens: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     completion_tokens: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     total_tokens: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
@@ -16,7 +22,16 @@ class LLMRequest(Base):
     request_time: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), 
         server_default=func.now(), 
-        nullable=False
+        primary_key=True
     )
     response_time_ms: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
-    status: Mapped[str] = mapped_column(String(20), nullable=False)  # 'success', 'failed', 'timeout' 
\ No newline at end of file
+    status: Mapped[str] = mapped_column(String(20), nullable=False)  # 'success', 'failed', 'timeout'
+    # Prompt tokens removed to fit the prompt budget (src/services/prompt_budget.py)
+    prompt_tokens_cut: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    # Completion budget sent with the call, and why it stopped ('stop', 'length' when cut off at max_tokens)
+    max_tokens: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    finish_reason: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
+    # Static prompt prefix the call was built with (PROMPT_VERSION in src/services/llm_client.py)
+    prompt_version: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
+    # Prompt tokens the provider served from its prefix cache
+    cached_tokens: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
\ No newline at end of file
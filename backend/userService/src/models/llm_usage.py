@@ -0,0 +1,53 @@
+"""
+Pre-aggregated LLM usage, maintained by src/jobs/usage_rollup.py from llm_requests
+"""
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, Integer, BigInteger, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import ARRAY
+from src.utils.db import Base
+
+# Upper bounds (ms) of the latency histogram buckets; one extra bucket counts
+# everything slower. Histograms add element-wise, so buckets merge exactly
+# and percentiles are derived when reading.
+LATENCY_BUCKETS_MS = (
+    100, 250, 500, 750, 1000, 1500, 2000, 3000, 4000, 5000,
+    7500, 10000, 15000, 20000, 30000, 45000, 60000, 120000,
+)
+
+
+class _UsageRollup:
+    bucket: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    model_used: Mapped[str] = mapped_column(String(50), primary_key=True)
+    calls: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    errors: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    prompt_tokens: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    completion_tokens: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    total_tokens: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    cached_tokens: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0, server_default="0")
+    latency_sum_ms: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    latency_histogram: Mapped[List[int]] = mapped_column(ARRAY(Integer), nullable=False)
+
+
+class LLMUsageHourly(_UsageRollup, Base):
+    __tablename__ = "llm_usage_hourly"
+    __table_args__ = (
+        Index("ix_llm_usage_hourly_user_id_bucket", "user_id", "bucket"),
+    )
+
+
+class LLMUsageDaily(_UsageRollup, Base):
+    __tablename__ = "llm_usage_daily"
+    __table_args__ = (
+        Index("ix_llm_usage_daily_user_id_bucket", "user_id", "bucket"),
+    )
+
+
+class UsageRollupWatermark(Base):
+    """llm_requests rows with request_time <= watermark are already aggregated (NULL: nothing yet)"""
+    __tablename__ = "usage_rollup_watermarks"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    watermark: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -1,23 +1,26 @@
 from typing import List, Optional
 from datetime import datetime
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String,func,DateTime, ForeignKey
+from sqlalchemy import String,func,DateTime, ForeignKey, Index
 from src.utils.db import Base
 
 class Profile(Base):
     __tablename__ = "profiles"
+    __table_args__ = (
+        Index("ix_profiles_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
     name: Mapped[str] = mapped_column(String(100),nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True),server_default=func.now(),nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True),server_default=func.now(),onupdate = func.now(),nullable=False)
 
     user: Mapped["User"] = relationship(back_populates="profiles")
-    education: Mapped[List["Education"]] = relationship(back_populates="profile", cascade="all, delete-orphan")
-    experience: Mapped[List["Experience"]] = relationship(back_populates="profile", cascade="all, delete-orphan")
-    projects: Mapped[List["Project"]] = relationship(back_populates="profile", cascade="all, delete-orphan")
-    skills: Mapped[List["Skill"]] = relationship(back_populates="profile", cascade="all, delete-orphan")
+    education: Mapped[List["Education"]] = relationship(back_populates="profile", cascade="all, delete-orphan", passive_deletes=True)
+    experience: Mapped[List["Experience"]] = relationship(back_populates="profile", cascade="all, delete-orphan", passive_deletes=True)
+    projects: Mapped[List["Project"]] = relationship(back_populates="profile", cascade="all, delete-orphan", passive_deletes=True)
+    skills: Mapped[List["Skill"]] = relationship(back_populates="profile", cascade="all, delete-orphan", passive_deletes=True)
 
     
 
@@ -0,0 +1,18 @@
+from typing import List
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, Float
+from sqlalchemy.dialects.postgresql import ARRAY
+from src.utils.db import Base
+
+
+class QuotaWindow(Base):
+    """
+    Sliding-window log of one quota key for the shared quota backend
+    (src/utils/quota.py): epoch seconds of the hits still inside the window.
+    Unlogged, as the backend reseeds lost keys from resume_rate_limits.
+    """
+    __tablename__ = "quota_windows"
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
+    key: Mapped[str] = mapped_column(String(100), primary_key=True)
+    hits: Mapped[List[float]] = mapped_column(ARRAY(Float), nullable=False)
@@ -4,21 +4,27 @@ Model for tracking resume generation rate limits
 from typing import Optional
 from datetime import datetime
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import Integer, DateTime, func, ForeignKey
+from sqlalchemy import Integer, DateTime, func, ForeignKey, Index
 from src.utils.db import Base
+from src.utils.partitioning import partition_by
 
 
 class ResumeRateLimit(Base):
     
     __tablename__ = "resume_rate_limits"
+    __table_args__ = (
+        Index("ix_resume_rate_limits_user_id_created_at", "user_id", "created_at"),
+        {"postgresql_partition_by": partition_by("resume_rate_limits")},
+    )
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
-    profile_id: Mapped[int] = mapped_column(ForeignKey("profiles.id"), nullable=False)
+    # The partition key has to be part of the primary key
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    profile_id: Mapped[int] = mapped_column(ForeignKey("profiles.id", ondelete="CASCADE"), nullable=False, index=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), 
         server_default=func.now(), 
-        nullable=False
+        primary_key=True
     )
 
     def __repr__(self):
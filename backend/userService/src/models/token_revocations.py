@@ -0,0 +1,22 @@
+from datetime import datetime
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, DateTime, func
+from src.utils.db import Base
+
+
+class TokenRevocation(Base):
+    """
+    Revoked access tokens, keyed by their jti, plus one "user:<id>" row per
+    forced expiry so every worker drops that user from its cache. Rows are
+    only needed until expires_at, the expiry of the token they revoke.
+    """
+    __tablename__ = "token_revocations"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+    revoked_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+        index=True
+    )
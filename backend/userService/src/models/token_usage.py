@@ -0,0 +1,29 @@
+from datetime import date, datetime
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import BigInteger, Date, DateTime, ForeignKey, Index, func
+from src.utils.db import Base
+
+
+class TokenUsageDaily(Base):
+    """
+    LLM tokens used per user and UTC day, for token budgets
+    (src/services/token_budget.py). Workers flush their counters here and
+    reconcile them against llm_requests.total_tokens. Monthly usage is the
+    sum of the month's days.
+    """
+    __tablename__ = "token_usage_daily"
+    __table_args__ = (
+        Index("ix_token_usage_daily_user_id_day", "user_id", "day"),
+    )
+
+    # Day first: delete_in_batches keys on the first primary key column, so
+    # retention deletes whole days at a time
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    tokens: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False
+    )
@@ -1,12 +1,18 @@
 from typing import List, Optional
 from datetime import datetime
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String,func,DateTime
+from sqlalchemy import String,func,DateTime, Index, text
 from src.utils.db import Base
 
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Partial index: the guest sweeper only ever scans expired guests
+        Index("ix_users_guest_expires_at", "guest_expires_at", postgresql_where=text("is_guest")),
+        # Unclaimed accounts of the guest pool (src/services/guest_pool.py)
+        Index("ix_users_guest_pool", "id", postgresql_where=text("is_guest AND guest_expires_at IS NULL")),
+    )
 
     id : Mapped[int] = mapped_column(primary_key=True)
     username: Mapped[str] = mapped_column(String(50),unique=True,index=True,nullable=False)
@@ -21,8 +27,15 @@ class User(Base):
     is_guest: Mapped[bool] = mapped_column(default=False, nullable=False)
     guest_expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
 
+    # Tokens issued before this are rejected (logout everywhere / forced expiry)
+    tokens_valid_after: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    # LLM token budgets overriding the tier defaults (src/services/token_budget.py); 0 = unlimited
+    token_budget_daily: Mapped[Optional[int]] = mapped_column(nullable=True)
+    token_budget_monthly: Mapped[Optional[int]] = mapped_column(nullable=True)
+
     #relationships
-    profiles: Mapped[List["Profile"]] = relationship(back_populates="user")
+    profiles: Mapped[List["Profile"]] = relationship(back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
 
     def __repr__(self) -> str:
         return f"<User id={self.id}, email='{self.email}'>"
@@ -1,6 +1,5 @@
-from datetime import timedelta, datetime
+from datetime import timedelta, datetime, timezone
 from typing import Annotated, Optional
-import uuid
 
 import jwt
 from fastapi import APIRouter, Depends, HTTPException, status
@@ -11,7 +10,11 @@ from sqlalchemy.orm import Session
 
 from src.utils.db import get_db
 from src.models.users import User
-from src.utils.security import verify_password, get_password_hash, create_access_token
+from src.utils.security import issue_access_token
+from src.utils.password_pool import password_pool
+from src.services.guest_pool import claim_guest
+from src.utils.user_cache import user_cache
+from src.utils.revocation import token_revocations
 from src.utils.guest_limiter import GuestLimiter
 from src.core.config import settings
 
@@ -26,6 +29,11 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     username: str | None = None
+    user_id: int | None = None
+    is_guest: bool = False
+    jti: str | None = None
+    issued_at: float = 0
+    expires_at: float | None = None
 
 
 class UserCreate(BaseModel):
@@ -63,16 +71,16 @@ def get_user(db: Session, username: str):
     return user
 
 
-def authenticate_user(db: Session, username: str, password: str):
+async def authenticate_user(db: Session, username: str, password: str):
     user = get_user(db, username)
     if not user:
         return False
-    if not verify_password(password, user.hashedPassword):
+    if not await password_pool.verify(password, user.hashedPassword):
         return False
     return user
 
 
-async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: DbSession):
+def decode_access_token(token: Annotated[str, Depends(oauth2_scheme)]) -> TokenData:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -83,11 +91,45 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: Db
         username = payload.get("sub")
         if username is None:
             raise credentials_exception
-        token_data = TokenData(username=username)
-    except InvalidTokenError:
+        return TokenData(
+            username=username,
+            user_id=payload.get("uid"),
+            is_guest=payload.get("guest", False),
+            jti=payload.get("jti"),
+            issued_at=payload.get("iat", 0),
+            expires_at=payload.get("exp"),
+        )
+    except (InvalidTokenError, ValueError):
+        raise credentials_exception
+
+
+async def get_current_user(token_data: Annotated[TokenData, Depends(decode_access_token)], db: DbSession):
+    """
+    Resolve the token's user. Tokens carrying a user id are served from the
+    user cache, so a valid token normally costs no query; older tokens
+    without one fall back to the lookup by username.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    if token_data.jti is not None and token_revocations.is_revoked(db, token_data.jti):
         raise credentials_exception
-    user = get_user(db, username=token_data.username)
+
+    user = user_cache.get(token_data.user_id) if token_data.user_id is not None else None
     if user is None:
+        if token_data.user_id is not None:
+            user = db.get(User, token_data.user_id)
+        else:
+            user = get_user(db, username=token_data.username)
+        if user is None:
+            raise credentials_exception
+        user_cache.put(user)
+
+    if user.username != token_data.username:
+        raise credentials_exception
+    if user.tokens_valid_after is not None and token_data.issued_at < user.tokens_valid_after.timestamp():
         raise credentials_exception
     return user
 
@@ -102,7 +144,7 @@ def register_user(user: UserCreate, db: DbSession):
     if db_user_by_username:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Username already taken")
 
-    hashed_password = get_password_hash(user.password)
+    hashed_password = password_pool.hash_sync(user.password)
     new_user = User(
         username=user.username,
         email=user.email,
@@ -121,7 +163,7 @@ async def login_for_access_token(
     form_data: OAuth2Form,
     db_session: DbSession
 ) -> Token:
-    user = authenticate_user(db_session, form_data.username, form_data.password)
+    user = await authenticate_user(db_session, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -129,46 +171,24 @@ async def login_for_access_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
-    access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
-    )
+    access_token = issue_access_token(user, access_token_expires)
     return Token(access_token=access_token, token_type="bearer")
 
 
 @router.post("/guest-login")
 async def guest_login(db: DbSession) -> Token:
     """
-    Create a temporary guest account with 7-day expiry.
+    Start a temporary guest account with 7-day expiry.
     No authentication required - perfect for trying the app!
     
     Returns a JWT token for immediate access.
     Guest users can create 1 profile and generate 1 resume per day.
     """
-    # Generate unique guest username
-    guest_username = f"guest_{uuid.uuid4().hex[:8]}"
-    guest_email = f"{guest_username}@guest.quickapps.app"
-    
-    # Create guest user
-    guest_user = User(
-        username=guest_username,
-        email=guest_email,
-        hashedPassword=get_password_hash("guest"),  # Dummy password
-        firstName="Guest",
-        lastName="User",
-        is_guest=True,
-        guest_expires_at=datetime.utcnow() + timedelta(days=GuestLimiter.GUEST_EXPIRY_DAYS)
-    )
-    
-    db.add(guest_user)
+    # Claims a pre-created account; no password hash involved
+    guest_user = claim_guest(db)
+    access_token = issue_access_token(guest_user, timedelta(days=GuestLimiter.GUEST_EXPIRY_DAYS))
     db.commit()
-    db.refresh(guest_user)
-    
-    # Create access token
-    access_token = create_access_token(
-        data={"sub": guest_user.username},
-        expires_delta=timedelta(days=GuestLimiter.GUEST_EXPIRY_DAYS)
-    )
-    
+
     return Token(access_token=access_token, token_type="bearer")
 
 
@@ -177,3 +197,30 @@ async def get_current_user_profile(
     current_user: Annotated[User, Depends(get_current_user)]
 ):
     return current_user
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    token_data: Annotated[TokenData, Depends(decode_access_token)],
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: DbSession
+):
+    """
+    Revoke the token used for this request. Tokens issued before revocation
+    support have no id of their own, so for those every token of the user is
+    revoked instead.
+    """
+    if token_data.jti is None or token_data.expires_at is None:
+        token_revocations.revoke_user(db, current_user.id)
+    else:
+        token_revocations.revoke_token(
+            db, token_data.jti, datetime.fromtimestamp(token_data.expires_at, timezone.utc)
+        )
+    return None
+
+
+@router.post("/logout-all", status_code=status.HTTP_204_NO_CONTENT)
+async def logout_all(current_user: Annotated[User, Depends(get_current_user)], db: DbSession):
+    """Revoke every token issued to the current user so far, on all devices"""
+    token_revocations.revoke_user(db, current_user.id)
+    return None
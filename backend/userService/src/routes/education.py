@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List, Annotated
+from typing import List, Annotated, Optional
 
 from src.utils import db
 from src.models import education as education_model
@@ -8,10 +8,16 @@ from src.schemas import education as education_schema
 from src.routes.auth import get_current_user
 from src.models.users import User
 from src.utils.auth_helpers import verify_profile_ownership
+from src.utils.pagination import paginate
+from src.utils.bulk import bulk_insert, bulk_update, bulk_delete, bulk_upsert
+from src.schemas.bulk import BulkDeleteRequest, BulkDeleteResponse
 
 DbSession = Annotated[Session, Depends(db.get_db)]
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
+# Natural key used to match existing rows in bulk upserts
+NATURAL_KEY = ("institution", "degree")
+
 router = APIRouter(
     tags=["Profile Education"],
     responses={404: {"description": "Not found"}},
@@ -40,17 +46,85 @@ async def read_educations_for_profile(
     profile_id: int, 
     db_session: DbSession,
     current_user: CurrentUser,
-    skip: int = 0, 
-    limit: int = 100
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None
 ):
 
     verify_profile_ownership(profile_id, current_user, db_session)
     
-    educations = db_session.query(education_model.Education).filter(
-        education_model.Education.profile_id == profile_id
-    ).offset(skip).limit(limit).all()
+    educations = paginate(
+        db_session.query(education_model.Education).filter(
+            education_model.Education.profile_id == profile_id
+        ),
+        [education_model.Education.id],
+        request,
+        response,
+        cursor=cursor,
+        limit=limit
+    )
     return educations
 
+# Bulk routes are declared before "/{education_id}" so "/bulk" is not parsed as an id
+
+@router.post("/bulk", response_model=List[education_schema.EducationOut], status_code=status.HTTP_201_CREATED)
+async def create_bulk_educations_for_profile(
+    profile_id: int,
+    educations_in: List[education_schema.EducationCreateRequest],
+    db_session: DbSession,
+    current_user: CurrentUser,
+    upsert: bool = False
+):
+    """
+    Create many rows with a single multi-row INSERT ... RETURNING.
+    With `upsert=true`, education with the same institution and degree already on the profile are overwritten instead of duplicated.
+    """
+    verify_profile_ownership(profile_id, current_user, db_session)
+
+    rows = [education_in.dict() for education_in in educations_in]
+    if upsert:
+        db_educations = bulk_upsert(db_session, education_model.Education, profile_id, rows, NATURAL_KEY)
+    else:
+        db_educations = bulk_insert(db_session, education_model.Education, [dict(row, profile_id=profile_id) for row in rows])
+
+    # Serialize before commit, which would expire the objects and force a reload per row
+    result = [education_schema.EducationOut.model_validate(obj) for obj in db_educations]
+    db_session.commit()
+    return result
+
+@router.patch("/bulk", response_model=List[education_schema.EducationOut])
+async def update_bulk_educations_for_profile(
+    profile_id: int,
+    educations_update: List[education_schema.EducationBulkUpdate],
+    db_session: DbSession,
+    current_user: CurrentUser
+):
+    """
+    Partially update many rows by id. Ids not on this profile are skipped and left out of the response.
+    """
+    verify_profile_ownership(profile_id, current_user, db_session)
+
+    rows = [education_update.dict(exclude_unset=True) for education_update in educations_update]
+    db_educations = bulk_update(db_session, education_model.Education, profile_id, rows)
+
+    result = [education_schema.EducationOut.model_validate(obj) for obj in db_educations]
+    db_session.commit()
+    return result
+
+@router.delete("/bulk", response_model=BulkDeleteResponse)
+async def delete_bulk_educations_for_profile(
+    profile_id: int,
+    delete_request: BulkDeleteRequest,
+    db_session: DbSession,
+    current_user: CurrentUser
+):
+    verify_profile_ownership(profile_id, current_user, db_session)
+
+    deleted_ids = bulk_delete(db_session, education_model.Education, profile_id, delete_request.ids)
+    db_session.commit()
+    return BulkDeleteResponse(deleted_ids=deleted_ids)
+
 @router.get("/{education_id}", response_model=education_schema.EducationOut)
 async def read_education_for_profile(
     profile_id: int, 
@@ -117,25 +191,3 @@ async def delete_education_for_profile(
     db_session.delete(db_education)
     db_session.commit()
     return None
-
-@router.post("/bulk", response_model=List[education_schema.EducationOut], status_code=status.HTTP_201_CREATED)
-async def create_bulk_educations_for_profile(
-    profile_id: int, 
-    educations_in: List[education_schema.EducationCreateRequest], 
-    db_session: DbSession,
-    current_user: CurrentUser
-):
-
-    verify_profile_ownership(profile_id, current_user, db_session)
-    
-    db_educations = []
-    for edu_in in educations_in:
-        edu_data = edu_in.dict()
-        edu_data["profile_id"] = profile_id
-        db_educations.append(education_model.Education(**edu_data))
-        
-    db_session.add_all(db_educations)
-    db_session.commit()
-    for edu in db_educations:
-        db_session.refresh(edu)
-    return db_educations 
\ No newline at end of file
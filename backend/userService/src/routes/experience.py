@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List, Annotated
+from typing import List, Annotated, Optional
 
 from src.utils import db
 from src.models import experience as experience_model
@@ -9,10 +9,16 @@ from src.schemas import experience as experience_schema
 from src.routes.auth import get_current_user
 from src.models.users import User
 from src.utils.auth_helpers import verify_profile_ownership#, get_user_profile_ids_subquery # get_user_profile_ids_subquery likely not needed here
+from src.utils.pagination import paginate
+from src.utils.bulk import bulk_insert, bulk_update, bulk_delete, bulk_upsert
+from src.schemas.bulk import BulkDeleteRequest, BulkDeleteResponse
 
 DbSession = Annotated[Session, Depends(db.get_db)]
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
+# Natural key used to match existing rows in bulk upserts
+NATURAL_KEY = ("company", "position")
+
 router = APIRouter(
     # prefix="/experience", # Prefix is now handled in main.py
     tags=["Profile Experience"],
@@ -42,17 +48,85 @@ async def read_experiences_for_profile(
     profile_id: int, # Comes from path
     db_session: DbSession,
     current_user: CurrentUser,
-    skip: int = 0,
-    limit: int = 100
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None
 ):
 
     verify_profile_ownership(profile_id, current_user, db_session)
     
-    experiences = db_session.query(experience_model.Experience).filter(
-        experience_model.Experience.profile_id == profile_id
-    ).offset(skip).limit(limit).all()
+    experiences = paginate(
+        db_session.query(experience_model.Experience).filter(
+            experience_model.Experience.profile_id == profile_id
+        ),
+        [experience_model.Experience.id],
+        request,
+        response,
+        cursor=cursor,
+        limit=limit
+    )
     return experiences
 
+# Bulk routes are declared before "/{experience_id}" so "/bulk" is not parsed as an id
+
+@router.post("/bulk", response_model=List[experience_schema.ExperienceOut], status_code=status.HTTP_201_CREATED)
+async def create_bulk_experiences_for_profile(
+    profile_id: int,
+    experiences_in: List[experience_schema.ExperienceCreateRequest],
+    db_session: DbSession,
+    current_user: CurrentUser,
+    upsert: bool = False
+):
+    """
+    Create many rows with a single multi-row INSERT ... RETURNING.
+    With `upsert=true`, experience with the same company and position already on the profile are overwritten instead of duplicated.
+    """
+    verify_profile_ownership(profile_id, current_user, db_session)
+
+    rows = [experience_in.dict() for experience_in in experiences_in]
+    if upsert:
+        db_experiences = bulk_upsert(db_session, experience_model.Experience, profile_id, rows, NATURAL_KEY)
+    else:
+        db_experiences = bulk_insert(db_session, experience_model.Experience, [dict(row, profile_id=profile_id) for row in rows])
+
+    # Serialize before commit, which would expire the objects and force a reload per row
+    result = [experience_schema.ExperienceOut.model_validate(obj) for obj in db_experiences]
+    db_session.commit()
+    return result
+
+@router.patch("/bulk", response_model=List[experience_schema.ExperienceOut])
+async def update_bulk_experiences_for_profile(
+    profile_id: int,
+    experiences_update: List[experience_schema.ExperienceBulkUpdate],
+    db_session: DbSession,
+    current_user: CurrentUser
+):
+    """
+    Partially update many rows by id. Ids not on this profile are skipped and left out of the response.
+    """
+    verify_profile_ownership(profile_id, current_user, db_session)
+
+    rows = [experience_update.dict(exclude_unset=True) for experience_update in experiences_update]
+    db_experiences = bulk_update(db_session, experience_model.Experience, profile_id, rows)
+
+    result = [experience_schema.ExperienceOut.model_validate(obj) for obj in db_experiences]
+    db_session.commit()
+    return result
+
+@router.delete("/bulk", response_model=BulkDeleteResponse)
+async def delete_bulk_experiences_for_profile(
+    profile_id: int,
+    delete_request: BulkDeleteRequest,
+    db_session: DbSession,
+    current_user: CurrentUser
+):
+    verify_profile_ownership(profile_id, current_user, db_session)
+
+    deleted_ids = bulk_delete(db_session, experience_model.Experience, profile_id, delete_request.ids)
+    db_session.commit()
+    return BulkDeleteResponse(deleted_ids=deleted_ids)
+
 @router.get("/{experience_id}", response_model=experience_schema.ExperienceOut)
 async def read_experience_for_profile(
     profile_id: int, # Comes from path
@@ -119,25 +193,3 @@ async def delete_experience_for_profile(
     db_session.delete(db_experience)
     db_session.commit()
     return None
-
-@router.post("/bulk", response_model=List[experience_schema.ExperienceOut], status_code=status.HTTP_201_CREATED)
-async def create_bulk_experiences_for_profile(
-    profile_id: int, # Comes from path
-    experiences_in: List[experience_schema.ExperienceCreateRequest],
-    db_session: DbSession,
-    current_user: CurrentUser
-):
-
-    verify_profile_ownership(profile_id, current_user, db_session)
-    
-    db_experiences = []
-    for exp_in in experiences_in:
-        exp_data = exp_in.dict()
-        exp_data["profile_id"] = profile_id # Add profile_id from path
-        db_experiences.append(experience_model.Experience(**exp_data))
-        
-    db_session.add_all(db_experiences)
-    db_session.commit()
-    for exp in db_experiences:
-        db_session.refresh(exp) # Refresh each object
-    return db_experiences 
\ No newline at end of file
@@ -1,13 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import delete, func, insert, literal, select
 from sqlalchemy.orm import Session, joinedload
-from typing import List, Annotated
+from typing import List, Annotated, Optional
 
 from src.utils import db
 from src.utils.guest_limiter import GuestLimiter
+from src.utils.pagination import paginate
+from src.utils.bulk import bulk_insert, clone_children
 from src.models import profiles as profile_model
 from src.schemas import profiles as profile_schema
+from src.schemas.profile_import import ProfileImport
+from src.schemas.bulk import IngestResponse
+from src.services.ndjson_ingest import NDJSONIngestor
 from src.routes.auth import get_current_user
 from src.models.users import User
+from src.models.skills import Skill
+from src.models.experience import Experience
+from src.models.education import Education
+from src.models.projects import Project
 
 DbSession = Annotated[Session, Depends(db.get_db)]
 CurrentUser = Annotated[User, Depends(get_current_user)]
@@ -40,16 +50,84 @@ def create_profile(
     db_session.refresh(db_profile)
     return db_profile
 
+@router.post("/import", response_model=profile_schema.ProfileDetailOut, status_code=status.HTTP_201_CREATED)
+def import_profile(
+    document: ProfileImport,
+    db_session: DbSession,
+    current_user: CurrentUser
+):
+    """
+    Create a profile together with all of its skills, experience, education
+    and projects from one nested document (native or JSON Resume format).
+    Everything is written in a single transaction: one INSERT for the profile
+    and one multi-row INSERT per child table.
+    """
+    can_create, message = GuestLimiter.can_create_profile(current_user, db_session)
+    if not can_create:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=message
+        )
+
+    db_profile = db_session.scalars(
+        insert(profile_model.Profile).returning(profile_model.Profile),
+        [{"name": document.name, "user_id": current_user.id}]
+    ).one()
+
+    def rows(items):
+        return [dict(item.dict(), profile_id=db_profile.id) for item in items]
+
+    result = profile_schema.ProfileDetailOut(
+        **profile_schema.ProfileBase.model_validate(db_profile).model_dump(),
+        skills=bulk_insert(db_session, Skill, rows(document.skills)),
+        experience=bulk_insert(db_session, Experience, rows(document.experience)),
+        education=bulk_insert(db_session, Education, rows(document.education)),
+        projects=bulk_insert(db_session, Project, rows(document.projects)),
+    )
+    db_session.commit()
+    return result
+
+@router.post("/ingest", response_model=IngestResponse)
+async def ingest_profile_rows(
+    request: Request,
+    db_session: DbSession,
+    current_user: CurrentUser
+):
+    """
+    Stream skills, experience, education and project rows as NDJSON
+    (application/x-ndjson), one object per line with `type` and `profile_id`.
+    The body is read incrementally and valid rows are spooled, then loaded
+    with COPY once it has been consumed; invalid lines are reported by line
+    number and skipped. All accepted rows are committed together.
+    """
+    ingestor = NDJSONIngestor(db_session, current_user.id)
+    try:
+        summary = await ingestor.ingest(request.stream())
+        db_session.commit()
+    except Exception:
+        db_session.rollback()
+        raise
+    return summary
+
 @router.get("", response_model=List[profile_schema.ProfileOut])
 def read_profiles(
     db_session: DbSession,
     current_user: CurrentUser,
-    skip: int = 0,
-    limit: int = 100
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None
 ):
-    profiles = db_session.query(profile_model.Profile).filter(
-        profile_model.Profile.user_id == current_user.id
-    ).offset(skip).limit(limit).all()
+    profiles = paginate(
+        db_session.query(profile_model.Profile).filter(
+            profile_model.Profile.user_id == current_user.id
+        ),
+        [profile_model.Profile.created_at, profile_model.Profile.id],
+        request,
+        response,
+        cursor=cursor,
+        limit=limit
+    )
     return profiles
 
 @router.get("/{profile_id}", response_model=profile_schema.ProfileOut)
@@ -86,9 +164,68 @@ def read_profile_with_details(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
     return db_profile
 
+@router.post("/{profile_id}/clone", response_model=profile_schema.ProfileOut, status_code=status.HTTP_201_CREATED)
+def clone_profile(
+    profile_id: int,
+    db_session: DbSession,
+    current_user: CurrentUser,
+    clone: Optional[profile_schema.ProfileClone] = None
+):
+    """
+    Copy a profile and all of its skills, experience, education and projects.
+    Runs as one INSERT ... SELECT per table inside the database, so the cost
+    is five statements however large the profile is.
+    """
+    can_create, message = GuestLimiter.can_create_profile(current_user, db_session)
+    if not can_create:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=message
+        )
+
+    Profile = profile_model.Profile
+    if clone is not None and clone.name:
+        name = literal(clone.name, Profile.name.type)
+    else:
+        name = func.substr(Profile.name.concat(" (copy)"), 1, Profile.name.type.length)
+    db_profile = db_session.scalars(
+        insert(Profile)
+        .from_select(
+            ["user_id", "name"],
+            select(Profile.user_id, name).where(
+                Profile.id == profile_id,
+                Profile.user_id == current_user.id
+            )
+        )
+        .returning(Profile)
+    ).first()
+    if db_profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+
+    for model in (Skill, Experience, Education, Project):
+        clone_children(db_session, model, profile_id, db_profile.id)
+
+    result = profile_schema.ProfileOut.model_validate(db_profile)
+    db_session.commit()
+    return result
+
 @router.get("/user/{user_id}", response_model=List[profile_schema.ProfileOut])
-def read_profiles_by_user(user_id: int, db_session: Session = Depends(db.get_db)):
-    profiles = db_session.query(profile_model.Profile).filter(profile_model.Profile.user_id == user_id).all()
+def read_profiles_by_user(
+    user_id: int,
+    request: Request,
+    response: Response,
+    db_session: Session = Depends(db.get_db),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None
+):
+    profiles = paginate(
+        db_session.query(profile_model.Profile).filter(profile_model.Profile.user_id == user_id),
+        [profile_model.Profile.created_at, profile_model.Profile.id],
+        request,
+        response,
+        cursor=cursor,
+        limit=limit
+    )
     return profiles
 
 @router.put("/{profile_id}", response_model=profile_schema.ProfileOut)
@@ -119,13 +256,17 @@ def delete_profile(
     db_session: DbSession,
     current_user: CurrentUser
 ):
-    db_profile = db_session.query(profile_model.Profile).filter(
-        profile_model.Profile.id == profile_id,
-        profile_model.Profile.user_id == current_user.id
-    ).first()
-    if db_profile is None:
+    # Children, generated resumes and rate-limit rows go with it via ON DELETE CASCADE
+    deleted = db_session.scalar(
+        delete(profile_model.Profile)
+        .where(
+            profile_model.Profile.id == profile_id,
+            profile_model.Profile.user_id == current_user.id
+        )
+        .returning(profile_model.Profile.id)
+    )
+    if deleted is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
 
-    db_session.delete(db_profile)
     db_session.commit()
     return None 
\ No newline at end of file
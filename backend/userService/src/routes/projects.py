@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List, Annotated
+from typing import List, Annotated, Optional
 
 from src.utils import db
 from src.models import projects as project_model
@@ -8,10 +8,16 @@ from src.schemas import projects as project_schema
 from src.routes.auth import get_current_user
 from src.models.users import User
 from src.utils.auth_helpers import verify_profile_ownership
+from src.utils.pagination import paginate
+from src.utils.bulk import bulk_insert, bulk_update, bulk_delete, bulk_upsert
+from src.schemas.bulk import BulkDeleteRequest, BulkDeleteResponse
 
 DbSession = Annotated[Session, Depends(db.get_db)]
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
+# Natural key used to match existing rows in bulk upserts
+NATURAL_KEY = ("title",)
+
 router = APIRouter(
     # prefix="/projects", # Prefix is now handled in main.py
     tags=["Profile Projects"],
@@ -41,17 +47,85 @@ async def read_projects_for_profile(
     profile_id: int, # Comes from path
     db_session: DbSession,
     current_user: CurrentUser,
-    skip: int = 0, 
-    limit: int = 100
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None
 ):
 
     verify_profile_ownership(profile_id, current_user, db_session)
     
-    projects = db_session.query(project_model.Project).filter(
-        project_model.Project.profile_id == profile_id
-    ).offset(skip).limit(limit).all()
+    projects = paginate(
+        db_session.query(project_model.Project).filter(
+            project_model.Project.profile_id == profile_id
+        ),
+        [project_model.Project.id],
+        request,
+        response,
+        cursor=cursor,
+        limit=limit
+    )
     return projects
 
+# Bulk routes are declared before "/{project_id}" so "/bulk" is not parsed as an id
+
+@router.post("/bulk", response_model=List[project_schema.ProjectOut], status_code=status.HTTP_201_CREATED)
+async def create_bulk_projects_for_profile(
+    profile_id: int,
+    projects_in: List[project_schema.ProjectCreateRequest],
+    db_session: DbSession,
+    current_user: CurrentUser,
+    upsert: bool = False
+):
+    """
+    Create many rows with a single multi-row INSERT ... RETURNING.
+    With `upsert=true`, projects with the same title already on the profile are overwritten instead of duplicated.
+    """
+    verify_profile_ownership(profile_id, current_user, db_session)
+
+    rows = [project_in.dict() for project_in in projects_in]
+    if upsert:
+        db_projects = bulk_upsert(db_session, project_model.Project, profile_id, rows, NATURAL_KEY)
+    else:
+        db_projects = bulk_insert(db_session, project_model.Project, [dict(row, profile_id=profile_id) for row in rows])
+
+    # Serialize before commit, which would expire the objects and force a reload per row
+    result = [project_schema.ProjectOut.model_validate(obj) for obj in db_projects]
+    db_session.commit()
+    return result
+
+@router.patch("/bulk", response_model=List[project_schema.ProjectOut])
+async def update_bulk_projects_for_profile(
+    profile_id: int,
+    projects_update: List[project_schema.ProjectBulkUpdate],
+    db_session: DbSession,
+    current_user: CurrentUser
+):
+    """
+    Partially update many rows by id. Ids not on this profile are skipped and left out of the response.
+    """
+    verify_profile_ownership(profile_id, current_user, db_session)
+
+    rows = [project_update.dict(exclude_unset=True) for project_update in projects_update]
+    db_projects = bulk_update(db_session, project_model.Project, profile_id, rows)
+
+    result = [project_schema.ProjectOut.model_validate(obj) for obj in db_projects]
+    db_session.commit()
+    return result
+
+@router.delete("/bulk", response_model=BulkDeleteResponse)
+async def delete_bulk_projects_for_profile(
+    profile_id: int,
+    delete_request: BulkDeleteRequest,
+    db_session: DbSession,
+    current_user: CurrentUser
+):
+    verify_profile_ownership(profile_id, current_user, db_session)
+
+    deleted_ids = bulk_delete(db_session, project_model.Project, profile_id, delete_request.ids)
+    db_session.commit()
+    return BulkDeleteResponse(deleted_ids=deleted_ids)
+
 @router.get("/{project_id}", response_model=project_schema.ProjectOut)
 async def read_project_for_profile(
     profile_id: int, # Comes from path
@@ -118,25 +192,3 @@ async def delete_project_for_profile(
     db_session.delete(db_project)
     db_session.commit()
     return None
-
-@router.post("/bulk", response_model=List[project_schema.ProjectOut], status_code=status.HTTP_201_CREATED)
-async def create_bulk_projects_for_profile(
-    profile_id: int, # Comes from path
-    projects_in: List[project_schema.ProjectCreateRequest], 
-    db_session: DbSession,
-    current_user: CurrentUser
-):
-
-    verify_profile_ownership(profile_id, current_user, db_session)
-    
-    db_projects = []
-    for proj_in in projects_in:
-        proj_data = proj_in.dict()
-        proj_data["profile_id"] = profile_id
-        db_projects.append(project_model.Project(**proj_data))
-        
-    db_session.add_all(db_projects)
-    db_session.commit()
-    for proj in db_projects:
-        db_session.refresh(proj)
-    return db_projects 
\ No newline at end of file
@@ -1,15 +1,16 @@
-from typing import List, Annotated
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Annotated, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from src.utils.db import get_db
 from src.routes.auth import get_current_user
 from src.utils.auth_helpers import verify_profile_ownership, verify_resume_ownership
 from src.utils.rate_limiter import ResumeRateLimiter
 from src.utils.guest_limiter import GuestLimiter
+from src.utils.blob_store import get_blob_store
 from src.models.users import User
-from src.schemas.resumes import ResumeGenerateRequest, ResumeResponse, ResumeListResponse
+from src.schemas.resumes import ResumeGenerateRequest, ResumeResponse, ResumeListResponse, ResumeSearchResult
 from src.services.resume_service import ResumeService
-from src.core.exceptions import RateLimitExceeded
 import logging
 
 logger = logging.getLogger(__name__)
@@ -31,7 +32,8 @@ resume_service = ResumeService()
 async def generate_resume(
     request: ResumeGenerateRequest,
     current_user: CurrentUser,
-    db: DbSession
+    db: DbSession,
+    response: Response
 ):
     """
     Generate a tailored resume in LaTeX format for a specific profile and job description.
@@ -39,35 +41,38 @@ async def generate_resume(
     
     Rate limited to 5 resumes per hour per user to prevent token waste.
     Guest users limited to 1 resume per day.
+    Remaining quota is returned in the X-RateLimit-* headers.
     """
     try:
         # Check guest limits first
-        can_generate, message = GuestLimiter.can_generate_resume(current_user, db)
+        can_generate, message = GuestLimiter.can_generate_resume(current_user)
         if not can_generate:
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 detail=message
             )
         
-        ResumeRateLimiter.check_rate_limit(current_user.id, db)
-        
-        
         verify_profile_ownership(request.profile_id, current_user, db)
         
-        generated_resume = await resume_service.generate_resume(
-            user_id=current_user.id,
-            profile_id=request.profile_id,
-            job_description=request.job_description,
-            db=db
-        )
-        
-       
-        ResumeRateLimiter.log_generation(current_user.id, request.profile_id, db)
+        reservation = ResumeRateLimiter.reserve(current_user, db)
+        try:
+            # Resume, rate-limit entry and LLM usage record are committed together
+            generated_resume = await resume_service.generate_resume(
+                user=current_user,
+                profile_id=request.profile_id,
+                job_description=request.job_description,
+                db=db
+            )
+        except Exception:
+            ResumeRateLimiter.release(reservation)
+            raise
+        ResumeRateLimiter.commit(reservation)
+        response.headers.update(ResumeRateLimiter.headers(reservation.decision))
         
         return generated_resume
     
-    except RateLimitExceeded as e:
-        raise e
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -83,14 +88,23 @@ async def generate_resume(
 @router.get("", response_model=List[ResumeListResponse])
 def get_user_resumes(
     current_user: CurrentUser,
-    db: DbSession
+    db: DbSession,
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None
 ):
     """
-    Get all generated resumes for the current user
+    Get the current user's generated resumes, newest first.
+    Paginated by cursor: follow the `Link: rel="next"` header for the next page.
     """
     try:
-        resumes = resume_service.get_user_resumes(current_user.id, db)
+        resumes = resume_service.get_user_resumes(
+            current_user.id, db, request, response, cursor=cursor, limit=limit
+        )
         return resumes
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching user resumes: {e}")
         raise HTTPException(
@@ -98,6 +112,35 @@ def get_user_resumes(
             detail="Failed to fetch resumes"
         )
 
+@router.get("/search", response_model=List[ResumeSearchResult])
+def search_resumes(
+    current_user: CurrentUser,
+    db: DbSession,
+    request: Request,
+    response: Response,
+    q: Annotated[str, Query(min_length=1, max_length=200)],
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None
+):
+    """
+    Search the current user's resumes by job description and resume text.
+    `q` accepts web-search syntax ("exact phrase", or, -exclude). Results are
+    ranked best first with matches wrapped in <mark> in the headlines.
+    Paginated by cursor: follow the `Link: rel="next"` header for the next page.
+    """
+    try:
+        return resume_service.search_resumes(
+            current_user.id, q, db, request, response, cursor=cursor, limit=limit
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error searching resumes: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to search resumes"
+        )
+
 @router.get("/{resume_id}", response_model=ResumeResponse)
 def get_resume(
     resume_id: int,
@@ -123,6 +166,53 @@ def get_resume(
             detail="Failed to fetch resume"
         )
 
+@router.get("/{resume_id}/latex")
+def download_resume_latex(
+    resume_id: int,
+    current_user: CurrentUser,
+    db: DbSession
+):
+    """
+    Download the LaTeX source as a .tex file. The body is decompressed from
+    the blob store in chunks, so it is never held in memory as a whole.
+    """
+    resume = verify_resume_ownership(resume_id, current_user, db)
+    try:
+        chunks = resume.iter_latex_chunks()
+    except FileNotFoundError:
+        logger.error(f"LaTeX blob {resume.latex_digest} missing for resume {resume_id}")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Resume content not found")
+    return StreamingResponse(
+        chunks,
+        media_type="application/x-tex",
+        headers={"Content-Disposition": f'attachment; filename="resume-{resume_id}.tex"'}
+    )
+
+@router.get("/{resume_id}/pdf")
+def download_resume_pdf(
+    resume_id: int,
+    current_user: CurrentUser,
+    db: DbSession
+):
+    """
+    Download the compiled PDF, if one has been produced for this resume.
+    Local blobs are served straight from disk by the file response.
+    """
+    resume = verify_resume_ownership(resume_id, current_user, db)
+    store = get_blob_store()
+    if resume.pdf_digest is None or not store.exists(resume.pdf_digest):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="PDF not available for this resume")
+
+    filename = f"resume-{resume_id}.pdf"
+    path = store.local_path(resume.pdf_digest)
+    if path is not None:
+        return FileResponse(path, media_type="application/pdf", filename=filename)
+    return StreamingResponse(
+        store.iter_chunks(resume.pdf_digest),
+        media_type="application/pdf",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @router.delete("/{resume_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_resume(
     resume_id: int,
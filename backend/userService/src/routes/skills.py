@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List, Annotated
+from typing import List, Annotated, Optional
 
 from src.utils import db
 from src.models import skills as skill_model
@@ -9,10 +9,16 @@ from src.schemas import skills as skill_schema
 from src.routes.auth import get_current_user
 from src.models.users import User
 from src.utils.auth_helpers import verify_profile_ownership #, get_user_profile_ids_subquery # get_user_profile_ids_subquery may not be needed for these routes
+from src.utils.pagination import paginate
+from src.utils.bulk import bulk_insert, bulk_update, bulk_delete, bulk_upsert
+from src.schemas.bulk import BulkDeleteRequest, BulkDeleteResponse
 
 DbSession = Annotated[Session, Depends(db.get_db)]
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
+# Natural key used to match existing rows in bulk upserts
+NATURAL_KEY = ("name",)
+
 router = APIRouter(
     # prefix="/skills", # Prefix is now handled in main.py
     tags=["Profile Skills"], # Tags can be set here or in main.py
@@ -42,17 +48,85 @@ async def read_skills_for_profile(
     profile_id: int, # Comes from path
     db_session: DbSession,
     current_user: CurrentUser,
-    skip: int = 0, 
-    limit: int = 100
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None
 ):
 
     verify_profile_ownership(profile_id, current_user, db_session)
     
-    skills = db_session.query(skill_model.Skill).filter(
-        skill_model.Skill.profile_id == profile_id
-    ).offset(skip).limit(limit).all()
+    skills = paginate(
+        db_session.query(skill_model.Skill).filter(
+            skill_model.Skill.profile_id == profile_id
+        ),
+        [skill_model.Skill.id],
+        request,
+        response,
+        cursor=cursor,
+        limit=limit
+    )
     return skills
 
+# Bulk routes are declared before "/{skill_id}" so "/bulk" is not parsed as an id
+
+@router.post("/bulk", response_model=List[skill_schema.SkillOut], status_code=status.HTTP_201_CREATED)
+async def create_bulk_skills_for_profile(
+    profile_id: int,
+    skills_in: List[skill_schema.SkillCreateRequest],
+    db_session: DbSession,
+    current_user: CurrentUser,
+    upsert: bool = False
+):
+    """
+    Create many rows with a single multi-row INSERT ... RETURNING.
+    With `upsert=true`, skills with the same name already on the profile are overwritten instead of duplicated.
+    """
+    verify_profile_ownership(profile_id, current_user, db_session)
+
+    rows = [skill_in.dict() for skill_in in skills_in]
+    if upsert:
+        db_skills = bulk_upsert(db_session, skill_model.Skill, profile_id, rows, NATURAL_KEY)
+    else:
+        db_skills = bulk_insert(db_session, skill_model.Skill, [dict(row, profile_id=profile_id) for row in rows])
+
+    # Serialize before commit, which would expire the objects and force a reload per row
+    result = [skill_schema.SkillOut.model_validate(obj) for obj in db_skills]
+    db_session.commit()
+    return result
+
+@router.patch("/bulk", response_model=List[skill_schema.SkillOut])
+async def update_bulk_skills_for_profile(
+    profile_id: int,
+    skills_update: List[skill_schema.SkillBulkUpdate],
+    db_session: DbSession,
+    current_user: CurrentUser
+):
+    """
+    Partially update many rows by id. Ids not on this profile are skipped and left out of the response.
+    """
+    verify_profile_ownership(profile_id, current_user, db_session)
+
+    rows = [skill_update.dict(exclude_unset=True) for skill_update in skills_update]
+    db_skills = bulk_update(db_session, skill_model.Skill, profile_id, rows)
+
+    result = [skill_schema.SkillOut.model_validate(obj) for obj in db_skills]
+    db_session.commit()
+    return result
+
+@router.delete("/bulk", response_model=BulkDeleteResponse)
+async def delete_bulk_skills_for_profile(
+    profile_id: int,
+    delete_request: BulkDeleteRequest,
+    db_session: DbSession,
+    current_user: CurrentUser
+):
+    verify_profile_ownership(profile_id, current_user, db_session)
+
+    deleted_ids = bulk_delete(db_session, skill_model.Skill, profile_id, delete_request.ids)
+    db_session.commit()
+    return BulkDeleteResponse(deleted_ids=deleted_ids)
+
 @router.get("/{skill_id}", response_model=skill_schema.SkillOut)
 async def read_skill_for_profile(
     profile_id: int, # Comes from path
@@ -119,25 +193,3 @@ async def delete_skill_for_profile(
     db_session.delete(db_skill)
     db_session.commit()
     return None
-
-@router.post("/bulk", response_model=List[skill_schema.SkillOut], status_code=status.HTTP_201_CREATED)
-async def create_bulk_skills_for_profile(
-    profile_id: int, # Comes from path
-    skills_in: List[skill_schema.SkillCreateRequest], 
-    db_session: DbSession,
-    current_user: CurrentUser
-):
-
-    verify_profile_ownership(profile_id, current_user, db_session)
-    
-    db_skills = []
-    for skill_data_in in skills_in:
-        skill_data = skill_data_in.dict()
-        skill_data["profile_id"] = profile_id # Add profile_id from path
-        db_skills.append(skill_model.Skill(**skill_data))
-        
-    db_session.add_all(db_skills)
-    db_session.commit()
-    for skill in db_skills:
-        db_session.refresh(skill) # Refresh each object to get its ID and other db-generated fields
-    return db_skills 
\ No newline at end of file
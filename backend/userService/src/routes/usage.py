@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta, timezone
+from typing import Annotated, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from src.utils.db import get_db
+from src.utils.auth_helpers import is_admin
+from src.routes.auth import get_current_user
+from src.models.users import User
+from src.schemas.usage import UsageResponse
+from src.services.usage_service import get_usage
+
+DbSession = Annotated[Session, Depends(get_db)]
+CurrentUser = Annotated[User, Depends(get_current_user)]
+
+router = APIRouter(
+    prefix="/usage",
+    tags=["Usage"],
+)
+
+DEFAULT_RANGE = {"hour": timedelta(days=2), "day": timedelta(days=30)}
+MAX_RANGE = {"hour": timedelta(days=31), "day": timedelta(days=366)}
+
+
+def _as_utc(moment: datetime) -> datetime:
+    """Query parameters without an offset are taken as UTC"""
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+@router.get("", response_model=UsageResponse)
+def read_usage(
+    current_user: CurrentUser,
+    db: DbSession,
+    granularity: Literal["hour", "day"] = "day",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    user_id: Optional[int] = None,
+    all_users: bool = False
+):
+    """
+    LLM calls, tokens, errors and latency percentiles per hour or day and
+    model, served from the usage rollups (refreshed by src.jobs.usage_rollup,
+    see `as_of`). Admins may pass `user_id` for another user or `all_users`.
+    """
+    if all_users or (user_id is not None and user_id != current_user.id):
+        if not is_admin(current_user):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    target_user_id = None if all_users else (user_id or current_user.id)
+
+    end = _as_utc(end) if end else datetime.now(timezone.utc)
+    start = _as_utc(start) if start else end - DEFAULT_RANGE[granularity]
+    if start >= end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must be before end")
+    if end - start > MAX_RANGE[granularity]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range too large for granularity '{granularity}' (max {MAX_RANGE[granularity].days} days)"
+        )
+
+    return get_usage(db, target_user_id, granularity, start, end)
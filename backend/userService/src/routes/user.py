@@ -7,7 +7,9 @@ from src.models import users as user_model # SQLAlchemy model
 from src.schemas import users as user_schema # Pydantic schemas
 from src.routes.auth import get_current_user
 from src.models.users import User
+from src.services.account_service import delete_account
 
+DbSession = Annotated[Session, Depends(db.get_db)]
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
 router = APIRouter(
@@ -20,3 +22,13 @@ router = APIRouter(
 def read_current_user(current_user: CurrentUser):
 
     return current_user
+
+
+@router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
+def delete_current_user(current_user: CurrentUser, db_session: DbSession):
+    """
+    Permanently delete the current account with all of its profiles,
+    generated resumes and usage records.
+    """
+    delete_account(db_session, current_user.id)
+    return None
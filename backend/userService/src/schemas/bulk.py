@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from typing import Dict, List
+
+
+class BulkDeleteRequest(BaseModel):
+    ids: List[int]
+
+
+class BulkDeleteResponse(BaseModel):
+    deleted_ids: List[int]
+
+
+class IngestLineError(BaseModel):
+    line: int
+    error: str
+
+
+class IngestResponse(BaseModel):
+    lines: int
+    inserted: Dict[str, int]
+    rejected: int
+    errors: List[IngestLineError]
+    errors_truncated: bool
@@ -28,6 +28,10 @@ class EducationUpdate(BaseModel):
     end_date: Optional[date] = None
     description: Optional[str] = None
 
+class EducationBulkUpdate(EducationUpdate):
+    id: int
+
+
 class EducationOut(BaseModel):
     id: int
     profile_id: int
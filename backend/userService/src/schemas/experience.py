@@ -27,6 +27,10 @@ class ExperienceUpdate(BaseModel):
     end_date: Optional[date] = None
     description: Optional[str] = None
 
+class ExperienceBulkUpdate(ExperienceUpdate):
+    id: int
+
+
 class ExperienceOut(BaseModel):
     id: int
     profile_id: int
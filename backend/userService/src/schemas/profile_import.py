@@ -0,0 +1,99 @@
+"""
+Nested profile document accepted by POST /profiles/import.
+
+Accepts either the native shape (name, skills, experience, education,
+projects using the *CreateRequest fields) or a JSON Resume document
+(https://jsonresume.org/schema), which is mapped onto the native shape
+before validation.
+"""
+from pydantic import BaseModel, model_validator
+from typing import Any, Dict, List, Optional
+
+from src.schemas.skills import SkillCreateRequest
+from src.schemas.experience import ExperienceCreateRequest
+from src.schemas.education import EducationCreateRequest
+from src.schemas.projects import ProjectCreateRequest
+
+
+def _iso_date(value: Optional[str]) -> Optional[str]:
+    """
+    JSON Resume allows "2020", "2020-04" or "2020-04-01" (and in practice
+    "2020-4-1"); pad to a full ISO date. Anything else is left for date
+    validation to reject.
+    """
+    if not value:
+        return None
+    parts = str(value).split("-")
+    if len(parts) > 3:
+        return value
+    year, month, day = (parts + ["01", "01"])[:3]
+    return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
+
+
+def _description(summary: Optional[str], highlights: Optional[List[str]]) -> Optional[str]:
+    lines = [summary] if summary else []
+    lines.extend(f"- {highlight}" for highlight in highlights or [])
+    return "\n".join(lines) or None
+
+
+def _from_json_resume(doc: Dict[str, Any]) -> Dict[str, Any]:
+    basics = doc.get("basics") or {}
+    skills = []
+    for skill in doc.get("skills") or []:
+        keywords = skill.get("keywords") or []
+        for name in keywords or [skill.get("name")]:
+            if name:
+                skills.append({"name": name, "proficiency": skill.get("level")})
+
+    return {
+        "name": doc.get("name") or basics.get("label") or basics.get("name") or "Imported profile",
+        "skills": skills,
+        "experience": [
+            {
+                "company": work.get("name") or work.get("company"),
+                "position": work.get("position"),
+                "start_date": _iso_date(work.get("startDate")),
+                "end_date": _iso_date(work.get("endDate")),
+                "description": _description(work.get("summary"), work.get("highlights")),
+            }
+            for work in doc.get("work") or []
+        ],
+        "education": [
+            {
+                "institution": edu.get("institution"),
+                "degree": edu.get("studyType"),
+                "field_of_study": edu.get("area"),
+                "start_date": _iso_date(edu.get("startDate")),
+                "end_date": _iso_date(edu.get("endDate")),
+                "description": _description(
+                    f"Score: {edu['score']}" if edu.get("score") else None, edu.get("courses")
+                ),
+            }
+            for edu in doc.get("education") or []
+        ],
+        "projects": [
+            {
+                "title": project.get("name"),
+                "start_date": _iso_date(project.get("startDate")),
+                "end_date": _iso_date(project.get("endDate")),
+                "description": _description(project.get("description"), project.get("highlights")),
+                "technologies": ", ".join(project.get("keywords") or []) or None,
+            }
+            for project in doc.get("projects") or []
+        ],
+    }
+
+
+class ProfileImport(BaseModel):
+    name: str
+    skills: List[SkillCreateRequest] = []
+    experience: List[ExperienceCreateRequest] = []
+    education: List[EducationCreateRequest] = []
+    projects: List[ProjectCreateRequest] = []
+
+    @model_validator(mode="before")
+    @classmethod
+    def map_json_resume(cls, data: Any) -> Any:
+        if isinstance(data, dict) and ("basics" in data or "work" in data):
+            return _from_json_resume(data)
+        return data
@@ -1,14 +1,21 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime, date
 from typing import Optional, List
 
+# profiles.name is String(100)
+NAME_MAX_LENGTH = 100
+
 
 class ProfileCreate(BaseModel):
-    name: str
+    name: str = Field(max_length=NAME_MAX_LENGTH)
 
 
 class ProfileUpdate(BaseModel):
-    name: Optional[str] = None
+    name: Optional[str] = Field(default=None, max_length=NAME_MAX_LENGTH)
+
+
+class ProfileClone(BaseModel):
+    name: Optional[str] = Field(default=None, max_length=NAME_MAX_LENGTH)
 
 class ProfileBase(BaseModel):
     id: int
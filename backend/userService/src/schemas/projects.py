@@ -27,6 +27,10 @@ class ProjectUpdate(BaseModel):
     technologies: Optional[str] = None
 
 
+class ProjectBulkUpdate(ProjectUpdate):
+    id: int
+
+
 class ProjectOut(BaseModel):
     id: int
     profile_id: int
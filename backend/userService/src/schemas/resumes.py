@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
+from typing import Optional
 
 
 class ResumeGenerateRequest(BaseModel):
@@ -23,8 +24,23 @@ class ResumeResponse(BaseModel):
 class ResumeListResponse(BaseModel):
     id: int
     profile_id: int
-    job_description: str
+    job_description_preview: str
+    job_description_length: int
+    latex_content_size: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ResumeSearchResult(BaseModel):
+    id: int
+    profile_id: int
+    rank: float
+    job_description_headline: str
+    content_headline: Optional[str] = None
+    latex_content_size: int
     created_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
@@ -16,6 +16,10 @@ class SkillUpdate(BaseModel):
     proficiency: Optional[str] = None
 
 
+class SkillBulkUpdate(SkillUpdate):
+    id: int
+
+
 class SkillOut(BaseModel):
     id: int
     profile_id: int
@@ -0,0 +1,37 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+
+
+class UsageBucket(BaseModel):
+    bucket: datetime
+    model_used: str
+    calls: int
+    errors: int
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    cached_tokens: int = 0  # prompt tokens served from the provider's prefix cache
+    latency_avg_ms: Optional[float] = None
+    latency_p50_ms: Optional[int] = None
+    latency_p95_ms: Optional[int] = None
+    latency_p99_ms: Optional[int] = None
+
+
+class UsageTotals(BaseModel):
+    calls: int = 0
+    errors: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    cached_tokens: int = 0
+
+
+class UsageResponse(BaseModel):
+    granularity: str
+    start: datetime
+    end: datetime
+    user_id: Optional[int] = None  # None: all users
+    as_of: Optional[datetime] = None  # rollups include llm_requests up to this time
+    buckets: List[UsageBucket]
+    totals: UsageTotals
@@ -0,0 +1,81 @@
+"""
+Whole-account deletion in bounded batches.
+
+Every table hanging off a user is deleted with ON DELETE CASCADE, so deleting
+the users row alone would be correct. For accounts with thousands of resumes
+that single statement holds locks and builds WAL for the entire account, so
+the bulky tables are drained first in batches of `batch_size`, each batch in
+its own transaction, and the final user delete is then cheap.
+"""
+import logging
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.orm import Session
+
+from src.core.config import settings
+from src.models.users import User
+from src.models.profiles import Profile
+from src.models.generated_resumes import GeneratedResume
+from src.models.llm_requests import LLMRequest
+from src.models.resume_rate_limit import ResumeRateLimit
+from src.utils.revocation import token_revocations
+
+logger = logging.getLogger(__name__)
+
+# Drained in this order; profiles last so their cascades find little left to do
+BATCHED_MODELS = (GeneratedResume, ResumeRateLimit, LLMRequest, Profile)
+
+
+def delete_in_batches(
+    db: Session,
+    model,
+    criterion,
+    batch_size: int,
+    pause_seconds: float = 0.0
+) -> int:
+    """
+    Delete rows of `model` matching `criterion` at most `batch_size` at a time,
+    committing every batch and sleeping `pause_seconds` between batches.
+    Batches are picked by the full primary key, so a composite key such as
+    token_usage_daily's (day, user_id) still bounds each batch. Returns the
+    number of rows deleted.
+    """
+    keys = model.__mapper__.primary_key
+    key = keys[0] if len(keys) == 1 else tuple_(*keys)
+    total = 0
+    while True:
+        batch = select(*keys).where(criterion).limit(batch_size)
+        deleted = db.execute(
+            delete(model).where(key.in_(batch)),
+            execution_options={"synchronize_session": False}
+        ).rowcount
+        db.commit()
+        total += deleted
+        if deleted < batch_size:
+            return total
+        if pause_seconds:
+            time.sleep(pause_seconds)
+
+
+def delete_account(db: Session, user_id: int, batch_size: Optional[int] = None) -> Dict[str, int]:
+    """
+    Delete a user and everything they own. Returns rows deleted per table
+    (child rows removed by profile cascades are not counted). Blobs are left
+    for the blob garbage collector.
+    """
+    batch_size = batch_size or settings.account_delete_batch_size
+    counts = {
+        model.__tablename__: delete_in_batches(db, model, model.user_id == user_id, batch_size)
+        for model in BATCHED_MODELS
+    }
+    # Sign the account out of every process before its row disappears
+    token_revocations.revoke_user(db, user_id)
+    counts[User.__tablename__] = db.execute(
+        delete(User).where(User.id == user_id),
+        execution_options={"synchronize_session": False}
+    ).rowcount
+    db.commit()
+    logger.info(f"Deleted account {user_id}: {counts}")
+    return counts
@@ -0,0 +1,194 @@
+"""
+Completion-token budget (max_tokens) per resume request, predicted from the
+prompt size.
+
+A linear model, completion_tokens = intercept + slope * prompt_tokens, is
+fitted by least squares on the last LLM_COMPLETION_FIT_ROWS successful calls
+to the configured model in llm_requests. The budget for a request is the
+prediction plus a margin, clamped to LLM_COMPLETION_MIN_TOKENS ..
+LLM_COMPLETION_MAX_TOKENS. The margin is the LLM_COMPLETION_QUANTILE quantile
+of the residuals, so that share of past calls would have fitted.
+
+Calls cut off at max_tokens (finish_reason "length") only show a lower bound
+of what they needed. They are left out of the line fit and count as
+infinitely under-predicted in the margin. More truncations therefore widen
+the margin. Once they pass 1 - quantile, every request gets the maximum.
+
+Until LLM_COMPLETION_MIN_SAMPLES calls are on record, requests fall back to
+the fixed MAX_TOKENS. A background thread refits every
+LLM_COMPLETION_REFIT_SECONDS. Truncations and reserved-but-unused tokens are
+counted for /health; src.jobs.completion_budget_report reports them from
+llm_requests.
+"""
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.core.config import settings
+from src.models.llm_requests import LLMRequest
+
+logger = logging.getLogger(__name__)
+
+TRUNCATED = "length"
+
+
+@dataclass(frozen=True)
+class CompletionModel:
+    intercept: float
+    slope: float
+    margin: float  # inf when too many calls were truncated
+    samples: int
+
+    def predict(self, prompt_tokens: int) -> float:
+        return self.intercept + self.slope * prompt_tokens + self.margin
+
+
+def fit_completion_model(rows: List[Tuple[int, int, Optional[str]]], quantile: float) -> CompletionModel:
+    """Fit on (prompt_tokens, completion_tokens, finish_reason) rows"""
+    complete = [(x, y) for x, y, reason in rows if reason != TRUNCATED]
+    n = len(complete)
+    if n:
+        mean_x = sum(x for x, _ in complete) / n
+        mean_y = sum(y for _, y in complete) / n
+        var_x = sum((x - mean_x) ** 2 for x, _ in complete)
+        slope = sum((x - mean_x) * (y - mean_y) for x, y in complete) / var_x if var_x else 0.0
+        slope = max(0.0, slope)
+        intercept = mean_y - slope * mean_x
+    else:
+        slope, intercept = 0.0, 0.0
+    residuals = sorted(
+        math.inf if reason == TRUNCATED else y - (intercept + slope * x)
+        for x, y, reason in rows
+    )
+    margin = residuals[min(len(residuals) - 1, math.ceil(len(residuals) * quantile) - 1)] if residuals else 0.0
+    return CompletionModel(intercept, slope, max(0.0, margin), len(rows))
+
+
+class CompletionBudget:
+    def __init__(
+        self,
+        min_tokens: int = settings.llm_completion_min_tokens,
+        max_tokens: int = settings.llm_completion_max_tokens,
+        quantile: float = settings.llm_completion_quantile,
+        fit_rows: int = settings.llm_completion_fit_rows,
+        min_samples: int = settings.llm_completion_min_samples,
+        refit_seconds: float = settings.llm_completion_refit_seconds,
+        session_factory=None
+    ):
+        self.min_tokens = min_tokens
+        self.max_tokens = max_tokens
+        self.quantile = quantile
+        self.fit_rows = fit_rows
+        self.min_samples = min_samples
+        self.refit_seconds = refit_seconds
+        self._session_factory = session_factory
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.model: Optional[CompletionModel] = None
+        self.fitted_at: Optional[float] = None
+        self.calls = 0
+        self.truncated = 0
+        self.reserved_tokens = 0
+        self.completion_tokens = 0
+        self.failed = 0
+
+    def _sessions(self):
+        if self._session_factory is None:
+            from src.utils.db import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory
+
+    def predict(self, prompt_tokens: int) -> Optional[int]:
+        """max_tokens for a prompt of this size, or None until a model is fitted"""
+        model = self.model
+        if model is None:
+            return None
+        predicted = model.predict(prompt_tokens)
+        if math.isinf(predicted):
+            return self.max_tokens
+        return min(self.max_tokens, max(self.min_tokens, math.ceil(predicted)))
+
+    def record(self, max_tokens: int, completion_tokens: Optional[int], finish_reason: Optional[str]) -> None:
+        with self._lock:
+            self.calls += 1
+            self.reserved_tokens += max_tokens
+            self.completion_tokens += completion_tokens or 0
+            if finish_reason == TRUNCATED:
+                self.truncated += 1
+
+    def fit(self, db: Session, model_name: str = settings.llm_model) -> Optional[CompletionModel]:
+        """Refit on recent calls; keeps the current model if there are too few"""
+        rows = db.execute(
+            select(LLMRequest.prompt_tokens, LLMRequest.completion_tokens, LLMRequest.finish_reason)
+            .where(
+                LLMRequest.model_used == model_name,
+                LLMRequest.status == "success",
+                LLMRequest.prompt_tokens.is_not(None),
+                LLMRequest.completion_tokens.is_not(None),
+            )
+            .order_by(LLMRequest.request_time.desc())
+            .limit(self.fit_rows)
+        ).all()
+        if len(rows) < self.min_samples:
+            logger.info(f"Completion budget has {len(rows)} of {self.min_samples} samples, keeping fixed max_tokens")
+            return self.model
+        model = fit_completion_model([tuple(row) for row in rows], self.quantile)
+        self.model, self.fitted_at = model, time.time()
+        logger.info(
+            f"Completion budget fitted on {model.samples} calls: {model.intercept:.0f} + "
+            f"{model.slope:.3f} * prompt_tokens + {model.margin:.0f}"
+        )
+        return model
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="completion-budget-fitter", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                with self._sessions()() as db:
+                    self.fit(db)
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Completion budget fit failed: {e}")
+            if self._stopping.wait(self.refit_seconds):
+                return
+
+    def close(self, timeout: float = 10.0) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        logger.info(f"Completion budget closed: {self.stats()}")
+
+    def stats(self) -> Dict[str, Any]:
+        model = self.model
+        return {
+            "model": None if model is None else {
+                "intercept": round(model.intercept, 1),
+                "slope": round(model.slope, 3),
+                "margin": None if math.isinf(model.margin) else round(model.margin, 1),
+                "samples": model.samples,
+                "age_seconds": round(time.time() - self.fitted_at) if self.fitted_at else None,
+            },
+            "calls": self.calls,
+            "truncated": self.truncated,
+            "truncation_rate": round(self.truncated / self.calls, 4) if self.calls else None,
+            "reserved_tokens": self.reserved_tokens,
+            # Share of reserved completion tokens the calls did not use
+            "waste_pct": round(100 * (1 - self.completion_tokens / self.reserved_tokens), 1) if self.reserved_tokens else None,
+            "failed": self.failed,
+        }
+
+
+completion_budget = CompletionBudget()
@@ -0,0 +1,173 @@
+"""
+Pool of pre-created guest accounts.
+
+Guest login claims a ready-made users row instead of creating one. Pooled
+rows are guests with no guest_expires_at; claiming one sets its expiry with a
+single UPDATE ... RETURNING over a SKIP LOCKED subselect, so concurrent logins
+never wait on each other or claim the same row. Guests get the unusable
+password sentinel instead of a bcrypt hash, so neither step hashes anything.
+
+A background filler tops the pool up to GUEST_POOL_SIZE whenever fewer than
+GUEST_POOL_LOW_WATER rows are free, inserting at most GUEST_POOL_REFILL_RATE
+rows per second, one transaction per second's worth. Workers take turns
+through an advisory lock. If the pool is empty, a login creates its row
+inline.
+"""
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from src.core.config import settings
+from src.models.users import User
+from src.utils.guest_limiter import GuestLimiter
+from src.utils.security import UNUSABLE_PASSWORD
+
+logger = logging.getLogger(__name__)
+
+_FILL_LOCK_KEY = 0x67756573  # "gues"
+
+_POOLED = (User.is_guest.is_(True), User.guest_expires_at.is_(None))
+
+
+def _guest_row() -> Dict[str, Any]:
+    username = f"guest_{uuid.uuid4().hex[:8]}"
+    return {
+        "username": username,
+        "email": f"{username}@guest.quickapps.app",
+        "hashedPassword": UNUSABLE_PASSWORD,
+        "firstName": "Guest",
+        "lastName": "User",
+        "is_guest": True,
+    }
+
+
+def available_guests(db: Session) -> int:
+    return db.scalar(select(func.count()).select_from(User).where(*_POOLED))
+
+
+def claim_guest(db: Session) -> User:
+    """
+    Take a pooled guest (or create one if the pool is empty) and start its
+    expiry clock. Not committed: the caller signs the token, then commits.
+    """
+    expires_at = datetime.now(timezone.utc) + timedelta(days=GuestLimiter.GUEST_EXPIRY_DAYS)
+    free = (
+        select(User.id)
+        .where(*_POOLED)
+        .order_by(User.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    guest = db.scalars(
+        update(User)
+        .where(User.id == free)
+        .values(guest_expires_at=expires_at)
+        .returning(User),
+        execution_options={"synchronize_session": False}
+    ).one_or_none()
+    if guest is None:
+        guest_pool_filler.misses += 1
+        guest = db.scalars(
+            insert(User).values(**_guest_row(), guest_expires_at=expires_at).returning(User)
+        ).one()
+    guest_pool_filler.claims += 1
+    guest_pool_filler.wake()
+    return guest
+
+
+def fill_guest_pool(
+    db: Session,
+    size: int = settings.guest_pool_size,
+    low_water: int = settings.guest_pool_low_water,
+    refill_rate: int = settings.guest_pool_refill_rate,
+    stopping: Optional[threading.Event] = None
+) -> int:
+    """
+    Refill the pool to `size` if it is below `low_water`, at most
+    `refill_rate` rows per second. Returns rows added; stops early when
+    another worker holds the fill lock.
+    """
+    added = 0
+    filling = False
+    while not (stopping and stopping.is_set()):
+        started = time.monotonic()
+        if not db.scalar(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": _FILL_LOCK_KEY}):
+            db.rollback()
+            break
+        missing = size - available_guests(db)
+        if missing <= 0 or (not filling and size - missing >= low_water):
+            db.rollback()
+            break
+        filling = True
+        rows: List[Dict[str, Any]] = [_guest_row() for _ in range(min(missing, refill_rate))]
+        added += db.execute(insert(User).values(rows).on_conflict_do_nothing()).rowcount
+        db.commit()
+        if missing <= len(rows):
+            break
+        time.sleep(max(0.0, 1.0 - (time.monotonic() - started)))
+    if added:
+        logger.info(f"Guest pool refilled with {added} accounts")
+    return added
+
+
+class GuestPoolFiller:
+    """Background thread running fill_guest_pool every GUEST_POOL_CHECK_SECONDS or when woken"""
+
+    def __init__(self, check_seconds: int = settings.guest_pool_check_seconds, session_factory=None):
+        self.check_seconds = check_seconds
+        self._session_factory = session_factory
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.claims = 0
+        self.misses = 0
+        self.filled = 0
+        self.failed = 0
+
+    def _sessions(self):
+        if self._session_factory is None:
+            from src.utils.db import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory
+
+    def start(self) -> None:
+        if settings.guest_pool_size <= 0:
+            return
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="guest-pool-filler", daemon=True)
+            self._thread.start()
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                with self._sessions()() as db:
+                    self.filled += fill_guest_pool(db, stopping=self._stopping)
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Guest pool refill failed: {e}")
+            self._wake.wait(self.check_seconds)
+            self._wake.clear()
+
+    def close(self, timeout: float = 10.0) -> None:
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, int]:
+        return {"claims": self.claims, "misses": self.misses, "filled": self.filled, "failed": self.failed}
+
+
+guest_pool_filler = GuestPoolFiller()
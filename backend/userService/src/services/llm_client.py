@@ -2,17 +2,94 @@ import openai
 from openai import OpenAI
 import time
 import os
-from typing import Dict, Any, Optional
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple
 from dotenv import load_dotenv
+from starlette.concurrency import run_in_threadpool
 import logging
-from sqlalchemy.orm import Session
-from src.models.llm_requests import LLMRequest
+from src.services.telemetry import telemetry_writer
+from src.services.prompt_budget import PromptReport, prompt_budgeter
+from src.services.completion_budget import TRUNCATED, completion_budget
 import re
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Bump PROMPT_VERSION with any change to the static prefix below. It is
+# stored with every llm_requests row, so cache hit rates, token counts and
+# latency can be compared across prompt versions.
+PROMPT_VERSION = "resume-v2"
+
+# Everything that does not depend on the request goes in the system message,
+# byte for byte the same on every call, so the provider can reuse its cached
+# prefix. Per-request data (job description, candidate profile) follows in
+# the user message.
+_ROLE = "You are an expert resume writer. Your task is to generate concise, professional textual content for specific sections of a resume. This content will be programmatically inserted into a LaTeX resume template. Provide only the text for each requested section, clearly demarcated by the specified headers (PROFILE:, EDUCATION:, EXPERIENCE:, PROJECTS:, SKILLS:). Do not include any LaTeX commands or formatting. Focus on tailoring the content to the provided job description and candidate profile."
+
+RESUME_INSTRUCTIONS = """Generate tailored resume content for the job description given in the user message, based on the candidate's profile given after it.
+THE OUTPUT MUST BE PLAIN TEXT, structured with the exact section headers (PROFILE:, EDUCATION:, EXPERIENCE:, PROJECTS:, SKILLS:) each on a new line, followed immediately by the content for that section.
+
+INSTRUCTIONS:
+1. Analyze the JOB DESCRIPTION and the CANDIDATE PROFILE provided in the user message.
+2. Generate compelling, concise, and professional PLAIN TEXT content for each of the following sections.
+3. The content for each section should be suitable for direct insertion into a resume. Use bullet points (e.g., using '-' or '*') for lists within sections like experience and projects where appropriate.
+4. **CRITICALLY IMPORTANT: Structure your entire output with these exact uppercase headers, each on a new line, followed by the content for that section. Example:**
+   PROFILE:
+   [Text for professional summary here...]
+
+   EDUCATION:
+   [Text for education section here...]
+
+   EXPERIENCE:
+   [Text for experience section here...]
+
+   PROJECTS:
+   [Text for projects section here...]
+
+   SKILLS:
+   [Text for skills section here...]
+
+GUIDELINES FOR EACH SECTION'S TEXTUAL CONTENT:
+   - PROFILE:
+     Write a 2-4 sentence professional summary tailored to the job description, highlighting key skills and experiences from the candidate's profile.
+
+   - EDUCATION:
+     For each education entry, provide institution, degree, field of study (if any), graduation date (or expected). Optionally, include 1-2 bullet points per entry for key achievements, relevant coursework, or GPA if significant and high.
+     Example format for one entry's text:
+     Institution Name - Degree in Field of Study (Graduation: Month Year)
+     - Relevant coursework: Course A, Course B
+     - GPA: 3.X/4.0
+
+   - EXPERIENCE:
+     For each experience entry, provide company, position, and dates of employment. Follow with 2-4 bullet points detailing responsibilities and achievements. Quantify achievements where possible and tailor these points to the job description.
+     Example format for one entry's text:
+     Company Name - Position Title (Month Year - Month Year)
+     - Achieved X by implementing Y, resulting in Z impact (e.g., 15% improvement in Q).
+     - Led a team to develop a new feature, enhancing user engagement.
+
+   - PROJECTS:
+     For each project, provide the project title and optionally dates. Follow with 1-3 bullet points describing the project, technologies used, your role, and key outcomes or impact.
+     Example format for one entry's text:
+     Project Title (Optional: Month Year - Month Year)
+     - Developed X using Y (e.g., Python, React) and Z (e.g., PostgreSQL).
+     - Implemented feature A which resulted in B (e.g., reduced processing time by 10%).
+
+   - SKILLS:
+     Provide a categorized list of skills. Examples of categories: Programming Languages, Frameworks & Libraries, Databases, Tools, Cloud Platforms, Other Technical Skills, Soft Skills.
+     Example format for the skills text:
+     Programming Languages: Python, Java, JavaScript
+     Frameworks & Libraries: React, Node.js, Spring Boot
+     Databases: PostgreSQL, MongoDB
+     Tools: Git, Docker, Kubernetes
+
+5. **DO NOT** include any LaTeX commands (e.g., \\section, \\textbf, \\item).
+6. **DO NOT** include any explanations, apologies, or conversational text outside of the requested section content. Output only the structured resume content starting with "PROFILE:".
+7. Ensure each section header (PROFILE:, EDUCATION:, etc.) is ON ITS OWN LINE.
+"""
+
+SYSTEM_PROMPT = f"{_ROLE}\n\n{RESUME_INSTRUCTIONS}"
+
 class LLMClient:
     """
     Client for making LLM API calls and handling responses
@@ -34,31 +111,65 @@ class LLMClient:
             self._client = OpenAI(api_key=self.api_key)
         return self._client
     
+    def build_messages(
+        self,
+        profile_data: Dict[str, Any],
+        job_description: str
+    ) -> Tuple[List[Dict[str, str]], PromptReport]:
+        """
+        Chat messages for a resume, fitted to the prompt token budget (see
+        src/services/prompt_budget.py), and the report of what was cut.
+        """
+        messages, _, report = prompt_budgeter.fit(
+            profile_data,
+            job_description,
+            lambda data: self._messages(data, job_description),
+            self.model
+        )
+        if report.tokens_cut:
+            logger.info(f"Prompt for profile {profile_data.get('profile', {}).get('id')} cut to budget: {report.summary()}")
+        return messages, report
+
+    def completion_tokens(self, report: PromptReport) -> int:
+        """max_tokens for the call: predicted from the prompt size, else the fixed MAX_TOKENS"""
+        return completion_budget.predict(report.tokens_after) or self.max_tokens
+
+    def estimate_tokens(self, report: PromptReport) -> int:
+        """Upper estimate of a call's total tokens: the prompt plus the full completion allowance"""
+        return report.tokens_after + self.completion_tokens(report)
+
+    def _messages(self, profile_data: Dict[str, Any], job_description: str) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": self._create_resume_prompt(profile_data, job_description)},
+        ]
+
     async def generate_resume_content(
         self, 
         profile_data: Dict[str, Any], 
         job_description: str,
         user_id: int,
-        db: Session
-    ) -> Dict[str, str]: # Return a dictionary of section contents
+        prompt: Optional[Tuple[List[Dict[str, str]], PromptReport]] = None
+    ) -> Tuple[Dict[str, str], Dict[str, Any]]:
         """
-        Generate tailored resume content as structured text using LLM
+        Generate tailored resume content as structured text using LLM.
+        `prompt` is the result of build_messages() when the caller already has it.
+        Returns the section contents and the llm_requests row for the call,
+        which the caller writes in its own transaction. Failed calls are
+        logged here, through the telemetry writer.
         """
+        messages, report = prompt or self.build_messages(profile_data, job_description)
+        max_tokens = self.completion_tokens(report)
         start_time = time.time()
         
         try:
-            prompt = self._create_resume_prompt(profile_data, job_description)
-            
-            response = self.client.chat.completions.create(
+            # The OpenAI client is synchronous; run it off the event loop so
+            # queued requests and the rest of the API keep being served
+            response = await run_in_threadpool(
+                self.client.chat.completions.create,
                 model=self.model,
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": "You are an expert resume writer. Your task is to generate concise, professional textual content for specific sections of a resume. This content will be programmatically inserted into a LaTeX resume template. Provide only the text for each requested section, clearly demarcated by the specified headers (PROFILE:, EDUCATION:, EXPERIENCE:, PROJECTS:, SKILLS:). Do not include any LaTeX commands or formatting. Focus on tailoring the content to the provided job description and candidate profile."
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=self.max_tokens,
+                messages=messages,
+                max_tokens=max_tokens,
                 temperature=self.temperature
             )
             
@@ -66,27 +177,34 @@ class LLMClient:
             parsed_content = self._parse_llm_output_to_dict(raw_content)
             
             response_time = int((time.time() - start_time) * 1000)
-            self._log_request(
+            usage_row = self._request_row(
                 user_id=user_id,
                 response=response,
                 response_time_ms=response_time,
                 status="success",
-                db=db
+                prompt_tokens_cut=report.tokens_cut,
+                max_tokens=max_tokens
             )
+            completion_budget.record(max_tokens, usage_row["completion_tokens"], usage_row["finish_reason"])
+            if usage_row["finish_reason"] == TRUNCATED:
+                logger.warning(
+                    f"LLM output for user {user_id} was cut off at max_tokens={max_tokens} "
+                    f"({report.tokens_after} prompt tokens)"
+                )
             
-            return parsed_content
+            return parsed_content, usage_row
             
         except Exception as e:
             logger.error(f"LLM API error for user {user_id}: {e}")
             response_time = int((time.time() - start_time) * 1000)
-            self._log_request(
+            telemetry_writer.record(self._request_row(
                 user_id=user_id,
                 response=None,
                 response_time_ms=response_time,
                 status="failed",
-                db=db,
-                error_message=str(e)
-            )
+                prompt_tokens_cut=report.tokens_cut,
+                max_tokens=max_tokens
+            ))
             raise Exception(f"Failed to generate resume content: {str(e)}")
 
     def _parse_llm_output_to_dict(self, llm_output: str) -> Dict[str, str]:
@@ -151,7 +269,8 @@ class LLMClient:
 
     def _create_resume_prompt(self, profile_data: Dict[str, Any], job_description: str) -> str:
         """
-        Create a structured prompt for resume generation. Requests plain text.
+        Per-request part of the prompt: the job description and candidate
+        profile. The instructions are in SYSTEM_PROMPT.
         """
         profile = profile_data.get("profile", {})
         education_list = profile_data.get("education", [])
@@ -170,11 +289,7 @@ class LLMClient:
         if not user_name.strip():
             user_name = profile.get('name', 'The Candidate') # Fallback to profile name
 
-        prompt = f"""
-Generate tailored resume content for the following job description, based on the candidate's profile.
-THE OUTPUT MUST BE PLAIN TEXT, structured with the exact section headers (PROFILE:, EDUCATION:, EXPERIENCE:, PROJECTS:, SKILLS:) each on a new line, followed immediately by the content for that section.
-
-JOB DESCRIPTION:
+        return f"""JOB DESCRIPTION:
 {job_description}
 
 CANDIDATE PROFILE FOR: {user_name}
@@ -191,65 +306,7 @@ PROJECTS:
 
 SKILLS:
 {self._format_skills_for_prompt(skill_list)}
-
-INSTRUCTIONS:
-1. Analyze the JOB DESCRIPTION and the CANDIDATE PROFILE provided above.
-2. Generate compelling, concise, and professional PLAIN TEXT content for each of the following sections.
-3. The content for each section should be suitable for direct insertion into a resume. Use bullet points (e.g., using '-' or '*') for lists within sections like experience and projects where appropriate.
-4. **CRITICALLY IMPORTANT: Structure your entire output with these exact uppercase headers, each on a new line, followed by the content for that section. Example:**
-   PROFILE:
-   [Text for professional summary here...]
-
-   EDUCATION:
-   [Text for education section here...]
-
-   EXPERIENCE:
-   [Text for experience section here...]
-
-   PROJECTS:
-   [Text for projects section here...]
-
-   SKILLS:
-   [Text for skills section here...]
-
-GUIDELINES FOR EACH SECTION'S TEXTUAL CONTENT:
-   - PROFILE:
-     Write a 2-4 sentence professional summary tailored to the job description, highlighting key skills and experiences from the candidate's profile.
-
-   - EDUCATION:
-     For each education entry, provide institution, degree, field of study (if any), graduation date (or expected). Optionally, include 1-2 bullet points per entry for key achievements, relevant coursework, or GPA if significant and high.
-     Example format for one entry's text:
-     Institution Name - Degree in Field of Study (Graduation: Month Year)
-     - Relevant coursework: Course A, Course B
-     - GPA: 3.X/4.0
-
-   - EXPERIENCE:
-     For each experience entry, provide company, position, and dates of employment. Follow with 2-4 bullet points detailing responsibilities and achievements. Quantify achievements where possible and tailor these points to the job description.
-     Example format for one entry's text:
-     Company Name - Position Title (Month Year - Month Year)
-     - Achieved X by implementing Y, resulting in Z impact (e.g., 15% improvement in Q).
-     - Led a team to develop a new feature, enhancing user engagement.
-
-   - PROJECTS:
-     For each project, provide the project title and optionally dates. Follow with 1-3 bullet points describing the project, technologies used, your role, and key outcomes or impact.
-     Example format for one entry's text:
-     Project Title (Optional: Month Year - Month Year)
-     - Developed X using Y (e.g., Python, React) and Z (e.g., PostgreSQL).
-     - Implemented feature A which resulted in B (e.g., reduced processing time by 10%).
-
-   - SKILLS:
-     Provide a categorized list of skills. Examples of categories: Programming Languages, Frameworks & Libraries, Databases, Tools, Cloud Platforms, Other Technical Skills, Soft Skills.
-     Example format for the skills text:
-     Programming Languages: Python, Java, JavaScript
-     Frameworks & Libraries: React, Node.js, Spring Boot
-     Databases: PostgreSQL, MongoDB
-     Tools: Git, Docker, Kubernetes
-
-5. **DO NOT** include any LaTeX commands (e.g., \\section, \\textbf, \\item).
-6. **DO NOT** include any explanations, apologies, or conversational text outside of the requested section content. Output only the structured resume content starting with "PROFILE:".
-7. Ensure each section header (PROFILE:, EDUCATION:, etc.) is ON ITS OWN LINE.
 """
-        return prompt
     
     def _format_bullet_points(self, text: Optional[str], indent: str = "  ") -> str:
         if not text: return ""
@@ -328,38 +385,47 @@ GUIDELINES FOR EACH SECTION'S TEXTUAL CONTENT:
             skill_details.append(detail)
         return "\n".join(skill_details) if skill_details else "No skills listed."
 
-    def _log_request(
+    def _request_row(
         self, 
         user_id: int, 
         response: Optional[Any], 
         response_time_ms: int, 
         status: str,
-        db: Session,
-        error_message: Optional[str] = None
-    ):
-        """Log the LLM request for monitoring and billing"""
-        try:
-            prompt_tokens, completion_tokens, total_tokens = None, None, None
-            if response and hasattr(response, 'usage') and response.usage:
-                prompt_tokens = response.usage.prompt_tokens
-                completion_tokens = response.usage.completion_tokens
-                total_tokens = response.usage.total_tokens
-            
-            log_entry = LLMRequest(
-                user_id=user_id,
-                prompt_tokens=prompt_tokens,
-                completion_tokens=completion_tokens,
-                total_tokens=total_tokens,
-                model_used=self.model,
-                response_time_ms=response_time_ms,
-                status=status
-            )
-            db.add(log_entry)
-            db.commit()
-            token_info = total_tokens if total_tokens is not None else 'N/A'
-            logger.info(f"LLM request logged for user {user_id}. Status: {status}. Tokens: {token_info}")
-        except Exception as e:
-            logger.error(f"Failed to log LLM request for user {user_id}: {e}")
+        prompt_tokens_cut: Optional[int] = None,
+        max_tokens: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """llm_requests row for one call, for monitoring and billing"""
+        prompt_tokens, completion_tokens, total_tokens, cached_tokens = None, None, None, None
+        if response and hasattr(response, 'usage') and response.usage:
+            prompt_tokens = response.usage.prompt_tokens
+            completion_tokens = response.usage.completion_tokens
+            total_tokens = response.usage.total_tokens
+            # Prompt tokens served from the provider's prefix cache; a plain
+            # dict on client versions that predate the field
+            details = getattr(response.usage, 'prompt_tokens_details', None)
+            if isinstance(details, dict):
+                cached_tokens = details.get('cached_tokens')
+            elif details is not None:
+                cached_tokens = getattr(details, 'cached_tokens', None)
+        finish_reason = response.choices[0].finish_reason if response and response.choices else None
+
+        token_info = total_tokens if total_tokens is not None else 'N/A'
+        logger.info(f"LLM request for user {user_id}. Status: {status}. Tokens: {token_info} (cached: {cached_tokens or 0})")
+        return {
+            "user_id": user_id,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": total_tokens,
+            "model_used": self.model,
+            "request_time": datetime.now(timezone.utc),
+            "response_time_ms": response_time_ms,
+            "status": status,
+            "prompt_tokens_cut": prompt_tokens_cut,
+            "max_tokens": max_tokens,
+            "finish_reason": finish_reason,
+            "prompt_version": PROMPT_VERSION,
+            "cached_tokens": cached_tokens,
+        }
 
 
 # Example usage (for testing purposes, not part of the class)
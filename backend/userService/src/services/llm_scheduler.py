@@ -0,0 +1,195 @@
+"""
+Admission and fair-share scheduling for LLM calls.
+
+At most LLM_MAX_CONCURRENCY generations call the model at once. The rest
+wait in one queue ordered by weighted fair queuing. Each request gets a
+virtual finish tag:
+    max(virtual clock, user's previous tag) + 1 / class weight
+The lowest tag runs next. The effects:
+- Users take turns. One user with many requests cannot crowd out others.
+- Registered users (LLM_REGISTERED_WEIGHT) get a larger share than guests
+  (LLM_GUEST_WEIGHT). Guests are never starved outright.
+
+Limits:
+- A user may have LLM_USER_MAX_IN_FLIGHT requests queued or running. Past
+  that, the request is rejected with a 429.
+- A request that has not started within LLM_QUEUE_TIMEOUT_SECONDS fails
+  with a 503. So does one that finds LLM_MAX_QUEUED requests already
+  waiting.
+
+Queue wait per class is recorded for /health. All state lives on the event
+loop, so no lock is needed.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, List, Tuple
+
+from src.core.config import settings
+from src.core.exceptions import RateLimitExceeded, ServiceUnavailableException
+
+logger = logging.getLogger(__name__)
+
+REGISTERED = "registered"
+GUEST = "guest"
+
+# Recent waits kept per class for percentiles
+_WAIT_SAMPLES = 1000
+
+
+class LLMBusy(ServiceUnavailableException):
+    def __init__(self, detail: str = "Resume generation is busy, please retry shortly"):
+        super().__init__(detail=detail)
+        self.headers = {"Retry-After": str(settings.load_shed_retry_after_seconds)}
+
+
+class LLMUserBusy(RateLimitExceeded):
+    def __init__(self):
+        super().__init__(detail="A resume is already being generated for you, please wait for it to finish")
+        self.headers = {"Retry-After": str(settings.load_shed_retry_after_seconds)}
+
+
+class _ClassStats:
+    def __init__(self):
+        self.started = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+        self.waits: Deque[float] = deque(maxlen=_WAIT_SAMPLES)
+
+    def record_wait(self, wait_ms: float) -> None:
+        self.started += 1
+        self.wait_ms_total += wait_ms
+        self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+        self.waits.append(wait_ms)
+
+    def as_dict(self) -> Dict[str, float]:
+        waits = sorted(self.waits)
+        p95 = waits[min(len(waits) - 1, math.ceil(len(waits) * 0.95) - 1)] if waits else 0.0
+        return {
+            "started": self.started,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "wait_ms_avg": round(self.wait_ms_total / (self.started or 1), 1),
+            "wait_ms_p95": round(p95, 1),
+            "wait_ms_max": round(self.wait_ms_max, 1),
+        }
+
+
+class LLMScheduler:
+    def __init__(
+        self,
+        max_concurrency: int = settings.llm_max_concurrency,
+        max_queued: int = settings.llm_max_queued,
+        user_max_in_flight: int = settings.llm_user_max_in_flight,
+        queue_timeout_seconds: float = settings.llm_queue_timeout_seconds,
+        weights: Dict[str, int] = None
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queued = max_queued
+        self.user_max_in_flight = user_max_in_flight
+        self.queue_timeout = queue_timeout_seconds
+        self.weights = weights or {REGISTERED: settings.llm_registered_weight, GUEST: settings.llm_guest_weight}
+        self._queue: List[Tuple[float, int, asyncio.Future]] = []  # (finish tag, seq, waiter)
+        self._seq = itertools.count()
+        self._running = 0
+        self._waiting = 0
+        self._virtual_time = 0.0
+        self._user_tags: Dict[Any, float] = {}
+        self._user_in_flight: Dict[Any, int] = {}
+        self._stats = {REGISTERED: _ClassStats(), GUEST: _ClassStats()}
+
+    @property
+    def queued(self) -> int:
+        return self._waiting
+
+    def saturated(self) -> bool:
+        return self._waiting >= self.max_queued
+
+    def _tag(self, user_id: Any, priority: str) -> float:
+        tag = max(self._virtual_time, self._user_tags.get(user_id, 0.0)) + 1.0 / self.weights[priority]
+        self._user_tags[user_id] = tag
+        return tag
+
+    def _release(self) -> None:
+        """Hand the finished call's slot to the next waiter, or free it"""
+        while self._queue:
+            tag, _, waiter = heapq.heappop(self._queue)
+            if not waiter.done():
+                self._virtual_time = max(self._virtual_time, tag)
+                waiter.set_result(None)
+                return
+        self._running -= 1
+
+    async def _wait_turn(self, user_id: Any, priority: str) -> None:
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (self._tag(user_id, priority), next(self._seq), waiter))
+        self._waiting += 1
+        try:
+            await asyncio.wait({waiter}, timeout=self.queue_timeout)
+        except BaseException:
+            # Cancelled while queued; pass the slot on if it had just arrived
+            if waiter.done():
+                self._release()
+            else:
+                waiter.cancel()
+            raise
+        finally:
+            self._waiting -= 1
+        if not waiter.done():
+            waiter.cancel()
+            self._stats[priority].timed_out += 1
+            logger.warning(f"LLM request for user {user_id} timed out after {self.queue_timeout}s in queue")
+            raise LLMBusy()
+
+    @asynccontextmanager
+    async def slot(self, user_id: Any, is_guest: bool = False) -> AsyncIterator[None]:
+        """Hold one of the LLM slots for the duration of the block"""
+        priority = GUEST if is_guest else REGISTERED
+        stats = self._stats[priority]
+        if self._user_in_flight.get(user_id, 0) >= self.user_max_in_flight:
+            stats.rejected += 1
+            raise LLMUserBusy()
+        free = self._running < self.max_concurrency and not self._waiting
+        if not free and self.saturated():
+            stats.rejected += 1
+            raise LLMBusy()
+
+        self._user_in_flight[user_id] = self._user_in_flight.get(user_id, 0) + 1
+        queued_at = time.monotonic()
+        try:
+            if free:
+                self._tag(user_id, priority)
+                self._running += 1
+            else:
+                await self._wait_turn(user_id, priority)
+            stats.record_wait((time.monotonic() - queued_at) * 1000)
+            try:
+                yield
+            finally:
+                self._release()
+        finally:
+            remaining = self._user_in_flight[user_id] - 1
+            if remaining:
+                self._user_in_flight[user_id] = remaining
+            else:
+                # An idle user starts again from the virtual clock
+                del self._user_in_flight[user_id]
+                self._user_tags.pop(user_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._running,
+            "queued": self._waiting,
+            "max_concurrency": self.max_concurrency,
+            "wait": {priority: stats.as_dict() for priority, stats in self._stats.items()},
+        }
+
+
+llm_scheduler = LLMScheduler()
@@ -0,0 +1,263 @@
+"""
+Streaming NDJSON ingestion of profile child rows through Postgres COPY.
+
+Each input line is one JSON object with a `type` (skill, experience,
+education or project), the target `profile_id`, and the fields of the
+matching *CreateRequest schema:
+
+    {"type": "skill", "profile_id": 12, "name": "Python", "proficiency": "Expert"}
+
+Lines are validated as they arrive and valid rows are encoded for COPY
+every `chunk_rows` rows into a per-table spool file, which stays in memory up
+to SPOOL_MEMORY_BYTES and moves to disk beyond that, so memory stays bounded
+however large the upload is. No transaction is open while the client sends
+the body: the spools are written with COPY only once it has been consumed,
+so a slow client cannot hold a connection, its locks or the xmin horizon.
+Invalid lines are counted and reported, never fatal.
+"""
+import json
+import logging
+import tempfile
+from datetime import date
+from typing import Any, AsyncIterator, Dict, List
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import String
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from src.core.config import settings
+from src.models.profiles import Profile
+from src.models.skills import Skill
+from src.models.experience import Experience
+from src.models.education import Education
+from src.models.projects import Project
+from src.schemas.skills import SkillCreateRequest
+from src.schemas.experience import ExperienceCreateRequest
+from src.schemas.education import EducationCreateRequest
+from src.schemas.projects import ProjectCreateRequest
+
+logger = logging.getLogger(__name__)
+
+RECORD_TYPES = {
+    "skill": (SkillCreateRequest, Skill),
+    "experience": (ExperienceCreateRequest, Experience),
+    "education": (EducationCreateRequest, Education),
+    "project": (ProjectCreateRequest, Project),
+}
+
+SPOOL_MEMORY_BYTES = 8 * 1024 * 1024
+
+
+def _copy_value(value: Any) -> str:
+    """Encode a value for COPY ... FROM STDIN in text format"""
+    if value is None:
+        return r"\N"
+    if isinstance(value, date):
+        return value.isoformat()
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+class LineError(Exception):
+    pass
+
+
+class NDJSONIngestor:
+    """
+    Ingests one NDJSON upload for one user. Not reusable across requests.
+    """
+
+    def __init__(self, db: Session, user_id: int):
+        self.db = db
+        self.user_id = user_id
+        self.chunk_rows = settings.ingest_chunk_rows
+        self.max_line_bytes = settings.ingest_max_line_bytes
+        self.max_reported_errors = settings.ingest_max_reported_errors
+
+        self._owned: Dict[int, bool] = {}
+        self._buffers: Dict[str, List[BaseModel]] = {name: [] for name in RECORD_TYPES}
+        self._profile_ids: Dict[str, List[int]] = {name: [] for name in RECORD_TYPES}
+        self._spools: Dict[str, tempfile.SpooledTemporaryFile] = {}
+        self._spooled: Dict[str, int] = {name: 0 for name in RECORD_TYPES}
+        self.lines = 0
+        self.inserted: Dict[str, int] = {name: 0 for name in RECORD_TYPES}
+        self.rejected = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def _reject(self, line_no: int, message: str) -> None:
+        self.rejected += 1
+        if len(self.errors) < self.max_reported_errors:
+            self.errors.append({"line": line_no, "error": message})
+
+    def _owns_profile(self, profile_id: int) -> bool:
+        owned = self._owned.get(profile_id)
+        if owned is None:
+            owned = self.db.query(Profile.id).filter(
+                Profile.id == profile_id,
+                Profile.user_id == self.user_id
+            ).first() is not None
+            # Don't keep the read's transaction open while the client sends more
+            self.db.rollback()
+            self._owned[profile_id] = owned
+        return owned
+
+    def _parse(self, raw: bytes) -> tuple[str, int, BaseModel]:
+        try:
+            record = json.loads(raw)
+        except (ValueError, UnicodeDecodeError) as e:
+            raise LineError(f"Invalid JSON: {e}")
+        if not isinstance(record, dict):
+            raise LineError("Line must be a JSON object")
+
+        record_type = record.pop("type", None)
+        if record_type not in RECORD_TYPES:
+            raise LineError(f"Unknown type {record_type!r}, expected one of {sorted(RECORD_TYPES)}")
+        profile_id = record.pop("profile_id", None)
+        if not isinstance(profile_id, int) or isinstance(profile_id, bool):
+            raise LineError("profile_id must be an integer")
+
+        schema, model = RECORD_TYPES[record_type]
+        try:
+            item = schema.model_validate(record)
+        except ValidationError as e:
+            raise LineError("; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()))
+
+        # Reject values COPY would fail on, so one bad line cannot abort the ingest
+        for field, value in item:
+            if not isinstance(value, str):
+                continue
+            if "\x00" in value:
+                raise LineError(f"{field}: NUL characters are not allowed")
+            column_type = model.__table__.c[field].type
+            if isinstance(column_type, String) and column_type.length and len(value) > column_type.length:
+                raise LineError(f"{field}: at most {column_type.length} characters")
+        return record_type, profile_id, item
+
+    async def _handle_line(self, line_no: int, raw: bytes) -> None:
+        if not raw.strip():
+            return
+        self.lines += 1
+        if len(raw) > self.max_line_bytes:
+            self._reject(line_no, f"Line exceeds {self.max_line_bytes} bytes")
+            return
+        try:
+            record_type, profile_id, item = self._parse(raw)
+        except LineError as e:
+            self._reject(line_no, str(e))
+            return
+
+        if profile_id not in self._owned:
+            await run_in_threadpool(self._owns_profile, profile_id)
+        if not self._owned[profile_id]:
+            self._reject(line_no, f"Profile {profile_id} not found or access denied")
+            return
+
+        self._buffers[record_type].append(item)
+        self._profile_ids[record_type].append(profile_id)
+        if len(self._buffers[record_type]) >= self.chunk_rows:
+            await run_in_threadpool(self._spool, record_type)
+
+    def _spool(self, record_type: str) -> None:
+        """Encode the buffered rows of a table for COPY and append them to its spool"""
+        items = self._buffers[record_type]
+        if not items:
+            return
+        schema, _ = RECORD_TYPES[record_type]
+        fields = list(schema.model_fields)
+        spool = self._spools.get(record_type)
+        if spool is None:
+            spool = self._spools[record_type] = tempfile.SpooledTemporaryFile(
+                max_size=SPOOL_MEMORY_BYTES, mode="w+", encoding="utf-8"
+            )
+        for profile_id, item in zip(self._profile_ids[record_type], items):
+            spool.write("\t".join(_copy_value(v) for v in [profile_id] + [getattr(item, f) for f in fields]))
+            spool.write("\n")
+
+        self._spooled[record_type] += len(items)
+        self._buffers[record_type] = []
+        self._profile_ids[record_type] = []
+
+    def _copy(self, record_type: str) -> None:
+        spool = self._spools.get(record_type)
+        if spool is None:
+            return
+        schema, model = RECORD_TYPES[record_type]
+        columns = ["profile_id"] + list(schema.model_fields)
+        spool.seek(0)
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {model.__tablename__} ({', '.join(columns)}) FROM STDIN",
+                spool
+            )
+        finally:
+            cursor.close()
+        self.inserted[record_type] += self._spooled[record_type]
+
+    def _close(self) -> None:
+        for spool in self._spools.values():
+            spool.close()
+        self._spools = {}
+
+    async def ingest(self, stream: AsyncIterator[bytes]) -> Dict[str, Any]:
+        """
+        Consume the request body, COPY every valid row, and return a summary.
+        The COPY runs in the session's transaction after the body has been
+        read; the caller owns it (commit or rollback).
+        """
+        try:
+            return await self._ingest(stream)
+        finally:
+            self._close()
+
+    async def _ingest(self, stream: AsyncIterator[bytes]) -> Dict[str, Any]:
+        # Authentication may have read through this session; end that transaction too
+        await run_in_threadpool(self.db.rollback)
+        buffer = b""
+        line_no = 0
+        discarding = False  # inside a line longer than max_line_bytes
+
+        async for chunk in stream:
+            buffer += chunk
+            *complete, buffer = buffer.split(b"\n")
+            for raw in complete:
+                line_no += 1
+                if discarding:
+                    discarding = False
+                    self.lines += 1
+                    self._reject(line_no, f"Line exceeds {self.max_line_bytes} bytes")
+                    continue
+                await self._handle_line(line_no, raw)
+            if len(buffer) > self.max_line_bytes:
+                discarding = True
+                buffer = b""
+
+        if discarding:
+            self.lines += 1
+            self._reject(line_no + 1, f"Line exceeds {self.max_line_bytes} bytes")
+        elif buffer:
+            await self._handle_line(line_no + 1, buffer)
+
+        for record_type in RECORD_TYPES:
+            await run_in_threadpool(self._spool, record_type)
+        for record_type in RECORD_TYPES:
+            await run_in_threadpool(self._copy, record_type)
+
+        summary = {
+            "lines": self.lines,
+            "inserted": dict(self.inserted),
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "errors_truncated": self.rejected > len(self.errors),
+        }
+        logger.info(
+            f"NDJSON ingest for user {self.user_id}: {self.lines} lines, "
+            f"{sum(self.inserted.values())} inserted, {self.rejected} rejected"
+        )
+        return summary
@@ -0,0 +1,281 @@
+"""
+Token budget for resume prompts.
+
+Prompts are measured with the configured model's tokenizer (tiktoken) before
+they are sent. When a prompt is over LLM_PROMPT_BUDGET_TOKENS, the profile is
+cut down one step at a time, starting with the items least relevant to the
+job description, until it fits:
+1. Descriptions longer than LLM_PROMPT_ITEM_MAX_TOKENS keep only their most
+   relevant lines, in their original order.
+2. Whole items are dropped, lowest ranked first. At least MIN_KEEP items of
+   each section are kept.
+
+An item's rank is the overlap of its words with the job description, plus a
+bonus for recent or current entries. Every cut is listed in the
+PromptReport, which the caller logs and stores with the request.
+
+Nothing is truncated silently:
+- A job description over LLM_JOB_DESCRIPTION_MAX_TOKENS is rejected with a
+  413.
+- So is a prompt that is still over budget after every allowed cut.
+
+If the tokenizer's encoding cannot be loaded (for example, no network to
+fetch it), counts fall back to CHARS_PER_TOKEN characters per token.
+"""
+import logging
+import math
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import tiktoken
+from fastapi import status
+
+from src.core.config import settings
+from src.core.exceptions import AppException
+
+logger = logging.getLogger(__name__)
+
+# Rough size of a token in English text, used when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+# Chat format framing per message, plus the reply primer
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REPLY = 3
+
+SECTIONS = ("experience", "projects", "education", "skills")
+MIN_KEEP = {"experience": 2, "projects": 1, "education": 1, "skills": 0}
+
+_WORD = re.compile(r"[a-z][a-z0-9+#.\-]{2,}")
+_STOP_WORDS = {
+    "and", "the", "for", "with", "you", "our", "are", "will", "that", "this", "from", "have",
+    "has", "was", "were", "your", "their", "they", "who", "all", "can", "able", "into", "using",
+    "used", "use", "work", "working", "team", "experience", "years", "year", "including", "etc",
+}
+
+
+class PromptTooLarge(AppException):
+    def __init__(self, detail: str):
+        super().__init__(detail=detail, status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str) -> Optional["tiktoken.Encoding"]:
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"No tokenizer for {model}, estimating {CHARS_PER_TOKEN} characters per token: {e}")
+        return None
+
+
+def count_tokens(text: str, model: str = settings.llm_model) -> int:
+    encoding = _encoding(model)
+    if encoding is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_message_tokens(messages: List[Dict[str, str]], model: str = settings.llm_model) -> int:
+    """Prompt tokens of a chat request, as the API bills them"""
+    return sum(TOKENS_PER_MESSAGE + count_tokens(m["content"], model) for m in messages) + TOKENS_PER_REPLY
+
+
+@dataclass
+class PromptReport:
+    budget: int
+    tokens_before: int
+    tokens_after: int = 0
+    trimmed: List[str] = field(default_factory=list)  # items whose description was shortened
+    dropped: List[str] = field(default_factory=list)  # items left out
+
+    @property
+    def tokens_cut(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+    def summary(self) -> str:
+        return (
+            f"{self.tokens_before} -> {self.tokens_after} tokens (budget {self.budget}); "
+            f"trimmed {self.trimmed or 'nothing'}; dropped {self.dropped or 'nothing'}"
+        )
+
+
+def _words(text: str) -> set:
+    return set(_WORD.findall(text.lower())) - _STOP_WORDS
+
+
+def _item_text(item: Dict[str, Any]) -> str:
+    parts = [value for value in item.values() if isinstance(value, str)]
+    if isinstance(item.get("technologies"), list):
+        parts += [str(tech) for tech in item["technologies"]]
+    return " ".join(parts)
+
+
+def _label(section: str, item: Dict[str, Any]) -> str:
+    name = " - ".join(
+        str(item[key]) for key in ("company", "position", "title", "institution", "degree", "name") if item.get(key)
+    )
+    return f"{section}: {name or 'untitled'}"
+
+
+def _recency(item: Dict[str, Any]) -> float:
+    """1 for current entries, fading to 0 over ten years"""
+    if "end_date" not in item:
+        return 0.0
+    end = item.get("end_date")
+    if not end:
+        return 1.0
+    try:
+        year = int(str(end)[:4])
+    except ValueError:
+        return 0.0
+    return max(0.0, 1.0 - (datetime.now(timezone.utc).year - year) / 10)
+
+
+def _relevance(words: set, jd_words: set) -> float:
+    if not words:
+        return 0.0
+    return len(words & jd_words) / math.sqrt(len(words))
+
+
+def _trim_description(description: str, jd_words: set, max_tokens: int, model: str) -> str:
+    """Most relevant lines of a description that fit max_tokens, in their original order"""
+    lines = [line for line in description.splitlines() if line.strip()]
+    ranked = sorted(range(len(lines)), key=lambda i: (-_relevance(_words(lines[i]), jd_words), i))
+    keep, used = set(), 0
+    for index in ranked:
+        cost = count_tokens(lines[index], model) + 1
+        if used + cost > max_tokens:
+            continue
+        keep.add(index)
+        used += cost
+    return "\n".join(lines[i] for i in sorted(keep))
+
+
+class PromptBudgeter:
+    def __init__(
+        self,
+        budget_tokens: int = settings.llm_prompt_budget_tokens,
+        item_max_tokens: int = settings.llm_prompt_item_max_tokens,
+        job_description_max_tokens: int = settings.llm_job_description_max_tokens
+    ):
+        self.budget = budget_tokens
+        self.item_max_tokens = item_max_tokens
+        self.job_description_max_tokens = job_description_max_tokens
+        self.prompts = 0
+        self.cut_prompts = 0
+        self.rejected = 0
+        self.tokens_before_total = 0
+        self.tokens_after_total = 0
+
+    def fit(
+        self,
+        profile_data: Dict[str, Any],
+        job_description: str,
+        render: Callable[[Dict[str, Any]], List[Dict[str, str]]],
+        model: str = settings.llm_model
+    ) -> Tuple[List[Dict[str, str]], Dict[str, Any], PromptReport]:
+        """
+        Messages for `profile_data` within the prompt budget. `render` builds
+        the chat messages from profile data. Returns the messages, the
+        (possibly reduced) profile data they were built from, and the report.
+        """
+        jd_tokens = count_tokens(job_description, model)
+        if jd_tokens > self.job_description_max_tokens:
+            self.rejected += 1
+            raise PromptTooLarge(
+                f"Job description is too long ({jd_tokens} tokens, max {self.job_description_max_tokens}). "
+                "Please shorten it to the role's requirements and responsibilities."
+            )
+
+        messages = render(profile_data)
+        tokens = count_message_tokens(messages, model)
+        report = PromptReport(budget=self.budget, tokens_before=tokens)
+        data = profile_data
+        if tokens > self.budget:
+            data, messages, tokens = self._reduce(profile_data, job_description, render, model, report, tokens)
+        report.tokens_after = tokens
+
+        self.prompts += 1
+        self.tokens_before_total += report.tokens_before
+        self.tokens_after_total += tokens
+        if report.tokens_cut:
+            self.cut_prompts += 1
+        return messages, data, report
+
+    def _reduce(self, profile_data, job_description, render, model, report, tokens):
+        jd_words = _words(job_description)
+        data = {key: (list(value) if key in SECTIONS else value) for key, value in profile_data.items()}
+        ranked: List[Tuple[float, str, Dict[str, Any]]] = []
+        for section in SECTIONS:
+            for item in data.get(section) or []:
+                score = _relevance(_words(_item_text(item)), jd_words) + 0.5 * _recency(item)
+                ranked.append((score, section, item))
+        ranked.sort(key=lambda entry: entry[0])
+
+        # Cheapest cuts first: shorten long descriptions, then drop whole items
+        steps: List[Tuple[str, str, Dict[str, Any]]] = []
+        for _, section, item in ranked:
+            description = item.get("description")
+            if description and count_tokens(description, model) > self.item_max_tokens:
+                steps.append(("trim", section, item))
+        steps += [("drop", section, item) for _, section, item in ranked]
+
+        # Re-render only once the running estimate of what was cut says it fits.
+        # An item costs its text plus its share of the formatting around it.
+        texts = sum(count_tokens(_item_text(item), model) for _, _, item in ranked)
+        bare = count_message_tokens(render({key: ([] if key in SECTIONS else value) for key, value in data.items()}), model)
+        overhead = max(0, tokens - bare - texts) // max(1, len(ranked))
+        estimate = tokens
+        current = {id(item): item for _, _, item in ranked}  # original item -> its version in `data`
+        for action, section, item in steps:
+            items = data[section]
+            position = next(i for i, entry in enumerate(items) if entry is current[id(item)])
+            if action == "trim":
+                shortened = dict(item, description=_trim_description(item["description"], jd_words, self.item_max_tokens, model))
+                items[position] = current[id(item)] = shortened
+                estimate -= count_tokens(item["description"], model) - count_tokens(shortened["description"], model)
+                report.trimmed.append(_label(section, item))
+            else:
+                if len(items) <= MIN_KEEP[section]:
+                    continue
+                estimate -= count_tokens(_item_text(items.pop(position)), model) + overhead
+                label = _label(section, item)
+                if label in report.trimmed:
+                    report.trimmed.remove(label)
+                report.dropped.append(label)
+            if estimate <= self.budget:
+                messages = render(data)
+                tokens = count_message_tokens(messages, model)
+                if tokens <= self.budget:
+                    return data, messages, tokens
+                estimate = tokens
+
+        # The estimate leaves out each item's formatting, so the last state may fit anyway
+        messages = render(data)
+        tokens = count_message_tokens(messages, model)
+        if tokens <= self.budget:
+            return data, messages, tokens
+        self.rejected += 1
+        raise PromptTooLarge(
+            f"Profile is too large for one resume even after trimming ({tokens} tokens, max {self.budget}). "
+            "Please shorten some descriptions or generate from a smaller profile."
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        before = self.tokens_before_total
+        return {
+            "prompts": self.prompts,
+            "cut_prompts": self.cut_prompts,
+            "rejected": self.rejected,
+            "tokens_avg_before": round(before / self.prompts, 1) if self.prompts else None,
+            "tokens_avg_after": round(self.tokens_after_total / self.prompts, 1) if self.prompts else None,
+            "reduction_pct": round(100 * (before - self.tokens_after_total) / before, 1) if before else None,
+        }
+
+
+prompt_budgeter = PromptBudgeter()
@@ -1,4 +1,6 @@
 from typing import Dict, Any, List, Optional
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import func, insert
 from sqlalchemy.orm import Session
 from src.models.users import User
 from src.models.profiles import Profile
@@ -7,7 +9,17 @@ from src.models.experience import Experience
 from src.models.projects import Project
 from src.models.skills import Skill
 from src.models.generated_resumes import GeneratedResume
+from src.models.job_descriptions import JobDescription
+from src.models.llm_requests import LLMRequest
+from src.schemas.resumes import ResumeResponse
 from src.services.llm_client import LLMClient
+from src.services.llm_scheduler import llm_scheduler
+from src.services.token_budget import token_budgets
+from src.services.resume_storage import ResumeStorage
+from src.services.telemetry import telemetry_writer
+from src.utils.rate_limiter import ResumeRateLimiter
+from src.utils.pagination import paginate
+from src.utils.search import search_headline, search_query, search_rank
 import logging
 import os
 import re
@@ -18,6 +30,12 @@ logger = logging.getLogger(__name__)
 TEMPLATE_DIR = os.path.dirname(__file__)
 RESUME_TEMPLATE_PATH = os.path.join(TEMPLATE_DIR, "resume_template.tex")
 
+# Characters of the job description returned by the resume listing
+JOB_DESCRIPTION_PREVIEW_CHARS = 200
+
+# ts_headline options for search results: one short excerpt around the matches
+SEARCH_HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MinWords=10, MaxWords=30"
+
 class ResumeService:
     """
     Service for handling resume generation and management
@@ -26,6 +44,7 @@ class ResumeService:
     def __init__(self):
         self.llm_client = LLMClient()
         self._latex_template = self._load_latex_template()
+        self.storage = ResumeStorage(self._latex_template)
 
     def _load_latex_template(self) -> str:
         try:
@@ -375,15 +394,18 @@ class ResumeService:
 
     async def generate_resume(
         self, 
-        user_id: int, 
+        user: User, 
         profile_id: int, 
         job_description: str, 
         db: Session
-    ) -> GeneratedResume:
+    ) -> ResumeResponse:
         """
         Generate a tailored resume in LaTeX format.
         Users can copy the LaTeX and use with Overleaf or local LaTeX editor.
+        The estimated tokens are checked against the user's token budgets, then
+        the LLM call waits its turn in the LLM scheduler; guests get a smaller share.
         """
+        user_id = user.id
         try:
             if not self._latex_template or "template not found" in self._latex_template or "Error loading" in self._latex_template:
                 raise ValueError(f"LaTeX template is not loaded properly: {self._latex_template}")
@@ -393,70 +415,39 @@ class ResumeService:
             if not profile_data_dict.get("profile") or not profile_data_dict.get("user"):
                 raise ValueError("Core profile or user data is missing.")
 
-            llm_generated_sections = await self.llm_client.generate_resume_content(
-                profile_data=profile_data_dict,
-                job_description=job_description,
-                user_id=user_id,
-                db=db
-            )
-
-            populated_latex = self._latex_template
-            user_obj = profile_data_dict["user"]
-            
-            user_full_name = f"{user_obj.get('firstName', '')} {user_obj.get('lastName', '')}".strip()
-            user_email = user_obj.get('email', '[Your Email]')
-            user_linkedin = profile_data_dict.get("profile", {}).get("linkedin_url", "").strip()
-            user_github = profile_data_dict.get("profile", {}).get("github_url", "").strip()
-            user_phone = profile_data_dict.get("profile", {}).get("phone_number", "").strip()
-            user_location = profile_data_dict.get("profile", {}).get("location", "").strip()
-            
-            # Populate user info
-            populated_latex = populated_latex.replace("[User Name]", self._escape_latex(user_full_name) or "Your Name")
-            populated_latex = populated_latex.replace("[User Email]", self._escape_latex(user_email))
-            
-            # Build contact info based on what user provided
-            contact_info = ""
-            if user_linkedin:
-                contact_info += f" $|$ \\faLinkedinSquare \\hspace{{.5pt}} \\href{{{self._escape_latex(user_linkedin)}}}{{LinkedIn}}"
-            if user_github:
-                contact_info += f" $|$ \\faGithub \\hspace{{.5pt}} \\href{{{self._escape_latex(user_github)}}}{{GitHub}}"
-            if user_location:
-                contact_info += f" $|$ \\faMapMarker \\hspace{{.5pt}} {{{self._escape_latex(user_location)}}}"
-            if user_phone:
-                contact_info += f" $|$ \\faPhone \\hspace{{.5pt}} {{{self._escape_latex(user_phone)}}}"
-            
-            populated_latex = populated_latex.replace("[LINKEDIN_CONTACT]", "")
-            populated_latex = populated_latex.replace("[GITHUB_CONTACT]", "")
-            populated_latex = populated_latex.replace("[LOCATION_CONTACT]", "")
-            populated_latex = populated_latex.replace("[PHONE_CONTACT]", "")
-            
-            # Replace with actual contact info if provided
-            if contact_info:
-                populated_latex = populated_latex.replace("[LINKEDIN_CONTACT][GITHUB_CONTACT][LOCATION_CONTACT][PHONE_CONTACT]", contact_info)
+            prompt = self.llm_client.build_messages(profile_data_dict, job_description)
+            budget = token_budgets.reserve(db, user, self.llm_client.estimate_tokens(prompt[1]))
+            is_guest = user.is_guest
+            # Only reads so far; end the transaction so the connection goes back to the
+            # pool instead of idling through the queue wait and the LLM call.
+            # _save_generation starts a new one.
+            db.rollback()
+            try:
+                async with llm_scheduler.slot(user_id, is_guest):
+                    llm_generated_sections, llm_request_row = await self.llm_client.generate_resume_content(
+                        profile_data=profile_data_dict,
+                        job_description=job_description,
+                        user_id=user_id,
+                        prompt=prompt
+                    )
+            except BaseException:
+                token_budgets.release(budget)
+                raise
+            token_budgets.settle(budget, llm_request_row["total_tokens"])
 
-            populated_latex = populated_latex.replace("[LLM_GENERATED_PROFILE_SUMMARY]", self._escape_latex(llm_generated_sections.get("PROFILE", "")))
-            populated_latex = populated_latex.replace("[EDUCATION_SECTION_CONTENT]", self._format_education_section(llm_generated_sections.get("EDUCATION", ""), profile_data_dict))
-            populated_latex = populated_latex.replace("[EXPERIENCE_SECTION_CONTENT]", self._format_experience_section(llm_generated_sections.get("EXPERIENCE", ""), profile_data_dict))
-            populated_latex = populated_latex.replace("[PROJECTS_SECTION_CONTENT]", self._format_projects_section(llm_generated_sections.get("PROJECTS", ""), profile_data_dict))
-            populated_latex = populated_latex.replace("[SKILLS_SECTION_CONTENT]", self._escape_latex(llm_generated_sections.get("SKILLS", "")))
-            
-            validation_issues = self._validate_latex_content(populated_latex)
-            if validation_issues:
-                logger.warning(f"LaTeX validation issues for user {user_id}, profile {profile_id}: {validation_issues}")
+            try:
+                populated_latex = self._populate_latex(profile_data_dict, llm_generated_sections, user_id, profile_id)
+            except Exception:
+                # The call was made and billed; keep its usage record
+                telemetry_writer.record(llm_request_row)
+                raise
 
-            generated_resume = GeneratedResume(
-                user_id=user_id,
-                profile_id=profile_id,
-                job_description=job_description,
-                latex_content=populated_latex
+            return self._save_generation(
+                db, user_id, profile_id, job_description, populated_latex, llm_request_row
             )
             
-            db.add(generated_resume)
-            db.commit()
-            db.refresh(generated_resume)
-            
-            return generated_resume
-            
+        except HTTPException:
+            raise
         except ValueError as ve:
             logger.warning(f"Resume generation ValueError for user {user_id}, profile {profile_id}: {ve}")
             raise
@@ -464,6 +455,104 @@ class ResumeService:
             logger.error(f"Resume generation failed for user {user_id}, profile {profile_id}: {e}", exc_info=True)
             raise
     
+    def _populate_latex(
+        self,
+        profile_data_dict: Dict[str, Any],
+        llm_generated_sections: Dict[str, str],
+        user_id: int,
+        profile_id: int
+    ) -> str:
+        """Fill the LaTeX template with the user's details and the generated sections"""
+        populated_latex = self._latex_template
+        user_obj = profile_data_dict["user"]
+        
+        user_full_name = f"{user_obj.get('firstName', '')} {user_obj.get('lastName', '')}".strip()
+        user_email = user_obj.get('email', '[Your Email]')
+        user_linkedin = profile_data_dict.get("profile", {}).get("linkedin_url", "").strip()
+        user_github = profile_data_dict.get("profile", {}).get("github_url", "").strip()
+        user_phone = profile_data_dict.get("profile", {}).get("phone_number", "").strip()
+        user_location = profile_data_dict.get("profile", {}).get("location", "").strip()
+        
+        # Populate user info
+        populated_latex = populated_latex.replace("[User Name]", self._escape_latex(user_full_name) or "Your Name")
+        populated_latex = populated_latex.replace("[User Email]", self._escape_latex(user_email))
+        
+        # Build contact info based on what user provided
+        contact_info = ""
+        if user_linkedin:
+            contact_info += f" $|$ \\faLinkedinSquare \\hspace{{.5pt}} \\href{{{self._escape_latex(user_linkedin)}}}{{LinkedIn}}"
+        if user_github:
+            contact_info += f" $|$ \\faGithub \\hspace{{.5pt}} \\href{{{self._escape_latex(user_github)}}}{{GitHub}}"
+        if user_location:
+            contact_info += f" $|$ \\faMapMarker \\hspace{{.5pt}} {{{self._escape_latex(user_location)}}}"
+        if user_phone:
+            contact_info += f" $|$ \\faPhone \\hspace{{.5pt}} {{{self._escape_latex(user_phone)}}}"
+        
+        populated_latex = populated_latex.replace("[LINKEDIN_CONTACT]", "")
+        populated_latex = populated_latex.replace("[GITHUB_CONTACT]", "")
+        populated_latex = populated_latex.replace("[LOCATION_CONTACT]", "")
+        populated_latex = populated_latex.replace("[PHONE_CONTACT]", "")
+        
+        # Replace with actual contact info if provided
+        if contact_info:
+            populated_latex = populated_latex.replace("[LINKEDIN_CONTACT][GITHUB_CONTACT][LOCATION_CONTACT][PHONE_CONTACT]", contact_info)
+
+        populated_latex = populated_latex.replace("[LLM_GENERATED_PROFILE_SUMMARY]", self._escape_latex(llm_generated_sections.get("PROFILE", "")))
+        populated_latex = populated_latex.replace("[EDUCATION_SECTION_CONTENT]", self._format_education_section(llm_generated_sections.get("EDUCATION", ""), profile_data_dict))
+        populated_latex = populated_latex.replace("[EXPERIENCE_SECTION_CONTENT]", self._format_experience_section(llm_generated_sections.get("EXPERIENCE", ""), profile_data_dict))
+        populated_latex = populated_latex.replace("[PROJECTS_SECTION_CONTENT]", self._format_projects_section(llm_generated_sections.get("PROJECTS", ""), profile_data_dict))
+        populated_latex = populated_latex.replace("[SKILLS_SECTION_CONTENT]", self._escape_latex(llm_generated_sections.get("SKILLS", "")))
+        
+        validation_issues = self._validate_latex_content(populated_latex)
+        if validation_issues:
+            logger.warning(f"LaTeX validation issues for user {user_id}, profile {profile_id}: {validation_issues}")
+        return populated_latex
+
+    def _save_generation(
+        self,
+        db: Session,
+        user_id: int,
+        profile_id: int,
+        job_description: str,
+        populated_latex: str,
+        llm_request_row: Dict[str, Any]
+    ) -> ResumeResponse:
+        """
+        Write the resume, its rate-limit entry and the LLM usage record in one
+        transaction with a single commit. Ids and server defaults come back via
+        RETURNING and the response is built before the commit, so nothing is
+        re-read afterwards. If the transaction fails the LLM call still
+        happened, so its usage record goes through the telemetry writer.
+        """
+        try:
+            generated_resume = db.execute(
+                insert(GeneratedResume)
+                .values(
+                    user_id=user_id,
+                    profile_id=profile_id,
+                    **self.storage.resume_columns(db, job_description, populated_latex)
+                )
+                .returning(GeneratedResume.id, GeneratedResume.created_at, GeneratedResume.updated_at)
+            ).one()
+            ResumeRateLimiter.log_generation(user_id, profile_id, db)
+            db.execute(insert(LLMRequest), [llm_request_row])
+
+            result = ResumeResponse(
+                id=generated_resume.id,
+                user_id=user_id,
+                profile_id=profile_id,
+                job_description=job_description,
+                latex_content=populated_latex,
+                created_at=generated_resume.created_at,
+                updated_at=generated_resume.updated_at,
+            )
+            db.commit()
+            return result
+        except Exception:
+            db.rollback()
+            telemetry_writer.record(llm_request_row)
+            raise
+
     def _get_profile_data(self, user_id: int, profile_id: int, db: Session) -> Dict[str, Any]:
         """
         Retrieve complete profile data including user, profile, and related items.
@@ -536,14 +625,87 @@ class ResumeService:
             ]
         }
     
-    def get_user_resumes(self, user_id: int, db: Session) -> List[GeneratedResume]:
+    def get_user_resumes(
+        self,
+        user_id: int,
+        db: Session,
+        request: Request,
+        response: Response,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Any]:
         """
-        Get all generated resumes for a user
+        Get one page of a user's generated resumes, newest first
         """
-        return db.query(GeneratedResume).filter(
-            GeneratedResume.user_id == user_id
-        ).order_by(GeneratedResume.created_at.desc()).all()
+        return paginate(
+            self._resume_list_query(user_id, db),
+            [GeneratedResume.created_at, GeneratedResume.id],
+            request,
+            response,
+            cursor=cursor,
+            limit=limit,
+            descending=True
+        )
+
+    def _resume_list_query(self, user_id: int, db: Session):
+        """
+        Column-projected query for resume listings. The LaTeX body and the full
+        job description never leave the database, only a preview and sizes.
+        """
+        return db.query(
+            GeneratedResume.id,
+            GeneratedResume.profile_id,
+            GeneratedResume.created_at,
+            func.substr(
+                JobDescription.content, 1, JOB_DESCRIPTION_PREVIEW_CHARS
+            ).label("job_description_preview"),
+            func.length(JobDescription.content).label("job_description_length"),
+            GeneratedResume.latex_content_size,
+        ).join(
+            JobDescription, JobDescription.id == GeneratedResume.job_description_id
+        ).filter(GeneratedResume.user_id == user_id)
     
+    def search_resumes(
+        self,
+        user_id: int,
+        q: str,
+        db: Session,
+        request: Request,
+        response: Response,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Any]:
+        """
+        One page of a user's resumes matching `q`, best match first. Matches
+        come from the GIN index on search_vector; headlines are only built
+        for the rows on the page.
+        """
+        query = search_query(q)
+        rank = search_rank(GeneratedResume.search_vector, query).label("rank")
+        matches = db.query(
+            GeneratedResume.id,
+            GeneratedResume.profile_id,
+            GeneratedResume.created_at,
+            rank,
+            search_headline(JobDescription.content, query, SEARCH_HEADLINE_OPTIONS).label("job_description_headline"),
+            search_headline(GeneratedResume.content_text, query, SEARCH_HEADLINE_OPTIONS).label("content_headline"),
+            GeneratedResume.latex_content_size,
+        ).join(
+            JobDescription, JobDescription.id == GeneratedResume.job_description_id
+        ).filter(
+            GeneratedResume.user_id == user_id,
+            GeneratedResume.search_vector.op("@@")(query)
+        )
+        return paginate(
+            matches,
+            [rank, GeneratedResume.id],
+            request,
+            response,
+            cursor=cursor,
+            limit=limit,
+            descending=True
+        )
+
     def get_resume_by_id(self, resume_id: int, user_id: int, db: Session) -> GeneratedResume:
         """
         Get a specific resume by ID (ensuring user ownership)
@@ -0,0 +1,89 @@
+"""
+Storage layout for generated resumes: job descriptions are deduplicated by
+content hash, and LaTeX bodies are zstd-compressed against a dictionary built
+from the resume template (which every body largely repeats) and written to
+the blob store, leaving only the digest in the row.
+"""
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from src.models.job_descriptions import JobDescription
+from src.models.compression_dictionaries import CompressionDictionary
+from src.utils.blob_store import BlobStore, get_blob_store
+from src.utils.compression import content_hash, compress_text, register_dictionary
+from src.utils.search import latex_to_text, search_vector
+
+logger = logging.getLogger(__name__)
+
+
+def _get_or_create_by_hash(db: Session, model, digest: str, values: Dict[str, Any]) -> int:
+    """Insert a content-addressed row unless it already exists; return its id"""
+    row_id = db.execute(
+        insert(model)
+        .values(content_hash=digest, **values)
+        .on_conflict_do_nothing(index_elements=["content_hash"])
+        .returning(model.id)
+    ).scalar()
+    if row_id is None:
+        row_id = db.execute(select(model.id).where(model.content_hash == digest)).scalar_one()
+    return row_id
+
+
+class ResumeStorage:
+    """
+    Builds the stored column values for a GeneratedResume
+    """
+
+    def __init__(self, template: str, blob_store: Optional[BlobStore] = None):
+        self._blob_store = blob_store
+        self._dictionary_data = template.encode("utf-8")
+        self._dictionary_hash = content_hash(self._dictionary_data)
+        self._dictionary_id: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def blob_store(self) -> BlobStore:
+        if self._blob_store is None:
+            self._blob_store = get_blob_store()
+        return self._blob_store
+
+    def job_description_id(self, db: Session, job_description: str) -> int:
+        """Id of the shared job_descriptions row holding this exact text"""
+        return _get_or_create_by_hash(
+            db, JobDescription, content_hash(job_description), {"content": job_description}
+        )
+
+    def _template_dictionary_id(self, db: Session) -> int:
+        if self._dictionary_id is None:
+            with self._lock:
+                if self._dictionary_id is None:
+                    # Committed on its own: the id is cached for the process, and the
+                    # caller's transaction may still roll back
+                    with db.get_bind().engine.begin() as conn:
+                        self._dictionary_id = _get_or_create_by_hash(
+                            conn, CompressionDictionary, self._dictionary_hash, {"data": self._dictionary_data}
+                        )
+                    logger.info(f"Using LaTeX compression dictionary {self._dictionary_id}")
+        return self._dictionary_id
+
+    def resume_columns(self, db: Session, job_description: str, latex_content: str) -> Dict[str, Any]:
+        """
+        Column values for a new GeneratedResume (minus user_id / profile_id).
+        search_vector is a SQL expression, so pass these to insert().values().
+        """
+        dictionary_id = self._template_dictionary_id(db)
+        dictionary = register_dictionary(dictionary_id, self._dictionary_data)
+        content_text = latex_to_text(latex_content)
+        return {
+            "job_description_id": self.job_description_id(db, job_description),
+            "latex_digest": self.blob_store.put(compress_text(latex_content, dictionary)),
+            "latex_dictionary_id": dictionary_id,
+            "latex_content_size": len(latex_content),
+            "content_text": content_text,
+            "search_vector": search_vector(job_description, content_text),
+        }
@@ -0,0 +1,151 @@
+"""
+Write-behind logger for LLM request telemetry.
+
+LLM calls record their llm_requests row here instead of committing it on the
+request's session. Rows wait in a bounded in-memory queue and a background
+thread writes them with one multi-row INSERT every TELEMETRY_BATCH_SIZE rows
+or TELEMETRY_FLUSH_INTERVAL_MS, whichever comes first. When the queue is full
+the TELEMETRY_DROP_POLICY decides which row is lost (drop_oldest or
+drop_newest) and the loss is counted. close() flushes what is left; the app
+calls it on shutdown.
+
+Rows carry their own request_time, taken when the call finished, so the
+flush delay does not shift them in time.
+"""
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+
+from src.core.config import settings
+from src.models.llm_requests import LLMRequest
+
+logger = logging.getLogger(__name__)
+
+
+class TelemetryWriter:
+    def __init__(
+        self,
+        max_queue: int = settings.telemetry_queue_size,
+        batch_size: int = settings.telemetry_batch_size,
+        flush_interval_ms: int = settings.telemetry_flush_interval_ms,
+        drop_policy: str = settings.telemetry_drop_policy,
+        session_factory=None
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.drop_policy = drop_policy
+        self._session_factory = session_factory
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def _sessions(self):
+        if self._session_factory is None:
+            from src.utils.db import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="telemetry-writer", daemon=True)
+                self._thread.start()
+
+    def record(self, row: Dict[str, Any]) -> bool:
+        """Queue one llm_requests row; never blocks. Returns False if a row was dropped."""
+        if self._thread is None:
+            self.start()
+        row.setdefault("request_time", datetime.now(timezone.utc))
+        try:
+            self._queue.put_nowait(row)
+            self.enqueued += 1
+            return True
+        except queue.Full:
+            pass
+
+        with self._lock:
+            self.dropped += 1
+            if self.drop_policy == "drop_newest":
+                return False
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                self._queue.put_nowait(row)
+                self.enqueued += 1
+            except queue.Full:
+                pass
+        return False
+
+    def _drain(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Top `batch` up to batch_size from the queue without waiting"""
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        if not batch:
+            return
+        try:
+            with self._sessions()() as db:
+                db.execute(insert(LLMRequest), batch)
+                db.commit()
+            self.written += len(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            logger.error(f"Failed to write {len(batch)} LLM telemetry rows: {e}")
+
+    def _run(self) -> None:
+        batch: List[Dict[str, Any]] = []
+        deadline = time.monotonic() + self.flush_interval
+        while not self._stopping.is_set():
+            try:
+                batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                self._drain(batch)
+            except queue.Empty:
+                pass
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._write(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+        self._write(batch)
+
+    def flush(self) -> None:
+        """Synchronously write everything currently queued (from the caller's thread)"""
+        while batch := self._drain([]):
+            self._write(batch)
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Stop the background thread and flush the remaining rows"""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush()
+        logger.info(f"Telemetry writer closed: {self.stats()}")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize(),
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+
+telemetry_writer = TelemetryWriter()
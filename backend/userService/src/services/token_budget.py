@@ -0,0 +1,330 @@
+"""
+Daily and monthly LLM token budgets per user.
+
+A user's budget is their own override (users.token_budget_daily /
+token_budget_monthly) or else the default for their tier, guest or
+registered (TOKEN_BUDGET_* settings, 0 for unlimited).
+
+Before an LLM call, reserve() checks that current usage plus an estimate of
+the call's prompt and completion tokens fits both budgets. The check is a
+few dictionary lookups. On success the estimate is held against the budget.
+When the call returns, settle() swaps the estimate for the real
+total_tokens; release() drops it if the call failed.
+
+Usage is counted in memory per process:
+- A background thread flushes counters every TOKEN_BUDGET_FLUSH_SECONDS into
+  token_usage_daily, as increments, so workers add up.
+- It then reconciles the flushed users against llm_requests.total_tokens.
+  Counts lost in a crash are restored, but an llm_requests row is only
+  trusted once it is older than TOKEN_BUDGET_RECONCILE_LAG_SECONDS. By then
+  every live worker has flushed its share, so nothing is counted twice.
+- A user's totals are re-read from token_usage_daily at most every
+  TOKEN_BUDGET_SYNC_SECONDS, which is how one worker sees another's usage.
+  Reads wait out a flush's commit and are retried if one lands meanwhile,
+  so flushed tokens are never counted both in the totals and in memory.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import func, literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from src.core.config import settings
+from src.core.exceptions import RateLimitExceeded
+from src.models.llm_requests import LLMRequest
+from src.models.token_usage import TokenUsageDaily
+from src.models.users import User
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBudgetExceeded(RateLimitExceeded):
+    def __init__(self, period: str, used: int, limit: int, estimate: int, retry_after: int):
+        super().__init__(
+            detail=f"{period.capitalize()} token budget reached: {used} of {limit} tokens used "
+                   f"and this request needs about {estimate}. Try again later."
+        )
+        self.headers = {"Retry-After": str(retry_after)}
+
+
+@dataclass
+class BudgetReservation:
+    user_id: int
+    day: date
+    estimate: int
+
+
+@dataclass
+class _Totals:
+    """Flushed usage of one user as of loaded_at"""
+    day: date
+    day_tokens: int
+    month_tokens: int
+    loaded_at: float
+
+
+def _utc_today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def _seconds_until(moment: date) -> int:
+    midnight = datetime(moment.year, moment.month, moment.day, tzinfo=timezone.utc)
+    return max(1, int((midnight - datetime.now(timezone.utc)).total_seconds()))
+
+
+def _next_month(day: date) -> date:
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def budget_limits(user: User) -> Tuple[int, int]:
+    """(daily, monthly) token budget for a user; 0 means unlimited"""
+    if user.is_guest:
+        daily, monthly = settings.token_budget_guest_daily, settings.token_budget_guest_monthly
+    else:
+        daily, monthly = settings.token_budget_registered_daily, settings.token_budget_registered_monthly
+    if user.token_budget_daily is not None:
+        daily = user.token_budget_daily
+    if user.token_budget_monthly is not None:
+        monthly = user.token_budget_monthly
+    return daily, monthly
+
+
+class TokenBudgets:
+    def __init__(
+        self,
+        flush_seconds: float = settings.token_budget_flush_seconds,
+        sync_seconds: float = settings.token_budget_sync_seconds,
+        reconcile_lag_seconds: float = settings.token_budget_reconcile_lag_seconds,
+        max_users: int = settings.token_budget_max_users,
+        session_factory=None
+    ):
+        self.flush_seconds = flush_seconds
+        self.sync_seconds = sync_seconds
+        self.reconcile_lag = reconcile_lag_seconds
+        self.max_users = max_users
+        self._session_factory = session_factory
+        self._lock = threading.Lock()
+        self._flushed = threading.Condition(self._lock)
+        self._committing = False
+        self._flushes = 0  # commits finished, to tell which side of one a read was on
+        self._totals: "OrderedDict[int, _Totals]" = OrderedDict()
+        self._reserved: Dict[int, int] = {}
+        self._pending: Dict[Tuple[int, date], int] = {}  # not yet flushed
+        self._flushing: Dict[Tuple[int, date], int] = {}  # being written
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.allowed = 0
+        self.rejected = 0
+        self.estimated_tokens = 0
+        self.actual_tokens = 0
+        self.flushed_tokens = 0
+        self.reconciled_users = 0
+        self.failed = 0
+
+    def _sessions(self):
+        if self._session_factory is None:
+            from src.utils.db import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory
+
+    def _load(self, db: Session, user_id: int, today: date) -> _Totals:
+        day_tokens, month_tokens = db.execute(
+            select(
+                func.coalesce(func.sum(TokenUsageDaily.tokens).filter(TokenUsageDaily.day == today), 0),
+                func.coalesce(func.sum(TokenUsageDaily.tokens), 0),
+            ).where(TokenUsageDaily.user_id == user_id, TokenUsageDaily.day >= today.replace(day=1))
+        ).one()
+        return _Totals(today, int(day_tokens), int(month_tokens), time.monotonic())
+
+    def usage(self, db: Session, user_id: int) -> Tuple[int, int]:
+        """(today, this month) tokens used or held by a user"""
+        today = _utc_today()
+        key = (user_id, today)
+        while True:
+            with self._flushed:
+                self._flushed.wait_for(lambda: not self._committing)
+                flushes = self._flushes
+                totals = self._totals.get(user_id)
+            loaded = totals is None or totals.day != today or time.monotonic() - totals.loaded_at > self.sync_seconds
+            if loaded:
+                totals = self._load(db, user_id, today)
+            with self._lock:
+                if self._committing or self._flushes != flushes:
+                    # A flush committed meanwhile; totals may or may not include what it moved out of memory
+                    continue
+                if loaded:
+                    self._totals[user_id] = totals
+                    while len(self._totals) > self.max_users:
+                        self._totals.popitem(last=False)
+                else:
+                    self._totals.move_to_end(user_id)
+                local = self._pending.get(key, 0) + self._flushing.get(key, 0) + self._reserved.get(user_id, 0)
+            return totals.day_tokens + local, totals.month_tokens + local
+
+    def reserve(self, db: Session, user: User, estimate: int) -> BudgetReservation:
+        """Hold `estimate` tokens against the user's budgets, or raise TokenBudgetExceeded"""
+        daily, monthly = budget_limits(user)
+        today = _utc_today()
+        if daily or monthly:
+            used_today, used_month = self.usage(db, user.id)
+            if daily and used_today + estimate > daily:
+                self.rejected += 1
+                raise TokenBudgetExceeded("daily", used_today, daily, estimate, _seconds_until(today + timedelta(days=1)))
+            if monthly and used_month + estimate > monthly:
+                self.rejected += 1
+                raise TokenBudgetExceeded("monthly", used_month, monthly, estimate, _seconds_until(_next_month(today)))
+        with self._lock:
+            self._reserved[user.id] = self._reserved.get(user.id, 0) + estimate
+            self.allowed += 1
+        return BudgetReservation(user.id, today, estimate)
+
+    def _unreserve(self, reservation: BudgetReservation) -> None:
+        remaining = self._reserved.get(reservation.user_id, 0) - reservation.estimate
+        if remaining > 0:
+            self._reserved[reservation.user_id] = remaining
+        else:
+            self._reserved.pop(reservation.user_id, None)
+
+    def settle(self, reservation: BudgetReservation, actual_tokens: Optional[int]) -> None:
+        """
+        Replace the estimate with the call's real total_tokens. A call that
+        reported no usage is charged its estimate.
+        """
+        actual = reservation.estimate if actual_tokens is None else actual_tokens
+        key = (reservation.user_id, reservation.day)
+        with self._lock:
+            self._unreserve(reservation)
+            self._pending[key] = self._pending.get(key, 0) + actual
+            self.estimated_tokens += reservation.estimate
+            self.actual_tokens += actual
+
+    def release(self, reservation: BudgetReservation) -> None:
+        """Drop the estimate of a call that used no tokens"""
+        with self._lock:
+            self._unreserve(reservation)
+
+    def flush(self) -> int:
+        """Write pending counters and reconcile the users written. Returns tokens written."""
+        with self._lock:
+            if not self._pending:
+                return 0
+            self._flushing, self._pending = self._pending, {}
+        batch = self._flushing
+        try:
+            with self._sessions()() as db:
+                rows = [{"day": day, "user_id": user_id, "tokens": tokens} for (user_id, day), tokens in batch.items()]
+                stmt = insert(TokenUsageDaily).values(rows)
+                db.execute(stmt.on_conflict_do_update(
+                    index_elements=[TokenUsageDaily.day, TokenUsageDaily.user_id],
+                    set_={"tokens": TokenUsageDaily.tokens + stmt.excluded.tokens, "updated_at": func.now()}
+                ))
+                reconciled = self._reconcile(db, batch)
+                with self._lock:
+                    self._committing = True
+                db.commit()
+        except Exception:
+            with self._lock:
+                for key, tokens in batch.items():
+                    self._pending[key] = self._pending.get(key, 0) + tokens
+                self._flushing = {}
+                self._end_commit()
+            raise
+        written = sum(batch.values())
+        with self._lock:
+            self._flushing = {}
+            # Re-read the flushed users' totals on their next request
+            for user_id, _ in batch:
+                totals = self._totals.get(user_id)
+                if totals is not None:
+                    totals.loaded_at = 0.0
+            self.flushed_tokens += written
+            self.reconciled_users += reconciled
+            self._end_commit()
+        return written
+
+    def _end_commit(self) -> None:
+        """Called with the lock held"""
+        self._committing = False
+        self._flushes += 1
+        self._flushed.notify_all()
+
+    def _reconcile(self, db: Session, batch: Dict[Tuple[int, date], int]) -> int:
+        """
+        Raise each flushed (user, day) counter to at least the tokens recorded
+        in llm_requests up to the reconcile cutoff. Returns counters raised.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.reconcile_lag)
+        raised = 0
+        for day in {day for _, day in batch}:
+            start = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+            upto = min(cutoff, start + timedelta(days=1))
+            if upto <= start:
+                continue
+            user_ids = [user_id for user_id, batch_day in batch if batch_day == day]
+            recorded = (
+                select(literal(day), LLMRequest.user_id, func.sum(LLMRequest.total_tokens))
+                .where(
+                    LLMRequest.user_id.in_(user_ids),
+                    LLMRequest.request_time >= start,
+                    LLMRequest.request_time < upto,
+                    LLMRequest.total_tokens.is_not(None),
+                )
+                .group_by(LLMRequest.user_id)
+            )
+            stmt = insert(TokenUsageDaily).from_select(["day", "user_id", "tokens"], recorded)
+            raised += db.execute(stmt.on_conflict_do_update(
+                index_elements=[TokenUsageDaily.day, TokenUsageDaily.user_id],
+                set_={"tokens": stmt.excluded.tokens, "updated_at": func.now()},
+                where=TokenUsageDaily.tokens < stmt.excluded.tokens
+            )).rowcount
+        if raised:
+            logger.warning(f"Token budget reconciliation raised {raised} counters to match llm_requests")
+        return raised
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="token-budget-flusher", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.flush_seconds):
+            try:
+                self.flush()
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Token budget flush failed: {e}")
+
+    def close(self, timeout: float = 10.0) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Final token budget flush failed: {e}")
+        logger.info(f"Token budgets closed: {self.stats()}")
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "users": len(self._totals),
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "reserved_tokens": sum(self._reserved.values()),
+            "pending_tokens": sum(self._pending.values()),
+            "flushed_tokens": self.flushed_tokens,
+            "reconciled_users": self.reconciled_users,
+            "failed": self.failed,
+            # Estimated over actual tokens of settled calls; above 1 means estimates run high
+            "estimate_ratio": round(self.estimated_tokens / self.actual_tokens, 2) if self.actual_tokens else None,
+        }
+
+
+token_budgets = TokenBudgets()
@@ -0,0 +1,90 @@
+"""
+LLM usage reporting, read exclusively from the hourly/daily rollups
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.models.llm_usage import (
+    LATENCY_BUCKETS_MS,
+    LLMUsageDaily,
+    LLMUsageHourly,
+    UsageRollupWatermark,
+)
+
+ROLLUP_MODELS = {"hour": LLMUsageHourly, "day": LLMUsageDaily}
+COUNTERS = ("calls", "errors", "prompt_tokens", "completion_tokens", "total_tokens", "cached_tokens")
+
+
+def histogram_percentile(histogram: List[int], q: float) -> Optional[int]:
+    """Estimate the q-quantile (0..1) by interpolating inside its histogram bucket"""
+    total = sum(histogram)
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for index, count in enumerate(histogram):
+        if count and seen + count >= rank:
+            lower = LATENCY_BUCKETS_MS[index - 1] if index else 0
+            if index == len(LATENCY_BUCKETS_MS):
+                return lower  # overflow bucket has no upper bound
+            upper = LATENCY_BUCKETS_MS[index]
+            return int(lower + (upper - lower) * (rank - seen) / count)
+        seen += count
+    return LATENCY_BUCKETS_MS[-1]
+
+
+def get_usage(
+    db: Session,
+    user_id: Optional[int],
+    granularity: str,
+    start: datetime,
+    end: datetime
+) -> Dict:
+    """
+    Usage per bucket and model in [start, end) for one user, or summed over
+    all users when `user_id` is None.
+    """
+    model = ROLLUP_MODELS[granularity]
+    query = select(model).where(model.bucket >= start, model.bucket < end)
+    if user_id is not None:
+        query = query.where(model.user_id == user_id)
+
+    merged: Dict[Tuple[datetime, str], Dict] = defaultdict(
+        lambda: {**{c: 0 for c in COUNTERS}, "latency_sum_ms": 0, "histogram": [0] * (len(LATENCY_BUCKETS_MS) + 1)}
+    )
+    for row in db.scalars(query):
+        entry = merged[(row.bucket, row.model_used)]
+        for counter in COUNTERS:
+            entry[counter] += getattr(row, counter)
+        entry["latency_sum_ms"] += row.latency_sum_ms
+        entry["histogram"] = [a + b for a, b in zip(entry["histogram"], row.latency_histogram)]
+
+    buckets = []
+    totals = {c: 0 for c in COUNTERS}
+    for (bucket, model_used), entry in sorted(merged.items()):
+        timed = sum(entry["histogram"])
+        buckets.append({
+            "bucket": bucket,
+            "model_used": model_used,
+            **{c: entry[c] for c in COUNTERS},
+            "latency_avg_ms": entry["latency_sum_ms"] / timed if timed else None,
+            "latency_p50_ms": histogram_percentile(entry["histogram"], 0.50),
+            "latency_p95_ms": histogram_percentile(entry["histogram"], 0.95),
+            "latency_p99_ms": histogram_percentile(entry["histogram"], 0.99),
+        })
+        for counter in COUNTERS:
+            totals[counter] += entry[counter]
+
+    return {
+        "granularity": granularity,
+        "start": start,
+        "end": end,
+        "user_id": user_id,
+        "as_of": db.scalar(select(UsageRollupWatermark.watermark)),
+        "buckets": buckets,
+        "totals": totals,
+    }
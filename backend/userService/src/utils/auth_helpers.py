@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from src.models.profiles import Profile
 from src.models.users import User
 from src.models.generated_resumes import GeneratedResume
+from src.core.config import settings
 
 def verify_profile_ownership(profile_id: int, current_user: User, db_session: Session):
     profile = db_session.query(Profile).filter(
@@ -31,4 +32,7 @@ def verify_resume_ownership(resume_id: int, current_user: User, db_session: Sess
 def get_user_profile_ids_subquery(current_user: User, db_session: Session):
     return db_session.query(Profile.id).filter(
         Profile.user_id == current_user.id
-    ).subquery() 
\ No newline at end of file
+    ).subquery()
+
+def is_admin(user: User) -> bool:
+    return not user.is_guest and user.username in settings.get_admin_usernames
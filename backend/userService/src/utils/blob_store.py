@@ -0,0 +1,160 @@
+"""
+Content-addressed blob storage for large resume artifacts
+"""
+import hashlib
+import os
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import BinaryIO, Iterator, Optional
+
+from src.core.config import settings
+
+CHUNK_SIZE = 64 * 1024
+
+
+class BlobStore(ABC):
+    """
+    Stores immutable byte strings under the sha256 hex digest of their content.
+    Backends only need to implement the primitives below.
+    """
+
+    @abstractmethod
+    def put(self, data: bytes) -> str:
+        """
+        Store `data` (idempotently) and return its digest. Storing an existing
+        blob again resets its stored_at, so the GC grace period restarts.
+        """
+
+    @abstractmethod
+    def open(self, digest: str) -> BinaryIO:
+        """Open a stored blob for binary reading. Raises FileNotFoundError."""
+
+    @abstractmethod
+    def exists(self, digest: str) -> bool:
+        ...
+
+    @abstractmethod
+    def delete(self, digest: str) -> None:
+        ...
+
+    @abstractmethod
+    def iter_blobs(self) -> Iterator[tuple[str, float]]:
+        """Yield (digest, stored_at_epoch_seconds) for every stored blob"""
+
+    @abstractmethod
+    def stored_at(self, digest: str) -> Optional[float]:
+        """stored_at of one blob, or None if it does not exist"""
+
+    def local_path(self, digest: str) -> Optional[str]:
+        """Filesystem path of the blob if the backend has one (enables sendfile)"""
+        return None
+
+    def read(self, digest: str) -> bytes:
+        with self.open(digest) as f:
+            return f.read()
+
+    def iter_chunks(self, digest: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        with self.open(digest) as f:
+            while chunk := f.read(chunk_size):
+                yield chunk
+
+
+def _validate_digest(digest: str) -> str:
+    if len(digest) != 64 or any(c not in "0123456789abcdef" for c in digest):
+        raise ValueError(f"Invalid blob digest: {digest!r}")
+    return digest
+
+
+class LocalBlobStore(BlobStore):
+    """
+    Blobs live at <root>/<d[0:2]>/<d[2:4]>/<digest> so no directory grows too
+    large. Writes go to a temp file in <root>/tmp, are fsynced and then renamed
+    into place, so readers never observe a partial blob.
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self._tmp_dir = os.path.join(self.root, "tmp")
+        os.makedirs(self._tmp_dir, exist_ok=True)
+
+    def _path(self, digest: str) -> str:
+        _validate_digest(digest)
+        return os.path.join(self.root, digest[0:2], digest[2:4], digest)
+
+    def put(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if os.path.exists(path):
+            # A new row is about to reference it; restart the GC grace period
+            try:
+                os.utime(path)
+                return digest
+            except FileNotFoundError:
+                pass  # collected in the meantime; write it again
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self._tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return digest
+
+    def open(self, digest: str) -> BinaryIO:
+        return open(self._path(digest), "rb")
+
+    def exists(self, digest: str) -> bool:
+        return os.path.exists(self._path(digest))
+
+    def delete(self, digest: str) -> None:
+        try:
+            os.unlink(self._path(digest))
+        except FileNotFoundError:
+            pass
+
+    def local_path(self, digest: str) -> Optional[str]:
+        return self._path(digest)
+
+    def iter_blobs(self) -> Iterator[tuple[str, float]]:
+        for shard in sorted(os.listdir(self.root)):
+            shard_dir = os.path.join(self.root, shard)
+            if len(shard) != 2 or not os.path.isdir(shard_dir):
+                continue
+            for sub in sorted(os.listdir(shard_dir)):
+                with os.scandir(os.path.join(shard_dir, sub)) as entries:
+                    for entry in entries:
+                        if entry.is_file():
+                            yield entry.name, entry.stat().st_mtime
+
+    def stored_at(self, digest: str) -> Optional[float]:
+        try:
+            return os.stat(self._path(digest)).st_mtime
+        except FileNotFoundError:
+            return None
+
+    def purge_stale_tmp(self, max_age_seconds: int) -> int:
+        """Remove temp files left behind by writers that crashed mid-write"""
+        removed = 0
+        cutoff = time.time() - max_age_seconds
+        with os.scandir(self._tmp_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.unlink(entry.path)
+                    removed += 1
+        return removed
+
+
+@lru_cache
+def get_blob_store() -> BlobStore:
+    """Blob store configured by BLOB_STORE_BACKEND / BLOB_STORE_PATH"""
+    if settings.blob_store_backend == "local":
+        return LocalBlobStore(settings.blob_store_path)
+    raise ValueError(f"Unknown blob store backend: {settings.blob_store_backend}")
@@ -0,0 +1,141 @@
+"""
+Set-based bulk writes for profile child tables (skills, experience, ...).
+
+Every helper issues a fixed number of statements regardless of how many
+rows are passed, and returns ORM objects populated from RETURNING so callers
+never need a refresh() per row.
+"""
+from typing import Any, Dict, List, Sequence, Tuple
+
+from sqlalchemy import cast, column, delete, insert, literal, select, update, values
+from sqlalchemy.orm import Session
+
+
+def _values_table(model, keys: Sequence[str], rows: List[Dict[str, Any]]):
+    """VALUES (...), (...) AS v(keys...) typed like the model's columns"""
+    table = model.__table__
+    columns = [column(key, table.c[key].type) for key in keys]
+    return values(*columns, name="v").data([tuple(row.get(key) for key in keys) for row in rows])
+
+
+def _assignments(model, v, fields: Sequence[str]) -> Dict[str, Any]:
+    # Cast explicitly: a VALUES column that is NULL in every row is typed as text
+    table = model.__table__
+    return {field: cast(v.c[field], table.c[field].type) for field in fields}
+
+
+def bulk_insert(db: Session, model, rows: List[Dict[str, Any]]) -> list:
+    """Insert all rows with one multi-row INSERT ... RETURNING, preserving input order"""
+    if not rows:
+        return []
+    stmt = insert(model).returning(model, sort_by_parameter_order=True)
+    # render_nulls keeps rows with and without NULLs in the same INSERT batch
+    return list(db.scalars(stmt, rows, execution_options={"render_nulls": True}))
+
+
+def bulk_update(db: Session, model, profile_id: int, rows: List[Dict[str, Any]]) -> list:
+    """
+    Apply partial updates given as dicts of `id` plus the fields to change.
+    Rows are grouped by the set of fields they change and each group is one
+    UPDATE ... FROM (VALUES ...) RETURNING. Ids that do not belong to
+    `profile_id` are ignored and absent from the result.
+    """
+    groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    for row in rows:
+        fields = tuple(sorted(key for key in row if key != "id"))
+        groups.setdefault(fields, []).append(row)
+
+    updated = {}
+    for fields, group in groups.items():
+        if not fields:
+            ids = [row["id"] for row in group]
+            stmt = select(model).where(model.profile_id == profile_id, model.id.in_(ids))
+        else:
+            v = _values_table(model, ("id",) + fields, group)
+            stmt = (
+                update(model)
+                .where(model.id == v.c.id, model.profile_id == profile_id)
+                .values(_assignments(model, v, fields))
+                .returning(model)
+            )
+        for obj in db.scalars(stmt, execution_options={"synchronize_session": False, "populate_existing": True}):
+            updated[obj.id] = obj
+
+    return [updated[row["id"]] for row in rows if row["id"] in updated]
+
+
+def bulk_delete(db: Session, model, profile_id: int, ids: List[int]) -> List[int]:
+    """Delete the given ids belonging to `profile_id`; returns the ids actually deleted"""
+    if not ids:
+        return []
+    stmt = (
+        delete(model)
+        .where(model.profile_id == profile_id, model.id.in_(ids))
+        .returning(model.id)
+    )
+    return list(db.scalars(stmt, execution_options={"synchronize_session": False}))
+
+
+def bulk_upsert(
+    db: Session,
+    model,
+    profile_id: int,
+    rows: List[Dict[str, Any]],
+    natural_key: Sequence[str]
+) -> list:
+    """
+    Insert-or-update rows matched on `natural_key` within the profile (e.g.
+    skill name), in at most two statements: an UPDATE ... FROM (VALUES ...)
+    RETURNING that replaces the fields of rows that already exist, then a
+    multi-row INSERT for the rest. Later duplicates of a key in `rows` win.
+    Returns objects in input order.
+    """
+    if not rows:
+        return []
+
+    by_key: Dict[Tuple, Dict[str, Any]] = {}
+    for row in rows:
+        by_key[tuple(row.get(key) for key in natural_key)] = row
+    unique_rows = list(by_key.values())
+
+    fields = sorted(set().union(*(row.keys() for row in unique_rows)) - {"id", "profile_id"})
+    set_fields = [field for field in fields if field not in natural_key]
+    v = _values_table(model, fields, unique_rows)
+    table = model.__table__
+    match = [table.c[key].is_not_distinct_from(cast(v.c[key], table.c[key].type)) for key in natural_key]
+
+    if set_fields:
+        stmt = (
+            update(model)
+            .where(model.profile_id == profile_id, *match)
+            .values(_assignments(model, v, set_fields))
+            .returning(model)
+        )
+    else:
+        stmt = select(model).where(model.profile_id == profile_id, *match)
+
+    result: Dict[Tuple, list] = {}
+    for obj in db.scalars(stmt, execution_options={"synchronize_session": False, "populate_existing": True}):
+        result.setdefault(tuple(getattr(obj, key) for key in natural_key), []).append(obj)
+
+    missing = [(key, row) for key, row in by_key.items() if key not in result]
+    inserted = bulk_insert(db, model, [dict(row, profile_id=profile_id) for _, row in missing])
+    for (key, _), obj in zip(missing, inserted):
+        result[key] = [obj]
+
+    return [obj for key in by_key for obj in result[key]]
+
+
+def clone_children(db: Session, model, source_profile_id: int, target_profile_id: int) -> None:
+    """
+    Copy every row of `model` from one profile to another with a single
+    INSERT ... SELECT, so no rows are loaded into Python. Ids are assigned
+    in source id order, preserving the original ordering.
+    """
+    fields = [c.name for c in model.__table__.columns if c.name not in ("id", "profile_id")]
+    source = (
+        select(literal(target_profile_id), *(model.__table__.c[f] for f in fields))
+        .where(model.profile_id == source_profile_id)
+        .order_by(model.id)
+    )
+    db.execute(insert(model).from_select(["profile_id", *fields], source))
@@ -0,0 +1,86 @@
+"""
+zstd compression for large text columns, optionally against a shared dictionary
+"""
+import hashlib
+import threading
+from typing import BinaryIO, Callable, Dict, Iterator, Optional
+
+import zstandard
+
+COMPRESSION_LEVEL = 10
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_dictionaries: Dict[int, zstandard.ZstdCompressionDict] = {}
+_lock = threading.Lock()
+
+
+def content_hash(data: str | bytes) -> str:
+    """sha256 hex digest used to address deduplicated content"""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def build_dictionary(data: bytes) -> zstandard.ZstdCompressionDict:
+    """
+    Build a raw-content dictionary: zstd uses `data` as history that matches
+    can reference, so text sharing its boilerplate costs almost nothing.
+    """
+    dictionary = zstandard.ZstdCompressionDict(data, dict_type=zstandard.DICT_TYPE_RAWCONTENT)
+    dictionary.precompute_compress(level=COMPRESSION_LEVEL)
+    return dictionary
+
+
+def register_dictionary(dictionary_id: int, data: bytes) -> zstandard.ZstdCompressionDict:
+    """Cache the dictionary stored under `dictionary_id` for this process"""
+    with _lock:
+        dictionary = _dictionaries.get(dictionary_id)
+        if dictionary is None:
+            dictionary = build_dictionary(data)
+            _dictionaries[dictionary_id] = dictionary
+        return dictionary
+
+
+def compress_text(text: str, dictionary: Optional[zstandard.ZstdCompressionDict] = None) -> bytes:
+    # Compressor objects are not safe to share between threads, so make one per call
+    compressor = zstandard.ZstdCompressor(level=COMPRESSION_LEVEL, dict_data=dictionary)
+    return compressor.compress(text.encode("utf-8"))
+
+
+def resolve_dictionary(
+    dictionary_id: Optional[int],
+    load_dictionary: Optional[Callable[[], bytes]] = None
+) -> Optional[zstandard.ZstdCompressionDict]:
+    """
+    Dictionary stored under `dictionary_id`, or None for dictionary-less blobs.
+    `load_dictionary` is only called the first time this process sees the id.
+    """
+    if dictionary_id is None:
+        return None
+    dictionary = _dictionaries.get(dictionary_id)
+    if dictionary is None:
+        dictionary = register_dictionary(dictionary_id, load_dictionary())
+    return dictionary
+
+
+def decompress_text(
+    blob: bytes,
+    dictionary_id: Optional[int] = None,
+    load_dictionary: Optional[Callable[[], bytes]] = None
+) -> str:
+    """Decompress a blob written by compress_text"""
+    dictionary = resolve_dictionary(dictionary_id, load_dictionary)
+    decompressor = zstandard.ZstdDecompressor(dict_data=dictionary)
+    return decompressor.decompress(blob).decode("utf-8")
+
+
+def iter_decompressed(
+    source: BinaryIO,
+    dictionary: Optional[zstandard.ZstdCompressionDict] = None,
+    chunk_size: int = STREAM_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Stream-decompress `source` in bounded chunks, closing it when done"""
+    decompressor = zstandard.ZstdDecompressor(dict_data=dictionary)
+    with source, decompressor.stream_reader(source) as reader:
+        while chunk := reader.read(chunk_size):
+            yield chunk
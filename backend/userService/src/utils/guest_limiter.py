@@ -1,11 +1,10 @@
 """
 Guest mode rate limiter and utility functions
 """
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from src.models.users import User
-from src.models.generated_resumes import GeneratedResume
 
 
 class GuestLimiter:
@@ -25,9 +24,10 @@ class GuestLimiter:
         return datetime.now(timezone.utc) > user.guest_expires_at
     
     @staticmethod
-    def can_generate_resume(user: User, db: Session) -> tuple[bool, str]:
+    def can_generate_resume(user: User) -> tuple[bool, str]:
         """
-        Check if user can generate a resume
+        Check if user can generate a resume. The daily limit itself is a quota
+        rule enforced by ResumeRateLimiter.reserve.
         Returns: (can_generate: bool, message: str)
         """
         if not user.is_guest:
@@ -37,16 +37,6 @@ class GuestLimiter:
         if GuestLimiter.is_guest_expired(user):
             return False, "Guest session expired. Please create an account to continue."
         
-        # Check daily limit
-        today = datetime.utcnow().date()
-        resume_count = db.query(GeneratedResume).filter(
-            GeneratedResume.user_id == user.id,
-            func.date(GeneratedResume.created_at) == today
-        ).count()
-        
-        if resume_count >= GuestLimiter.MAX_RESUMES_PER_DAY:
-            return False, f"Guest limit reached ({GuestLimiter.MAX_RESUMES_PER_DAY} resume/day). Sign up for unlimited!"
-        
         return True, ""
     
     @staticmethod
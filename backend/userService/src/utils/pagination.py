@@ -0,0 +1,91 @@
+"""
+Keyset (cursor) pagination for list endpoints
+"""
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence
+
+from fastapi import Request, Response
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+from src.core.config import settings
+from src.core.exceptions import ValidationException
+
+
+def clamp_page_size(limit: Optional[int]) -> int:
+    """Apply the default page size and the hard server-side cap"""
+    if limit is None or limit < 1:
+        return settings.default_page_size
+    return min(limit, settings.max_page_size)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort key of the last row on a page into an opaque cursor"""
+    payload = [v.isoformat() if isinstance(v, (datetime, date)) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    """
+    Decode a cursor produced by encode_cursor back into typed key values.
+    Raises ValidationException if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor does not match sort key")
+
+        decoded = []
+        for column, value in zip(columns, values):
+            python_type = column.type.python_type
+            if python_type is datetime:
+                decoded.append(datetime.fromisoformat(value))
+            elif python_type is date:
+                decoded.append(date.fromisoformat(value))
+            else:
+                decoded.append(python_type(value))
+        return decoded
+    except (ValueError, TypeError, binascii.Error, UnicodeError):
+        raise ValidationException("Invalid pagination cursor")
+
+
+def paginate(
+    query: Query,
+    columns: Sequence[Any],
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    descending: bool = False,
+) -> list:
+    """
+    Return one page of `query` ordered by `columns`, seeking past `cursor`.
+
+    The columns must form a unique sort key (e.g. (created_at, id) or id) and
+    should be backed by an index so the seek costs the same on every page.
+    When another page exists, its cursor is exposed through the `Link`
+    (rel="next") and `X-Next-Cursor` response headers.
+    """
+    page_size = clamp_page_size(limit)
+
+    if cursor:
+        key = tuple_(*columns)
+        after = tuple_(*decode_cursor(cursor, columns))
+        query = query.filter(key < after if descending else key > after)
+
+    order_by = [column.desc() if descending else column.asc() for column in columns]
+    rows = query.order_by(*order_by).limit(page_size + 1).all()
+
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor([getattr(rows[-1], column.key) for column in columns])
+        next_url = request.url.include_query_params(cursor=next_cursor, limit=page_size)
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    return rows
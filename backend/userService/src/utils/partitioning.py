@@ -0,0 +1,249 @@
+"""
+Declarative range partitioning for append-only event tables.
+
+llm_requests and resume_rate_limits are partitioned by their timestamp into
+daily or monthly partitions named <table>_pYYYY_MM or <table>_pYYYY_MM_DD.
+Queries bounded by time (the one-hour rate-limit window) only touch the
+partitions that overlap the window, and retention becomes a DROP/DETACH of
+whole partitions instead of a bulk DELETE.
+
+Partitions should exist before rows arrive, so the next PARTITION_PREMAKE
+intervals are created at startup and by the rotation job
+(src/jobs/partition_rotation.py), which also applies retention. Rows with no
+partition of their own, for instance while rotation is behind, land in the
+<table>_default partition instead of failing; the next rotation moves them
+into the partition created for them.
+"""
+import logging
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Table, inspect, text
+from sqlalchemy.engine import Connection
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PartitionSpec:
+    column: str
+    interval: str  # "day" or "month"
+    retention_days: int
+
+
+PARTITIONED_TABLES: Dict[str, PartitionSpec] = {
+    "llm_requests": PartitionSpec(
+        "request_time",
+        settings.llm_requests_partition_interval,
+        settings.llm_requests_retention_days,
+    ),
+    "resume_rate_limits": PartitionSpec(
+        "created_at",
+        settings.resume_rate_limits_partition_interval,
+        settings.resume_rate_limits_retention_days,
+    ),
+}
+
+
+def partition_by(table_name: str) -> str:
+    """Value for a model's postgresql_partition_by table argument"""
+    return f"RANGE ({PARTITIONED_TABLES[table_name].column})"
+
+
+def _floor(moment: datetime, interval: str) -> datetime:
+    moment = moment.astimezone(timezone.utc)
+    if interval == "day":
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next(lower: datetime, interval: str) -> datetime:
+    if interval == "day":
+        return lower + timedelta(days=1)
+    return (lower + timedelta(days=32)).replace(day=1)
+
+
+def default_partition_name(table_name: str) -> str:
+    return f"{table_name}_default"
+
+
+def partition_name(table_name: str, lower: datetime, interval: str) -> str:
+    suffix = lower.strftime("%Y_%m_%d" if interval == "day" else "%Y_%m")
+    return f"{table_name}_p{suffix}"
+
+
+def _parse_lower(table_name: str, name: str) -> Optional[datetime]:
+    match = re.fullmatch(rf"{re.escape(table_name)}_p(\d{{4}})_(\d{{2}})(?:_(\d{{2}}))?", name)
+    if not match:
+        return None
+    year, month, day = match.groups()
+    return datetime(int(year), int(month), int(day or 1), tzinfo=timezone.utc)
+
+
+def is_partitioned(conn: Connection, table_name: str) -> bool:
+    return conn.scalar(text(
+        "SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(:name)"
+    ), {"name": table_name}) is True
+
+
+def attached_partitions(conn: Connection, table_name: str) -> List[Tuple[str, datetime]]:
+    """(name, lower bound) of the partitions following our naming scheme, oldest first"""
+    names = conn.scalars(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:name)"
+    ), {"name": table_name})
+    parsed = [(name, _parse_lower(table_name, name)) for name in names]
+    return sorted((item for item in parsed if item[1] is not None), key=lambda item: item[1])
+
+
+def ensure_default_partition(conn: Connection, table_name: str) -> None:
+    quote = conn.dialect.identifier_preparer.quote
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {quote(default_partition_name(table_name))} "
+        f"PARTITION OF {quote(table_name)} DEFAULT"
+    ))
+
+
+def _create_partition(conn: Connection, table_name: str, name: str, lower: datetime, upper: datetime) -> None:
+    spec = PARTITIONED_TABLES[table_name]
+    quote = conn.dialect.identifier_preparer.quote
+    bounds = f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+    default = quote(default_partition_name(table_name))
+    in_range = f"{quote(spec.column)} >= :lower AND {quote(spec.column)} < :upper"
+    params = {"lower": lower, "upper": upper}
+    if not conn.scalar(text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {in_range})"), params):
+        conn.execute(text(f"CREATE TABLE IF NOT EXISTS {quote(name)} PARTITION OF {quote(table_name)} {bounds}"))
+        return
+    # Postgres refuses a partition whose rows are still in the default one; move them first
+    conn.execute(text(f"CREATE TABLE {quote(name)} (LIKE {quote(table_name)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    moved = conn.execute(text(
+        f"WITH moved AS (DELETE FROM {default} WHERE {in_range} RETURNING *) "
+        f"INSERT INTO {quote(name)} SELECT * FROM moved"
+    ), params).rowcount
+    conn.execute(text(f"ALTER TABLE {quote(table_name)} ATTACH PARTITION {quote(name)} {bounds}"))
+    logger.info(f"Moved {moved} rows of {table_name} from its default partition into {name}")
+
+
+def ensure_partitions(conn: Connection, table_name: str, start: datetime, end: datetime) -> List[str]:
+    """Create every missing partition overlapping [start, end]; returns the names created"""
+    spec = PARTITIONED_TABLES[table_name]
+    existing = {name for name, _ in attached_partitions(conn, table_name)}
+    created = []
+
+    lower = _floor(start, spec.interval)
+    while lower <= end:
+        upper = _next(lower, spec.interval)
+        name = partition_name(table_name, lower, spec.interval)
+        if name not in existing:
+            _create_partition(conn, table_name, name, lower, upper)
+            created.append(name)
+        lower = upper
+    return created
+
+
+def _premake_until(now: datetime, spec: PartitionSpec) -> datetime:
+    lower = _floor(now, spec.interval)
+    for _ in range(settings.partition_premake):
+        lower = _next(lower, spec.interval)
+    return lower
+
+
+def _retained_from(now: datetime, spec: PartitionSpec) -> datetime:
+    """Lower bound of the oldest partition retention keeps"""
+    return _floor(now - timedelta(days=spec.retention_days), spec.interval)
+
+
+def ensure_upcoming_partitions(conn: Connection, table_name: str, now: Optional[datetime] = None) -> List[str]:
+    """
+    Create the default partition, the current partition and the next
+    PARTITION_PREMAKE ones, plus the retained ones that rows in the default
+    partition belong to.
+    """
+    spec = PARTITIONED_TABLES[table_name]
+    now = now or datetime.now(timezone.utc)
+    quote = conn.dialect.identifier_preparer.quote
+    ensure_default_partition(conn, table_name)
+    stray = conn.scalar(text(
+        f"SELECT min({quote(spec.column)}) FROM {quote(default_partition_name(table_name))}"
+    ))
+    start = min(now, max(stray, _retained_from(now, spec))) if stray else now
+    return ensure_partitions(conn, table_name, start, _premake_until(now, spec))
+
+
+def rotate_partitions(conn: Connection, table_name: str, now: Optional[datetime] = None) -> Dict[str, List[str]]:
+    """
+    Pre-create the upcoming partitions and drop (or detach, per
+    PARTITION_RETENTION_ACTION) those entirely older than the retention period.
+    """
+    spec = PARTITIONED_TABLES[table_name]
+    now = now or datetime.now(timezone.utc)
+    quote = conn.dialect.identifier_preparer.quote
+
+    created = ensure_upcoming_partitions(conn, table_name, now)
+
+    expired = []
+    cutoff = now - timedelta(days=spec.retention_days)
+    # Whatever is left in the default partition is older than any partition retention keeps
+    stale = conn.execute(text(
+        f"DELETE FROM {quote(default_partition_name(table_name))} WHERE {quote(spec.column)} < :lower"
+    ), {"lower": _retained_from(now, spec)}).rowcount
+    if stale:
+        logger.info(f"Deleted {stale} expired rows from the default partition of {table_name}")
+    for name, lower in attached_partitions(conn, table_name):
+        if _next(lower, spec.interval) > cutoff:
+            break
+        if settings.partition_retention_action == "detach":
+            conn.execute(text(f"ALTER TABLE {quote(table_name)} DETACH PARTITION {quote(name)}"))
+        else:
+            conn.execute(text(f"DROP TABLE {quote(name)}"))
+        expired.append(name)
+
+    return {"created": created, "expired": expired}
+
+
+def convert_to_partitioned(conn: Connection, table: Table) -> int:
+    """
+    Replace an existing plain table with its partitioned definition, copying
+    the rows across. Used once, when upgrading a database created before the
+    table was partitioned. Returns the number of rows copied.
+    """
+    spec = PARTITIONED_TABLES[table.name]
+    quote = conn.dialect.identifier_preparer.quote
+    name = quote(table.name)
+    legacy = f"{table.name}_legacy"
+
+    conn.execute(text(f"ALTER TABLE {name} RENAME TO {quote(legacy)}"))
+    # Index and sequence names are schema-wide; move them out of the way
+    for index in conn.scalars(text("SELECT indexname FROM pg_indexes WHERE tablename = :t"), {"t": legacy}):
+        conn.execute(text(f"ALTER INDEX {quote(index)} RENAME TO {quote(index + '_legacy')}"))
+    sequence = conn.scalar(text("SELECT pg_get_serial_sequence(:t, 'id')"), {"t": legacy})
+    if sequence:
+        conn.execute(text(f"ALTER SEQUENCE {sequence} RENAME TO {quote(table.name + '_id_seq_legacy')}"))
+
+    table.create(conn)
+    ensure_default_partition(conn, table.name)
+    now = datetime.now(timezone.utc)
+    # Rows retention would expire anyway are not copied, nor given partitions
+    retained_from = _retained_from(now, spec)
+    oldest = conn.scalar(text(f"SELECT min({quote(spec.column)}) FROM {quote(legacy)}")) or now
+    ensure_partitions(conn, table.name, min(now, max(oldest, retained_from)), _premake_until(now, spec))
+
+    # Columns added to the model since the legacy table was created are
+    # missing there; they take their defaults in the new table
+    legacy_columns = {column["name"] for column in inspect(conn).get_columns(legacy)}
+    columns = ", ".join(quote(column.name) for column in table.columns if column.name in legacy_columns)
+    copied = conn.execute(text(
+        f"INSERT INTO {name} ({columns}) SELECT {columns} FROM {quote(legacy)} "
+        f"WHERE {quote(spec.column)} >= :retained_from"
+    ), {"retained_from": retained_from}).rowcount
+    conn.execute(text(
+        f"SELECT setval(pg_get_serial_sequence(:t, 'id'), coalesce((SELECT max(id) FROM {name}), 0) + 1, false)"
+    ), {"t": table.name})
+    conn.execute(text(f"DROP TABLE {quote(legacy)}"))
+
+    logger.info(f"Converted {table.name} to a partitioned table, {copied} rows copied")
+    return copied
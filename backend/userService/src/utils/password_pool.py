@@ -0,0 +1,122 @@
+"""
+Bounded worker pool for bcrypt.
+
+A bcrypt hash or verify costs about 250 ms of CPU. Run inline in an async
+route it stalls the event loop, and with it every request on the worker. The
+pool runs them on PASSWORD_HASH_WORKERS threads (bcrypt releases the GIL
+while it works). At most PASSWORD_HASH_MAX_PENDING operations may be queued
+or running; past that, callers get a 503 with Retry-After straight away, so
+a login storm cannot build an unbounded backlog.
+
+Async routes await the result without blocking the loop. Sync routes block
+only their own threadpool thread.
+"""
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from src.core.config import settings
+from src.core.exceptions import ServiceUnavailableException
+from src.utils.security import get_password_hash, verify_password
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordPoolBusy(ServiceUnavailableException):
+    def __init__(self):
+        super().__init__(detail="Too many sign-ins in progress, please retry shortly")
+        self.headers = {"Retry-After": str(settings.password_hash_retry_after_seconds)}
+
+
+class PasswordPool:
+    def __init__(
+        self,
+        workers: int = settings.password_hash_workers,
+        max_pending: int = settings.password_hash_max_pending
+    ):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+        self.run_ms_total = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    def _submit(self, fn: Callable, *args) -> Future:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordPoolBusy()
+            self._pending += 1
+            self.submitted += 1
+        queued_at = time.monotonic()
+
+        def run():
+            started = time.monotonic()
+            try:
+                return fn(*args)
+            finally:
+                finished = time.monotonic()
+                with self._lock:
+                    self._pending -= 1
+                    self.completed += 1
+                    wait_ms = (started - queued_at) * 1000
+                    self.wait_ms_total += wait_ms
+                    self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+                    self.run_ms_total += (finished - started) * 1000
+
+        try:
+            return self._get_executor().submit(run)
+        except RuntimeError:
+            # Executor shut down
+            with self._lock:
+                self._pending -= 1
+            raise
+
+    async def hash(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(get_password_hash, password))
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await asyncio.wrap_future(self._submit(verify_password, password, hashed_password))
+
+    def hash_sync(self, password: str) -> str:
+        return self._submit(get_password_hash, password).result()
+
+    def verify_sync(self, password: str, hashed_password: str) -> bool:
+        return self._submit(verify_password, password, hashed_password).result()
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        logger.info(f"Password pool closed: {self.stats()}")
+
+    def stats(self) -> Dict[str, float]:
+        completed = self.completed or 1
+        return {
+            "workers": self.workers,
+            "pending": self._pending,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "wait_ms_avg": round(self.wait_ms_total / completed, 1),
+            "wait_ms_max": round(self.wait_ms_max, 1),
+            "run_ms_avg": round(self.run_ms_total / completed, 1),
+        }
+
+
+password_pool = PasswordPool()
@@ -0,0 +1,214 @@
+"""
+Sliding-window quotas with pluggable backends.
+
+A QuotaRule allows `limit` hits per rolling `window_seconds`. reserve()
+checks every rule that applies to a subject and, only if all of them pass,
+records a hit under each, atomically. It returns the remaining quota and
+the reset time with no second lookup. A reservation is then either committed
+(the work happened) or released (the work failed and the hit is refunded).
+
+Each rule keeps a log of at most `limit` hit times per key, so a check costs
+O(limit), i.e. constant for the small limits used here.
+
+Backends (QUOTA_BACKEND):
+  local     in-process; for single-worker deployments
+  postgres  quota_windows table shared by all workers
+When a backend has no state for a key (first use, restart, eviction) it asks
+the caller's `seed` function for recent hit times, so limits survive
+restarts.
+"""
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from src.core.config import settings
+from src.models.quota_windows import QuotaWindow
+
+# Returns epoch seconds of recent hits for a rule's subject, oldest first
+SeedFn = Callable[["QuotaRule"], List[float]]
+
+
+@dataclass(frozen=True)
+class QuotaRule:
+    name: str
+    limit: int
+    window_seconds: int
+
+
+@dataclass
+class QuotaDecision:
+    allowed: bool
+    remaining: int
+    reset_at: float  # epoch seconds when the binding rule frees a slot
+    rule: Optional[QuotaRule] = None  # the rule that denied, or the tightest one
+
+    @property
+    def retry_after(self) -> int:
+        return max(1, int(self.reset_at - time.time() + 0.999))
+
+
+@dataclass
+class Reservation:
+    keys: Dict[str, QuotaRule]
+    at: float
+    token: str = field(default_factory=lambda: uuid.uuid4().hex)
+    decision: Optional[QuotaDecision] = None
+
+
+def _key(rule: QuotaRule, subject: str) -> str:
+    return f"{rule.name}:{subject}"
+
+
+def _decide(windows: Dict[str, List[float]], keys: Dict[str, QuotaRule], now: float) -> QuotaDecision:
+    """Evaluate pruned windows (hit times, oldest first) before adding a hit"""
+    tightest: Optional[QuotaDecision] = None
+    for key, rule in keys.items():
+        hits = windows[key]
+        remaining = rule.limit - len(hits)
+        reset_at = (hits[0] if hits else now) + rule.window_seconds
+        if remaining <= 0:
+            return QuotaDecision(False, 0, reset_at, rule)
+        # After this hit
+        decision = QuotaDecision(True, remaining - 1, reset_at, rule)
+        if tightest is None or decision.remaining < tightest.remaining:
+            tightest = decision
+    return tightest
+
+
+class QuotaBackend(ABC):
+    @abstractmethod
+    def reserve(self, rules: Sequence[QuotaRule], subject: str, seed: SeedFn) -> Reservation:
+        """Check all rules and record a hit under each if they all pass"""
+
+    @abstractmethod
+    def release(self, reservation: Reservation) -> None:
+        """Refund a reservation whose work did not happen"""
+
+    def commit(self, reservation: Reservation) -> None:
+        """Keep a reservation's hits; they age out with the window"""
+
+
+class LocalQuotaBackend(QuotaBackend):
+    """Per-process windows in a bounded LRU map"""
+
+    def __init__(self, max_keys: int = settings.quota_local_max_keys):
+        self.max_keys = max_keys
+        self._windows: "OrderedDict[str, List[List]]" = OrderedDict()  # key -> [[at, token], ...]
+        self._lock = threading.Lock()
+
+    def _window(self, key: str, rule: QuotaRule, now: float, seeded: Dict[str, List[float]], seed: SeedFn) -> List[List]:
+        window = self._windows.get(key)
+        if window is None:
+            hits = seeded[key] if key in seeded else seed(rule)  # evicted since the check
+            window = [[at, None] for at in hits[-rule.limit:]]
+            self._windows[key] = window
+        else:
+            self._windows.move_to_end(key)
+        cutoff = now - rule.window_seconds
+        while window and window[0][0] <= cutoff:
+            window.pop(0)
+        return window
+
+    def reserve(self, rules: Sequence[QuotaRule], subject: str, seed: SeedFn) -> Reservation:
+        now = time.time()
+        keys = {_key(rule, subject): rule for rule in rules}
+        reservation = Reservation(keys=keys, at=now)
+        # Seeding may query the database, so it happens outside the lock
+        seeded = {key: seed(rule) for key, rule in keys.items() if key not in self._windows}
+        with self._lock:
+            windows = {key: self._window(key, rule, now, seeded, seed) for key, rule in keys.items()}
+            reservation.decision = _decide({k: [at for at, _ in w] for k, w in windows.items()}, keys, now)
+            if reservation.decision.allowed:
+                for window in windows.values():
+                    window.append([now, reservation.token])
+            while len(self._windows) > self.max_keys:
+                self._windows.popitem(last=False)
+        return reservation
+
+    def release(self, reservation: Reservation) -> None:
+        with self._lock:
+            for key in reservation.keys:
+                window = self._windows.get(key)
+                if window:
+                    window[:] = [hit for hit in window if hit[1] != reservation.token]
+
+
+class PostgresQuotaBackend(QuotaBackend):
+    """
+    Windows in the shared quota_windows table. Each reserve is one short
+    transaction on its own connection that locks the subject's rows, so it
+    never holds locks for the duration of the caller's work.
+    """
+
+    def __init__(self, engine=None):
+        self._engine = engine
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            from src.utils.db import engine
+            self._engine = engine
+        return self._engine
+
+    def reserve(self, rules: Sequence[QuotaRule], subject: str, seed: SeedFn) -> Reservation:
+        now = time.time()
+        keys = {_key(rule, subject): rule for rule in rules}
+        reservation = Reservation(keys=keys, at=now)
+        with self.engine.begin() as conn:
+            stored = dict(conn.execute(
+                select(QuotaWindow.key, QuotaWindow.hits)
+                .where(QuotaWindow.key.in_(keys))
+                .order_by(QuotaWindow.key)
+                .with_for_update()
+            ).all())
+            missing = [key for key in keys if key not in stored]
+            if missing:
+                seeded = {key: seed(keys[key])[-keys[key].limit:] for key in missing}
+                conn.execute(
+                    insert(QuotaWindow)
+                    .values([{"key": key, "hits": hits} for key, hits in seeded.items()])
+                    .on_conflict_do_nothing()
+                )
+                # Re-read under lock in case another worker created them first
+                stored = dict(conn.execute(
+                    select(QuotaWindow.key, QuotaWindow.hits)
+                    .where(QuotaWindow.key.in_(keys))
+                    .order_by(QuotaWindow.key)
+                    .with_for_update()
+                ).all())
+            windows = {
+                key: [at for at in stored[key] if at > now - rule.window_seconds]
+                for key, rule in keys.items()
+            }
+            reservation.decision = _decide(windows, keys, now)
+            if reservation.decision.allowed:
+                for key, hits in windows.items():
+                    conn.execute(update(QuotaWindow).where(QuotaWindow.key == key).values(hits=hits + [now]))
+        return reservation
+
+    def release(self, reservation: Reservation) -> None:
+        with self.engine.begin() as conn:
+            for key in reservation.keys:
+                conn.execute(
+                    update(QuotaWindow)
+                    .where(QuotaWindow.key == key)
+                    .values(hits=func.array_remove(QuotaWindow.hits, reservation.at))
+                )
+
+
+@lru_cache
+def get_quota_backend() -> QuotaBackend:
+    """Quota backend configured by QUOTA_BACKEND"""
+    if settings.quota_backend == "local":
+        return LocalQuotaBackend()
+    if settings.quota_backend == "postgres":
+        return PostgresQuotaBackend()
+    raise ValueError(f"Unknown quota backend: {settings.quota_backend}")
@@ -1,7 +1,12 @@
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
+from src.models.users import User
 from src.models.resume_rate_limit import ResumeRateLimit
 from src.core.exceptions import RateLimitExceeded
+from src.utils.guest_limiter import GuestLimiter
+from src.utils.quota import QuotaDecision, QuotaRule, Reservation, get_quota_backend
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,61 +15,98 @@ class ResumeRateLimiter:
     """
     Rate limiter for resume generation
     - Max 5 resumes per hour per user
+    - Guests: max 1 resume per day (rolling 24 hours)
     - Prevents token waste from spam requests
+
+    Both limits are quota rules checked together by the quota engine
+    (src/utils/quota.py) without touching the database. resume_rate_limits
+    keeps the durable record and seeds the engine after a restart.
     """
-    
+
     MAX_RESUMES_PER_HOUR = 5
     HOUR_IN_SECONDS = 3600
-    
+    DAY_IN_SECONDS = 86400
+    CLOCK_SKEW_SECONDS = 60
+
+    HOURLY = QuotaRule("resume_hourly", MAX_RESUMES_PER_HOUR, HOUR_IN_SECONDS)
+    GUEST_DAILY = QuotaRule("resume_guest_daily", GuestLimiter.MAX_RESUMES_PER_DAY, DAY_IN_SECONDS)
+
     @staticmethod
-    def check_rate_limit(user_id: int, db: Session) -> bool:
+    def _window(user_id: int, seconds: int) -> tuple:
         """
-        Check if user has exceeded rate limit
-        Returns True if allowed, raises RateLimitExceeded if blocked
+        Filter for the user's rows in the last `seconds`. Both bounds are
+        timezone-aware constants, so the planner prunes resume_rate_limits to
+        the partition(s) covering the window and skips premade future ones;
+        the upper bound allows for clock skew between app and database.
         """
-        one_hour_ago = datetime.utcnow() - timedelta(seconds=ResumeRateLimiter.HOUR_IN_SECONDS)
-        
-        # Count resumes generated in last hour
-        recent_resumes = db.query(ResumeRateLimit).filter(
+        now = datetime.now(timezone.utc)
+        return (
             ResumeRateLimit.user_id == user_id,
-            ResumeRateLimit.created_at >= one_hour_ago
-        ).count()
-        
-        if recent_resumes >= ResumeRateLimiter.MAX_RESUMES_PER_HOUR:
-            logger.warning(f"User {user_id} exceeded resume generation rate limit")
-            raise RateLimitExceeded(
-                detail=f"Rate limit exceeded. You can generate {ResumeRateLimiter.MAX_RESUMES_PER_HOUR} resumes per hour. "
-                       f"Try again in {ResumeRateLimiter._get_reset_time(db, user_id)} minutes."
-            )
-        
-        return True
-    
+            ResumeRateLimit.created_at >= now - timedelta(seconds=seconds),
+            ResumeRateLimit.created_at < now + timedelta(seconds=ResumeRateLimiter.CLOCK_SKEW_SECONDS),
+        )
+
     @staticmethod
-    def log_generation(user_id: int, profile_id: int, db: Session) -> None:
-        """Log a resume generation for rate limiting"""
-        try:
-            rate_limit_entry = ResumeRateLimit(user_id=user_id, profile_id=profile_id)
-            db.add(rate_limit_entry)
-            db.commit()
-            logger.info(f"Logged resume generation for user {user_id}")
-        except Exception as e:
-            logger.error(f"Failed to log rate limit for user {user_id}: {e}")
-            db.rollback()
-    
+    def _rules(user: User) -> List[QuotaRule]:
+        if user.is_guest:
+            return [ResumeRateLimiter.HOURLY, ResumeRateLimiter.GUEST_DAILY]
+        return [ResumeRateLimiter.HOURLY]
+
     @staticmethod
-    def _get_reset_time(db: Session, user_id: int) -> int:
-        """Get minutes until rate limit resets"""
-        one_hour_ago = datetime.utcnow() - timedelta(seconds=ResumeRateLimiter.HOUR_IN_SECONDS)
-        
-        oldest_entry = db.query(ResumeRateLimit).filter(
-            ResumeRateLimit.user_id == user_id,
-            ResumeRateLimit.created_at >= one_hour_ago
-        ).order_by(ResumeRateLimit.created_at.asc()).first()
-        
-        if oldest_entry:
-            reset_time = oldest_entry.created_at + timedelta(seconds=ResumeRateLimiter.HOUR_IN_SECONDS)
-            minutes_left = max(1, int((reset_time - datetime.utcnow()).total_seconds() / 60))
-            return minutes_left
-        
-        return 0
+    def headers(decision: QuotaDecision) -> Dict[str, str]:
+        """X-RateLimit-* headers for the tightest rule of a decision"""
+        return {
+            "X-RateLimit-Limit": str(decision.rule.limit),
+            "X-RateLimit-Remaining": str(decision.remaining),
+            "X-RateLimit-Reset": str(int(decision.reset_at)),
+        }
 
+    @staticmethod
+    def reserve(user: User, db: Session) -> Reservation:
+        """
+        Take one generation from every quota that applies to the user.
+        Raises RateLimitExceeded if any is used up. The caller must commit()
+        the reservation once the resume is saved, or release() it on failure.
+        """
+        def seed(rule: QuotaRule) -> List[float]:
+            return [
+                created_at.timestamp()
+                for created_at in db.scalars(
+                    select(ResumeRateLimit.created_at)
+                    .where(*ResumeRateLimiter._window(user.id, rule.window_seconds))
+                    .order_by(ResumeRateLimit.created_at)
+                )
+            ]
+
+        reservation = get_quota_backend().reserve(ResumeRateLimiter._rules(user), str(user.id), seed)
+        decision = reservation.decision
+        if not decision.allowed:
+            logger.warning(f"User {user.id} exceeded resume quota {decision.rule.name}")
+            if decision.rule is ResumeRateLimiter.GUEST_DAILY:
+                detail = f"Guest limit reached ({GuestLimiter.MAX_RESUMES_PER_DAY} resume/day). Sign up for unlimited!"
+            else:
+                detail = (
+                    f"Rate limit exceeded. You can generate {ResumeRateLimiter.MAX_RESUMES_PER_HOUR} resumes per hour. "
+                    f"Try again in {max(1, -(-decision.retry_after // 60))} minutes."
+                )
+            exc = RateLimitExceeded(detail=detail)
+            exc.headers = {**ResumeRateLimiter.headers(decision), "Retry-After": str(decision.retry_after)}
+            raise exc
+        return reservation
+
+    @staticmethod
+    def commit(reservation: Reservation) -> None:
+        get_quota_backend().commit(reservation)
+
+    @staticmethod
+    def release(reservation: Reservation) -> None:
+        get_quota_backend().release(reservation)
+
+    @staticmethod
+    def log_generation(user_id: int, profile_id: int, db: Session) -> None:
+        """
+        Record a resume generation for rate limiting. Written as part of the
+        caller's transaction; the caller commits.
+        """
+        db.execute(insert(ResumeRateLimit).values(user_id=user_id, profile_id=profile_id))
+        logger.info(f"Logged resume generation for user {user_id}")
@@ -0,0 +1,116 @@
+"""
+One-time upgrade of generated_resumes rows written before resume storage
+moved out of the table (see src/services/resume_storage.py).
+
+Older databases keep the job description and LaTeX body in the row:
+job_description and latex_content as Text, or latex_compressed as a zstd
+frame. The replacement columns are NOT NULL without a server default, so
+_add_missing_columns cannot add them to a table that has rows. Instead,
+migrate_resume_storage():
+1. adds job_description_id, latex_digest, latex_dictionary_id and
+   latex_content_size as nullable columns,
+2. moves each distinct job description into job_descriptions and points the
+   rows at it,
+3. writes each LaTeX body to the blob store, BATCH_SIZE rows at a time,
+4. sets the columns NOT NULL, adds their foreign keys and drops the old
+   columns.
+
+Plain-text bodies are compressed without a dictionary (latex_dictionary_id
+stays NULL); reads handle both. If the upgrade fails, its transaction rolls
+back and the blobs it already wrote are left for src.jobs.blob_gc.
+"""
+import logging
+from typing import Optional
+
+from sqlalchemy import Table, inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import AddConstraint
+
+from src.utils.blob_store import BlobStore, get_blob_store
+from src.utils.compression import compress_text
+
+logger = logging.getLogger(__name__)
+
+LEGACY_COLUMNS = ("job_description", "latex_content", "latex_compressed")
+NEW_COLUMNS = ("job_description_id", "latex_digest", "latex_dictionary_id", "latex_content_size")
+REQUIRED_COLUMNS = ("job_description_id", "latex_digest", "latex_content_size")
+BATCH_SIZE = 500
+
+# Same digest as src.utils.compression.content_hash, computed in the database
+_SQL_CONTENT_HASH = "encode(sha256(convert_to({column}, 'UTF8')), 'hex')"
+
+
+def _move_job_descriptions(conn: Connection, name: str) -> int:
+    digest = _SQL_CONTENT_HASH.format(column="r.job_description")
+    conn.execute(text(
+        f"INSERT INTO job_descriptions (content_hash, content) "
+        f"SELECT DISTINCT {digest}, r.job_description FROM {name} AS r "
+        f"WHERE r.job_description_id IS NULL "
+        f"ON CONFLICT (content_hash) DO NOTHING"
+    ))
+    return conn.execute(text(
+        f"UPDATE {name} AS r SET job_description_id = j.id FROM job_descriptions AS j "
+        f"WHERE r.job_description_id IS NULL AND j.content_hash = {digest}"
+    )).rowcount
+
+
+def _move_latex(conn: Connection, name: str, source: str, store: BlobStore) -> int:
+    quote = conn.dialect.identifier_preparer.quote
+    moved, last_id = 0, 0
+    while True:
+        rows = conn.execute(text(
+            f"SELECT id, {quote(source)} FROM {name} "
+            f"WHERE latex_digest IS NULL AND id > :last_id ORDER BY id LIMIT :limit"
+        ), {"last_id": last_id, "limit": BATCH_SIZE}).all()
+        if not rows:
+            return moved
+        last_id = rows[-1][0]
+
+        params = []
+        for row_id, body in rows:
+            if source == "latex_content":
+                params.append({"id": row_id, "digest": store.put(compress_text(body)), "size": len(body)})
+            else:
+                # Already a zstd frame; latex_dictionary_id and latex_content_size were stored with it
+                params.append({"id": row_id, "digest": store.put(bytes(body)), "size": None})
+        conn.execute(text(
+            f"UPDATE {name} SET latex_digest = :digest, "
+            f"latex_content_size = coalesce(latex_content_size, :size) WHERE id = :id"
+        ), params)
+        moved += len(params)
+
+
+def migrate_resume_storage(conn: Connection, table: Table, store: Optional[BlobStore] = None) -> int:
+    """
+    Move job descriptions and LaTeX bodies out of legacy generated_resumes
+    columns. Does nothing once they are gone. Returns the rows moved.
+    """
+    existing = {column["name"] for column in inspect(conn).get_columns(table.name)}
+    legacy = [column for column in LEGACY_COLUMNS if column in existing]
+    if not legacy:
+        return 0
+
+    quote = conn.dialect.identifier_preparer.quote
+    name = quote(table.name)
+    for column_name in NEW_COLUMNS:
+        if column_name not in existing:
+            column_type = table.c[column_name].type.compile(dialect=conn.dialect)
+            conn.execute(text(f"ALTER TABLE {name} ADD COLUMN {quote(column_name)} {column_type}"))
+
+    if "job_description" in existing:
+        _move_job_descriptions(conn, name)
+    source = "latex_compressed" if "latex_compressed" in existing else "latex_content"
+    moved = _move_latex(conn, name, source, store or get_blob_store()) if source in existing else 0
+
+    for column_name in REQUIRED_COLUMNS:
+        conn.execute(text(f"ALTER TABLE {name} ALTER COLUMN {quote(column_name)} SET NOT NULL"))
+    constrained = {tuple(fk["constrained_columns"]) for fk in inspect(conn).get_foreign_keys(table.name)}
+    for fk in table.foreign_key_constraints:
+        columns = tuple(column.name for column in fk.columns)
+        if set(columns) & set(NEW_COLUMNS) and columns not in constrained:
+            conn.execute(AddConstraint(fk))
+    for column_name in legacy:
+        conn.execute(text(f"ALTER TABLE {name} DROP COLUMN {quote(column_name)}"))
+
+    logger.info(f"Moved {moved} resumes out of legacy columns {legacy} of {table.name}")
+    return moved
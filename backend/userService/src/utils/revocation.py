@@ -0,0 +1,168 @@
+"""
+Access-token revocation: logout revokes one token (by jti), forced expiry
+revokes every token a user holds.
+
+token_revocations in Postgres is the source of truth. Each process mirrors
+its keys into a Bloom filter, pulling rows newer than its last sync at most
+every AUTH_REVOCATION_SYNC_SECONDS, so checking a token that was never
+revoked needs no query. Only a Bloom hit is confirmed against the table,
+which also absorbs the filter's false positives and keys that have expired
+since. The filter is rebuilt from the unexpired rows when it fills up or
+every REBUILD_SECONDS; expired rows are deleted by src.jobs.guest_sweeper.
+
+Forced expiry sets users.tokens_valid_after, which get_current_user compares
+with the token's iat, and writes a "user:<id>" row so that every process
+drops the user from its cache on its next sync.
+"""
+import hashlib
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+from sqlalchemy import exists, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from src.core.config import settings
+from src.models.token_revocations import TokenRevocation
+from src.models.users import User
+from src.utils.user_cache import user_cache
+
+logger = logging.getLogger(__name__)
+
+USER_KEY_PREFIX = "user:"
+# Re-read rows revoked this long before the last one seen, in case their
+# transaction committed after a later one
+SYNC_OVERLAP = timedelta(seconds=30)
+REBUILD_SECONDS = 3600
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, fp_rate: float):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str) -> Iterable[int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class TokenRevocations:
+    def __init__(
+        self,
+        capacity: int = settings.auth_revocation_capacity,
+        fp_rate: float = settings.auth_revocation_fp_rate,
+        sync_seconds: int = settings.auth_revocation_sync_seconds
+    ):
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.sync_seconds = sync_seconds
+        self._bloom = BloomFilter(capacity, fp_rate)
+        self._lock = threading.Lock()
+        self._next_sync = 0.0
+        self._watermark: Optional[datetime] = None
+        self._next_rebuild = 0.0
+        self.confirmations = 0
+
+    def _add(self, key: str) -> None:
+        self._bloom.add(key)
+        if key.startswith(USER_KEY_PREFIX):
+            user_cache.invalidate(int(key[len(USER_KEY_PREFIX):]))
+
+    def _rebuild(self, db: Session) -> None:
+        now = datetime.now(timezone.utc)
+        rows = db.execute(
+            select(TokenRevocation.key, TokenRevocation.revoked_at)
+            .where(TokenRevocation.expires_at > now)
+        ).all()
+        self._bloom = BloomFilter(max(self.capacity, 2 * len(rows)), self.fp_rate)
+        for key, _ in rows:
+            self._add(key)
+        self._watermark = max((row.revoked_at for row in rows), default=now - SYNC_OVERLAP)
+        self._next_rebuild = time.monotonic() + REBUILD_SECONDS
+        logger.info(f"Token revocation filter rebuilt with {len(rows)} keys")
+
+    def sync(self, db: Session, force: bool = False) -> None:
+        """Pull revocations made by other processes since the last sync"""
+        if not force and time.monotonic() < self._next_sync:
+            return
+        with self._lock:
+            if (
+                self._watermark is None
+                or self._bloom.count > self._bloom.capacity
+                or time.monotonic() >= self._next_rebuild
+            ):
+                self._rebuild(db)
+            else:
+                rows = db.execute(
+                    select(TokenRevocation.key, TokenRevocation.revoked_at)
+                    .where(TokenRevocation.revoked_at > self._watermark - SYNC_OVERLAP)
+                ).all()
+                for key, revoked_at in rows:
+                    self._add(key)
+                    self._watermark = max(self._watermark, revoked_at)
+            self._next_sync = time.monotonic() + self.sync_seconds
+
+    def is_revoked(self, db: Session, jti: str) -> bool:
+        self.sync(db)
+        if jti not in self._bloom:
+            return False
+        self.confirmations += 1
+        return db.scalar(
+            select(exists().where(
+                TokenRevocation.key == jti,
+                TokenRevocation.expires_at > func.now()
+            ))
+        )
+
+    def _record(self, db: Session, key: str, expires_at: datetime) -> None:
+        # Revoking a key again (a second logout-all within the TTL) must look
+        # new to other processes' sync and keep the row until the later expiry
+        stmt = insert(TokenRevocation).values(key=key, expires_at=expires_at)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["key"],
+            set_={
+                "revoked_at": func.now(),
+                "expires_at": func.greatest(TokenRevocation.expires_at, stmt.excluded.expires_at),
+            }
+        ))
+
+    def revoke_token(self, db: Session, jti: str, expires_at: datetime) -> None:
+        """Revoke one token until it would have expired anyway"""
+        self._record(db, jti, expires_at)
+        db.commit()
+        self._add(jti)
+
+    def revoke_user(self, db: Session, user_id: int) -> None:
+        """Invalidate every token issued to the user so far"""
+        now = datetime.now(timezone.utc)
+        db.execute(update(User).where(User.id == user_id).values(tokens_valid_after=now))
+        self._record(db, f"{USER_KEY_PREFIX}{user_id}", now + timedelta(seconds=settings.auth_user_cache_ttl_seconds))
+        db.commit()
+        user_cache.invalidate(user_id)
+
+    def stats(self) -> dict:
+        return {
+            "keys": self._bloom.count,
+            "filter_bytes": len(self._bloom._bits),
+            "confirmations": self.confirmations,
+        }
+
+
+token_revocations = TokenRevocations()
@@ -0,0 +1,82 @@
+"""
+In-place schema upgrades that Base.metadata.create_all cannot perform.
+
+create_all only creates missing tables, so columns, indexes and foreign key
+rules added to existing models never reach a database created by an older
+release. upgrade_schema() converts event tables to their partitioned form,
+makes sure upcoming partitions exist, moves resume content out of legacy
+generated_resumes columns (src/utils/resume_migration.py), adds missing
+nullable (or defaulted) columns and indexes and rewrites foreign keys whose
+ON DELETE rule differs from the model. It is idempotent and runs at startup
+after create_all.
+"""
+import logging
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import AddConstraint
+
+from src.utils.db import Base
+from src.utils.partitioning import PARTITIONED_TABLES, convert_to_partitioned, ensure_upcoming_partitions, is_partitioned
+from src.utils.resume_migration import migrate_resume_storage
+
+logger = logging.getLogger(__name__)
+
+# Serialises upgrades when several workers start at once
+_UPGRADE_LOCK_KEY = 0x71756963  # "quic"
+
+
+def _sync_foreign_keys(conn: Connection, table, reflected: list) -> None:
+    for fk in table.foreign_key_constraints:
+        columns = [c.name for c in fk.columns]
+        wanted = (fk.ondelete or "NO ACTION").upper()
+        for existing in reflected:
+            if existing["constrained_columns"] != columns:
+                continue
+            current = (existing.get("options", {}).get("ondelete") or "NO ACTION").upper()
+            if current != wanted:
+                logger.info(f"Setting ON DELETE {wanted} on {table.name}.{existing['name']}")
+                quote = conn.dialect.identifier_preparer.quote
+                conn.execute(text(f"ALTER TABLE {quote(table.name)} DROP CONSTRAINT {quote(existing['name'])}"))
+                conn.execute(AddConstraint(fk))
+
+
+def _add_missing_columns(conn: Connection, table, existing_columns: set) -> None:
+    quote = conn.dialect.identifier_preparer.quote
+    for column in table.columns:
+        if column.name in existing_columns:
+            continue
+        if not column.nullable and column.server_default is None:
+            logger.warning(f"Not adding {table.name}.{column.name}: NOT NULL without a server default")
+            continue
+        logger.info(f"Adding column {table.name}.{column.name}")
+        spec = conn.dialect.ddl_compiler(conn.dialect, None).get_column_specification(column)
+        conn.execute(text(f"ALTER TABLE {quote(table.name)} ADD COLUMN {spec}"))
+
+
+def upgrade_schema(engine: Engine) -> None:
+    if engine.dialect.name != "postgresql":
+        return
+
+    with engine.begin() as conn:
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _UPGRADE_LOCK_KEY})
+        for table_name in PARTITIONED_TABLES:
+            if not is_partitioned(conn, table_name):
+                convert_to_partitioned(conn, Base.metadata.tables[table_name])
+            ensure_upcoming_partitions(conn, table_name)
+
+        resumes = Base.metadata.tables.get("generated_resumes")
+        if resumes is not None and inspect(conn).has_table(resumes.name):
+            migrate_resume_storage(conn, resumes)
+
+        inspector = inspect(conn)
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            _add_missing_columns(conn, table, {column["name"] for column in inspector.get_columns(table.name)})
+            existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    logger.info(f"Creating index {index.name}")
+                    index.create(conn)
+            _sync_foreign_keys(conn, table, inspector.get_foreign_keys(table.name))
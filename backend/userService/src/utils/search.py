@@ -0,0 +1,73 @@
+"""
+Full-text search helpers for generated resumes.
+
+Each resume row carries a tsvector built from its job description (weight A)
+and the plain text of its LaTeX body (weight B). The LaTeX itself lives
+compressed in the blob store, so the extracted text is kept next to the
+vector for highlighting. Both are written in the same INSERT as the row.
+"""
+import re
+
+from sqlalchemy import Float, cast, func, literal
+from sqlalchemy.dialects.postgresql import REGCONFIG
+
+from src.core.config import settings
+
+_DOCUMENT_BODY = re.compile(r"\\begin\{document\}(.*?)(?:\\end\{document\}|$)", re.S)
+_COMMENT = re.compile(r"(?<!\\)%.*$", re.M)
+_LINE_BREAK = re.compile(r"\\\\(\[[^\]]*\])?")
+# Commands whose arguments are layout, targets or labels rather than text
+_DROPPED_WITH_ARGS = re.compile(
+    r"\\(?:[vh]space|setlength|addtolength|label|ref|href|includegraphics|extracolsep)\*?"
+    r"(?:\[[^\]]*\])?\{[^{}]*\}"
+)
+_ENVIRONMENT = re.compile(r"\\(?:begin|end)\{[^{}]*\}(?:\[[^\]]*\])?(?:\{(?:[^{}]|\{[^{}]*\})*\})?")
+_COMMAND = re.compile(r"\\[a-zA-Z@]+\*?(?:\[[^\]]*\])?")
+_SPECIALS = re.compile(r"(?<!\\)[{}&~^]")
+_ESCAPED = re.compile(r"\\([&%$#_{}])")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def latex_to_text(latex: str) -> str:
+    """
+    Approximate the visible text of a LaTeX document: the preamble, comments,
+    environments and command names are removed, command arguments are kept.
+    """
+    body = _DOCUMENT_BODY.search(latex)
+    text = body.group(1) if body else latex
+    text = _COMMENT.sub("", text)
+    text = _LINE_BREAK.sub(" ", text)
+    text = _DROPPED_WITH_ARGS.sub(" ", text)
+    text = _ENVIRONMENT.sub(" ", text)
+    text = _COMMAND.sub(" ", text)
+    text = _SPECIALS.sub(" ", text)
+    text = _ESCAPED.sub(r"\1", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def _config():
+    return literal(settings.search_text_config, REGCONFIG)
+
+
+def search_vector(job_description, content_text):
+    """SQL expression for the stored tsvector of one resume"""
+    return func.setweight(func.to_tsvector(_config(), job_description), "A").op("||")(
+        func.setweight(func.to_tsvector(_config(), content_text), "B")
+    )
+
+
+def search_query(q: str):
+    """Parse user input with web-search syntax: quoted phrases, OR, -exclusions"""
+    return func.websearch_to_tsquery(_config(), q)
+
+
+def search_rank(vector, query):
+    """
+    Relevance of `vector` for `query`, as double precision so it survives
+    the round trip through a pagination cursor unchanged
+    """
+    return cast(func.ts_rank(vector, query), Float)
+
+
+def search_headline(text, query, options: str):
+    return func.ts_headline(_config(), text, query, options)
@@ -1,4 +1,5 @@
 from datetime import datetime, timedelta, timezone
+import uuid
 from passlib.context import CryptContext
 import jwt
 from jwt.exceptions import InvalidTokenError
@@ -7,7 +8,14 @@ from src.core.config import settings
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
+# Stored instead of a hash for accounts that cannot sign in with a password
+# (guests); no bcrypt hash starts with "!", so nothing ever verifies against it
+UNUSABLE_PASSWORD = "!"
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
+    if hashed_password.startswith(UNUSABLE_PASSWORD):
+        return False
     return pwd_context.verify(plain_password, hashed_password)
 
 
@@ -27,6 +35,24 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
     return encoded_jwt
 
 
+def issue_access_token(user, expires_delta: timedelta) -> str:
+    """
+    Access token for `user`. Besides the username it carries the user id and
+    guest flag, so requests resolve the user without a lookup by name, and a
+    jti / iat for revocation.
+    """
+    return create_access_token(
+        data={
+            "sub": user.username,
+            "uid": user.id,
+            "guest": user.is_guest,
+            "jti": uuid.uuid4().hex,
+            "iat": datetime.now(timezone.utc).timestamp(),
+        },
+        expires_delta=expires_delta
+    )
+
+
 def decode_token(token: str) -> dict | None:
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
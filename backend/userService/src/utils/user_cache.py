@@ -0,0 +1,79 @@
+"""
+Bounded TTL cache of authenticated users, keyed by user id.
+
+get_current_user serves users from here so a valid token costs no query.
+The cache keeps column snapshots, not ORM instances, and hands every caller
+its own detached User, so nothing is shared between sessions or requests.
+Entries are dropped when a User row is updated or deleted through the ORM in
+this process; other processes learn about changes through the revocation
+set (see src/utils/revocation.py) or when the TTL runs out.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import make_transient_to_detached
+
+from src.core.config import settings
+from src.models.users import User
+
+_COLUMNS = [column.key for column in User.__table__.columns]
+
+
+class UserCache:
+    def __init__(
+        self,
+        max_size: int = settings.auth_user_cache_size,
+        ttl_seconds: int = settings.auth_user_cache_ttl_seconds
+    ):
+        self.max_size = max_size
+        self.ttl = ttl_seconds
+        self._entries: "OrderedDict[int, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int) -> Optional[User]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            snapshot = entry[1]
+        user = User(**snapshot)
+        make_transient_to_detached(user)
+        return user
+
+    def put(self, user: User) -> None:
+        snapshot = {key: getattr(user, key) for key in _COLUMNS}
+        with self._lock:
+            self._entries[user.id] = (time.monotonic() + self.ttl, snapshot)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+user_cache = UserCache()
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user(mapper, connection, target: User) -> None:
+    user_cache.invalidate(target.id)
@@ -20,6 +20,7 @@ import type {
   SkillCreate,
   SkillUpdate,
   GeneratedResume,
+  ResumeListResponse,
   ResumeGenerateRequest,
   AuthTokens,
   ApiError,
@@ -227,8 +228,8 @@ export const skillApi = {
 
 // Resume API
 export const resumeApi = {
-  async getResumes(): Promise<GeneratedResume[]> {
-    const response = await api.get<GeneratedResume[]>('/resumes')
+  async getResumes(): Promise<ResumeListResponse[]> {
+    const response = await api.get<ResumeListResponse[]>('/resumes')
     return response.data
   },
 
@@ -151,13 +151,14 @@ export interface ResumeGenerateRequest {
   job_description: string
 }
 
+// GET /resumes lists metadata only; fetch a resume by id for its full job description and LaTeX
 export interface ResumeListResponse {
   id: number
   profile_id: number
-  job_description: string
-  pdf_file_path: string | null
+  job_description_preview: string
+  job_description_length: number
+  latex_content_size: number
   created_at: string
-  updated_at: string
 }
 
 // API Response types